@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Flipdot Benchmark Suite
+
+Times text rendering, frame encoding and wire throughput against a fake display
+on a pseudo-terminal, and stores the results as JSON for comparing versions.
+
+Usage:
+    python benchmark.py                          # run everything
+    python benchmark.py getbytes scrollleft      # run selected benchmarks
+    python benchmark.py -o new.json --compare old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import serial
+
+from core import core
+from core.frame_clock import FrameClock
+
+ROOT = Path(__file__).parent
+SAMPLE_MESSAGES = [
+    "HELLO WORLD",
+    "UP NEXT",
+    "WELCOME TO THE BIOHACKER SPACE",
+    "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 0123456789",
+    "Mixed Case, punctuation! And $ymbols? @ 12:34",
+]
+MARQUEE = " ".join(SAMPLE_MESSAGES) * 3
+
+
+class FakeDevice:
+    """A pty pair standing in for the display: frames go through a real serial port and are drained on the far side."""
+
+    def __init__(self, baud: int = 38400):
+        self.master, slave = os.openpty()
+        self.path = os.ttyname(slave)
+        self.port = serial.Serial(self.path, baud, timeout=1)
+        os.close(slave)
+
+        self.writes = 0
+        self.bytes = 0
+        self.write_times: List[float] = []
+        self.received = 0
+        self._running = True
+        self._drain = threading.Thread(target=self._read, name="fake-device", daemon=True)
+        self._drain.start()
+
+    def write(self, data: bytes) -> int:
+        self.writes += 1
+        self.bytes += len(data)
+        self.write_times.append(time.perf_counter())
+        return self.port.write(data)
+
+    def reset_counters(self) -> None:
+        self.writes = 0
+        self.bytes = 0
+        self.write_times = []
+
+    def close(self) -> None:
+        self._running = False
+        self.port.close()
+        os.close(self.master)
+
+    def _read(self) -> None:
+        while self._running:
+            try:
+                chunk = os.read(self.master, 65536)
+            except OSError:
+                return
+            if not chunk:
+                return
+            self.received += len(chunk)
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Per-call latency percentiles in microseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1e6
+
+    return {
+        "calls": len(ordered),
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": percentile(50),
+        "p90_us": percentile(90),
+        "p99_us": percentile(99),
+        "max_us": ordered[-1] * 1e6,
+        "calls_per_sec": len(ordered) / sum(ordered) if sum(ordered) else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[int], Any], calls: int) -> List[float]:
+    """Call fn(i) for each i, returning each call's duration."""
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def frame_stats(device: FakeDevice, elapsed: float, frames: Optional[int] = None) -> Dict[str, Any]:
+    """Throughput of an animation from what reached the fake device."""
+    frames = device.writes if frames is None else frames
+    intervals = [b - a for a, b in zip(device.write_times, device.write_times[1:])]
+    result = {
+        "frames": frames,
+        "writes": device.writes,
+        "bytes": device.bytes,
+        "bytes_per_frame": device.bytes / frames if frames else 0.0,
+        "elapsed_s": elapsed,
+        "fps": frames / elapsed if elapsed else 0.0,
+    }
+    result.update({f"frame_{key}": value for key, value in latency_stats(intervals).items()})
+    return result
+
+
+def run_animation(device: FakeDevice, animation: Callable[[], Any]) -> Dict[str, Any]:
+    """Run an animation with no frame pacing and report its throughput."""
+    device.reset_counters()
+    core.working_core.encoder.forget()
+    start = time.perf_counter()
+    animation()
+    elapsed = time.perf_counter() - start
+    clock = FrameClock.last
+    return frame_stats(device, elapsed, clock.frames if clock else None)
+
+
+# Benchmarks ------------------------------------------------------------------
+
+def bench_getbytes(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """Text rendering, with a cold and a warm render cache."""
+    def cold(i):
+        core.glyph_atlas.clear_cache()
+        core.getbytes(SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)])
+
+    return {
+        "cold": latency_stats(time_calls(cold, calls)),
+        "warm": latency_stats(time_calls(lambda i: core.getbytes(SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)]), calls)),
+        "marquee_cold": latency_stats(time_calls(lambda i: (core.glyph_atlas.clear_cache(), core.getbytes(MARQUEE)),
+                                                 max(calls // 10, 1))),
+    }
+
+
+def bench_encode(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """Frame encoding only: full frames and delta updates of a scrolling message."""
+    encoder = core.WORKING_CORE_CONFIG.create_encoder()
+    text = core.getbytes(MARQUEE)
+    frames = [text[i:i + core.TCOLUMN] for i in range(calls)]
+    delta_bytes = []
+
+    def delta(i):
+        delta_bytes.append(len(encoder.encode_delta(frames[i % len(frames)])))
+
+    return {
+        "full": latency_stats(time_calls(lambda i: encoder.encode(frames[i % len(frames)]), calls)),
+        "delta": latency_stats(time_calls(delta, calls)),
+        "full_bytes_per_frame": len(encoder.encode(frames[0])),
+        "delta_bytes_per_frame": statistics.fmean(delta_bytes),
+    }
+
+
+def bench_fill(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """fill() through the serial port, every frame different."""
+    frames = [bytes(random.getrandbits(7) for _ in range(core.TCOLUMN)) for _ in range(32)]
+    device.reset_counters()
+    core.working_core.encoder.forget()
+    start = time.perf_counter()
+    samples = time_calls(lambda i: core.fill(frames[i % len(frames)]), calls)
+    result = frame_stats(device, time.perf_counter() - start, calls)
+    result["call"] = latency_stats(samples)
+    return result
+
+
+def bench_scrollleft(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """scrollleft() of a long marquee, unpaced."""
+    text = core.getbytes(MARQUEE)
+    return run_animation(device, lambda: core.scrollleft(text))
+
+
+def bench_double_height(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """Double-height rendering and scrolling."""
+    from core import double_height_text, final_enhanced_core
+
+    render = latency_stats(time_calls(
+        lambda i: double_height_text.get_double_height_bytes(SAMPLE_MESSAGES[i % 3]), calls))
+    scroll = run_animation(device, lambda: final_enhanced_core.scroll_text_double_height("DOUBLE HEIGHT BENCHMARK"))
+    return {"get_double_height_bytes": render, "scroll_text_double_height": scroll}
+
+
+def bench_video_frames(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """Converting stored video frames into display buffers."""
+    from core.reconfigurable_flipdot import ReconfigurableFlipdotDisplay
+    from video import updated_video
+
+    images = sorted(str(path) for path in (ROOT / "video" / "frames").rglob("*.png"))[:calls]
+    images = images or sorted(str(path) for path in ROOT.glob("frame??.bmp"))
+    if not images:
+        return {"skipped": "no frames found"}
+
+    updated_video.set_display(ReconfigurableFlipdotDisplay(headless=True))
+    samples = time_calls(lambda i: updated_video.convert_image_to_frame_data(images[i % len(images)]), len(images))
+    return {"images": len(images), "convert": latency_stats(samples)}
+
+
+def bench_video_playback(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """Real-time playback of a packed video through the serial port: drift and dropped frames."""
+    from video import packed_video
+
+    clips = sorted(path for path in (ROOT / "video" / "frames").iterdir()
+                   if path.is_dir() and len(packed_video.frame_files(str(path))) >= 24)
+    if not clips:
+        return {"skipped": "no frames found"}
+
+    scratch = tempfile.mkdtemp(prefix="flipdot-bench-")
+    saved_speedup, FrameClock.speedup = FrameClock.speedup, 1.0
+    try:
+        path = os.path.join(scratch, "clip.fdv")
+        packed_video.pack_frames(str(clips[0]), path, core.WORKING_CORE_CONFIG)
+        with packed_video.PackedVideo(path) as video:
+            # About two seconds of video, fast enough to overrun the link
+            fps = max(video.fps, len(video) / 2.0)
+            device.reset_counters()
+            core.working_core.encoder.forget()
+            stats = video.play(core.fill, fps=fps, planner=core.working_core.planner)
+        stats.update({"clip": clips[0].name, "video_fps": fps, "duration": len(video) / fps,
+                      "wire_bytes": device.bytes})
+        return stats
+    finally:
+        FrameClock.speedup = saved_speedup
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def bench_binarize(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """Binarizing and packing a stack of grayscale frames with each method."""
+    import numpy as np
+    from video.binarize import BINARIZERS, display_buffers
+
+    frames = np.random.default_rng(1).integers(0, 256, (max(calls, 1), 14, 30), dtype=np.uint8)
+    results: Dict[str, Any] = {"frames": len(frames)}
+    for name, binarize in BINARIZERS.items():
+        samples = time_calls(lambda i: display_buffers(binarize(frames)), 3)
+        stats = latency_stats(samples)
+        stats["frames_per_sec"] = len(frames) / min(samples) if min(samples) else None
+        results[name] = stats
+    return results
+
+
+def bench_compile_data(device: FakeDevice, calls: int) -> Dict[str, Any]:
+    """Scavenger hunt mention processing, with canned mentions and a scratch copy of the puzzles."""
+    from games.scavengerhunt import scavengerhunt
+
+    scratch = Path(tempfile.mkdtemp(prefix="flipdot-bench-"))
+    saved = (scavengerhunt.PUZZLES_DIR, scavengerhunt.DATA_DIR,
+             scavengerhunt.twitter.get_latest_mentions, scavengerhunt.twitter.send_tweet)
+    try:
+        shutil.copytree(scavengerhunt.PUZZLES_DIR, scratch / "puzzles")
+        scavengerhunt.PUZZLES_DIR = scratch / "puzzles"
+        scavengerhunt.DATA_DIR = scratch / "data"
+
+        puzzle = scavengerhunt.load_json_file(scavengerhunt.PUZZLES_DIR / "main_puzzle.json")
+        names = [p["name"] for p in puzzle.get("puzzles", [])] or ["none"]
+        mentions = [{"user": {"screen_name": f"player{i % 50}"},
+                     "entities": {"hashtags": [{"text": random.choice(names)}, {"text": f"guess{i}"}]}}
+                    for i in range(200)]
+        scavengerhunt.twitter.get_latest_mentions = lambda *args, **kwargs: mentions
+        scavengerhunt.twitter.send_tweet = lambda *args, **kwargs: None
+
+        samples = time_calls(lambda i: scavengerhunt.compile_data(), max(calls // 10, 1))
+        return {"mentions": len(mentions), "compile_data": latency_stats(samples)}
+    finally:
+        (scavengerhunt.PUZZLES_DIR, scavengerhunt.DATA_DIR,
+         scavengerhunt.twitter.get_latest_mentions, scavengerhunt.twitter.send_tweet) = saved
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+BENCHMARKS: Dict[str, Callable[[FakeDevice, int], Dict[str, Any]]] = {
+    "getbytes": bench_getbytes,
+    "encode": bench_encode,
+    "fill": bench_fill,
+    "scrollleft": bench_scrollleft,
+    "double_height": bench_double_height,
+    "video_frames": bench_video_frames,
+    "video_playback": bench_video_playback,
+    "binarize": bench_binarize,
+    "compile_data": bench_compile_data,
+}
+
+
+# Running and comparing -------------------------------------------------------
+
+def version() -> str:
+    """Git revision of the tree being measured."""
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(names: List[str], calls: int) -> Dict[str, Any]:
+    """Run benchmarks against a fake device and collect their results."""
+    random.seed(1)
+    device = FakeDevice()
+    core.ser_main = device
+    core.working_core.connected = True
+    saved_speedup, FrameClock.speedup = FrameClock.speedup, float("inf")
+
+    results: Dict[str, Any] = {}
+    try:
+        for name in names:
+            print(f"Running {name}...")
+            try:
+                results[name] = BENCHMARKS[name](device, calls)
+            except ImportError as e:
+                results[name] = {"skipped": f"missing dependency: {e}"}
+            except Exception as e:
+                results[name] = {"error": repr(e)}
+    finally:
+        FrameClock.speedup = saved_speedup
+        device.close()
+
+    return {
+        "version": version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "calls": calls,
+        "results": results,
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric results keyed by dotted path."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """Print headline numbers side by side with the change between versions."""
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    headline = ("p50_us", "p99_us", "fps", "bytes_per_frame")
+    print(f"\n{'metric':58} {old['version']:>12} {new['version']:>12} {'change':>8}")
+    for key in sorted(new_flat):
+        if key in old_flat and key.endswith(headline) and not key.split(".")[-1].startswith("frame_"):
+            before, after = old_flat[key], new_flat[key]
+            change = f"{(after / before - 1) * 100:+.0f}%" if before else "n/a"
+            print(f"{key:58} {before:12.1f} {after:12.1f} {change:>8}")
+
+
+def summary(report: Dict[str, Any]) -> None:
+    """Print the headline numbers of a run."""
+    for key, value in flatten(report["results"]).items():
+        if key.endswith(("p50_us", "p99_us", "fps", "bytes_per_frame")):
+            print(f"  {key:58} {value:12.1f}")
+    for name, result in report["results"].items():
+        if "skipped" in result or "error" in result:
+            print(f"  {name}: {result.get('skipped') or result.get('error')}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark flipdot rendering, encoding and wire throughput")
+    parser.add_argument("benchmarks", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("-n", "--calls", type=int, default=1000, help="calls per latency measurement")
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results from another version to compare against")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    report = run(args.benchmarks or list(BENCHMARKS), args.calls)
+    summary(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
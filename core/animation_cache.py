@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Compiled Animation Cache
+
+Deterministic transitions (scrolls, flashes, magic hat screens) produce the
+same frames every time for the same text. A transition can be compiled once,
+running it against virtual time with fill() captured, into a frame sequence
+with per-frame durations. The result is kept in an on-disk cache keyed by the
+transition, its arguments, the display configuration and the font, and is
+played back later with no rendering at all.
+
+Set FLIPDOT_ANIMATION_CACHE to a directory to move the cache, or to "off" to
+disable it.
+"""
+
+import functools
+import hashlib
+import os
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from . import core
+    from .frame_clock import FrameClock, virtual_time
+    from .frame_encoder import mask_table
+except ImportError:
+    import core
+    from frame_clock import FrameClock, virtual_time
+    from frame_encoder import mask_table
+
+FORMAT_VERSION = 1
+_MAGIC = b"FLIPANI"
+_HEADER = struct.Struct("<BId")
+_FRAME = struct.Struct("<dH")
+
+CACHE_SETTING = os.environ.get("FLIPDOT_ANIMATION_CACHE", "")
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "flipdot" / "animations"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class Animation:
+    """Frames to fill, each held for its duration."""
+    frames: List[bytes] = field(default_factory=list)
+    durations: List[float] = field(default_factory=list)  # seconds each frame stays up
+    lead: float = 0.0  # wait before the first frame
+
+    @property
+    def duration(self) -> float:
+        return self.lead + sum(self.durations)
+
+    def play(self, fill: Optional[Callable[[bytes], Any]] = None) -> None:
+        """Show the frames on schedule (core.fill by default)."""
+        fill = fill or core.fill
+        clock = FrameClock()
+        if self.lead:
+            clock.tick(self.lead)
+        for frame, duration in zip(self.frames, self.durations):
+            fill(frame)
+            clock.tick(duration)
+
+    def to_bytes(self) -> bytes:
+        parts = [_MAGIC, _HEADER.pack(FORMAT_VERSION, len(self.frames), self.lead)]
+        for frame, duration in zip(self.frames, self.durations):
+            parts.append(_FRAME.pack(duration, len(frame)))
+            parts.append(frame)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Animation":
+        if not data.startswith(_MAGIC):
+            raise ValueError("Not a compiled animation")
+        position = len(_MAGIC)
+        version, count, lead = _HEADER.unpack_from(data, position)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported animation format {version}")
+        position += _HEADER.size
+
+        animation = cls(lead=lead)
+        for _ in range(count):
+            duration, length = _FRAME.unpack_from(data, position)
+            position += _FRAME.size
+            frame = data[position:position + length]
+            if len(frame) != length:
+                raise ValueError("Truncated animation")
+            position += length
+            animation.frames.append(frame)
+            animation.durations.append(duration)
+        return animation
+
+
+class _VirtualTime:
+    """Clock that only moves when slept on, so compiling takes no real time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(seconds, 0.0)
+
+
+def compile_animation(transition: Callable[..., Any], *args: Any, **kwargs: Any) -> Animation:
+    """
+    Run a transition against virtual time and capture its frames.
+
+    The transition must draw only through core fill() and pace itself with
+    FrameClock. Nothing is sent to the display. Virtual time and the capture
+    only apply to the calling thread, so other threads keep playing as usual.
+    """
+    virtual = _VirtualTime()
+    times: List[float] = []
+    frames: List[bytes] = []
+
+    def capture(message: bytes, fillmask: int = 127) -> None:
+        frame = bytes(message)
+        if fillmask != 0xff:
+            frame = frame.translate(mask_table(fillmask))
+        times.append(virtual.now)
+        frames.append(frame)
+
+    saved = core.working_core.recorder
+    core.working_core.recorder = capture
+    try:
+        with virtual_time(virtual):
+            transition(*args, **kwargs)
+    finally:
+        core.working_core.recorder = saved
+
+    ends = times[1:] + [virtual.now]
+    return Animation(frames, [end - start for start, end in zip(times, ends)], times[0] if times else virtual.now)
+
+
+class AnimationCache:
+    """Compiled animations on disk, evicted by total size and last use."""
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, transition: Callable[..., Any], args: tuple, kwargs: Dict[str, Any], font: Any = None) -> str:
+        """Cache key for a transition call on the current display, link and font."""
+        planner = core.working_core.planner
+        parts = (
+            FORMAT_VERSION,
+            f"{transition.__module__}.{transition.__qualname__}",
+            args,
+            sorted(kwargs.items()),
+            core.WORKING_CORE_CONFIG,
+            # Scroll steps and frame intervals are planned from the link (baud, bits per byte, max fps)
+            planner.link,
+            planner.max_step,
+            core.glyph_atlas.fingerprint,
+            font,
+        )
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.anim"
+
+    def load(self, key: str) -> Optional[Animation]:
+        """Cached animation, marking it as recently used. None if missing or unreadable."""
+        path = self.path(key)
+        try:
+            animation = Animation.from_bytes(path.read_bytes())
+            os.utime(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        return animation
+
+    def store(self, key: str, animation: Animation) -> None:
+        """Save an animation, then evict old entries if the cache is over its size limit."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path(key).with_suffix(".tmp")
+            tmp_path.write_bytes(animation.to_bytes())
+            os.replace(tmp_path, self.path(key))
+        except OSError as e:
+            print(f"Could not cache animation: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.directory.glob("*.anim"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.anim"):
+            path.unlink(missing_ok=True)
+
+    def get(self, transition: Callable[..., Any], *args: Any, font: Any = None, **kwargs: Any) -> Animation:
+        """Compiled animation for a transition call, compiling and storing it on a miss."""
+        key = self.key(transition, args, kwargs, font)
+        animation = self.load(key)
+        if animation is not None:
+            self.hits += 1
+            return animation
+        self.misses += 1
+        animation = compile_animation(transition, *args, **kwargs)
+        self.store(key, animation)
+        return animation
+
+
+# Shared cache used by cached_transition, None when disabled
+animation_cache: Optional[AnimationCache] = None
+if CACHE_SETTING.lower() not in ("off", "0", "false"):
+    animation_cache = AnimationCache(Path(CACHE_SETTING) if CACHE_SETTING else DEFAULT_CACHE_DIR)
+
+
+def cached_transition(transition: Optional[Callable[..., Any]] = None, *, font: Any = None):
+    """
+    Play a deterministic transition from the compiled animation cache.
+
+    Only use it on transitions that draw the same frames every time for the
+    same arguments; random ones would replay a single run forever.
+
+    Args:
+        font: Anything the frames depend on besides the core font (e.g. a
+            double-height pattern table), folded into the cache key
+    """
+    font_version = hashlib.sha1(repr(font).encode("utf-8")).hexdigest() if font is not None else None
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def play(*args: Any, **kwargs: Any) -> None:
+            if animation_cache is None or core.working_core.recorder:
+                # Disabled, or already being compiled as part of a bigger animation
+                return fn(*args, **kwargs)
+            animation_cache.get(fn, *args, font=font_version, **kwargs).play()
+        play.uncached = fn
+        return play
+
+    return decorate(transition) if transition else decorate
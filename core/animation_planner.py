@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Baud-Rate-Aware Animation Planner
+
+At 38400 baud a full frame takes around 40 ms on the wire, and the dots can't
+flip much faster than 12 times a second anyway. The planner knows the link
+bandwidth and what each frame of an effect really costs (delta encoded where
+the controller supports it), so it can pick the step size and frame interval
+for a scroll, rotate or video at a requested speed, and warn when an effect
+asks for more than the display can deliver.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Set, Tuple
+
+try:
+    from .display_config import DisplayConfig
+except ImportError:
+    from display_config import DisplayConfig
+
+BITS_PER_BYTE = 10  # 8N1: start bit, 8 data bits, stop bit
+MAX_FPS = 12.0  # about the quickest the dots can physically turn
+MAX_STEP = 8  # coarsest scroll step considered, in columns
+COST_SAMPLES = 32  # frames encoded when estimating an effect's bytes per frame
+
+# Infeasible (effect, interval, step) combinations already warned about
+_warned: Set[Tuple[str, float, int]] = set()
+
+
+@dataclass
+class LinkModel:
+    """Throughput limits of the serial link and the dots."""
+    baud: int = 38400
+    bits_per_byte: int = BITS_PER_BYTE
+    max_fps: float = MAX_FPS
+    headroom: float = 0.9  # share of the link a sustained animation may use
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.baud / self.bits_per_byte
+
+    def wire_time(self, frame_bytes: float) -> float:
+        """Seconds a frame of this many bytes spends on the wire."""
+        return frame_bytes / self.bytes_per_second
+
+    def min_interval(self, frame_bytes: float) -> float:
+        """Shortest sustainable time between frames of this size."""
+        return max(self.wire_time(frame_bytes) / self.headroom, 1.0 / self.max_fps)
+
+
+@dataclass
+class MotionPlan:
+    """How an animation will be run."""
+    effect: str
+    step: int  # columns (or source frames, for video) advanced per displayed frame
+    interval: float  # seconds between displayed frames
+    frames: int
+    bytes_per_frame: float
+    feasible: bool  # whether the requested speed could be met
+    warning: Optional[str] = None
+
+    @property
+    def speed(self) -> float:
+        """Columns (or source frames) per second."""
+        return self.step / self.interval if self.interval else 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.frames * self.interval
+
+
+class AnimationPlanner:
+    """Chooses step sizes and frame intervals that a display's link can sustain."""
+
+    def __init__(self, config: DisplayConfig, link: Optional[LinkModel] = None, max_step: int = MAX_STEP):
+        """
+        Args:
+            config: Display whose frame encoding is costed
+            link: Serial link limits (38400 baud, 12 fps by default)
+            max_step: Coarsest step a plan may use
+        """
+        self.config = config
+        self.link = link or LinkModel()
+        self.max_step = max_step
+        self._encoder = config.create_encoder()  # scratch encoder, never the display's own
+
+    def frame_bytes(self, frame_at: Callable[[int], bytes], count: int) -> float:
+        """
+        Average bytes on the wire per frame of an effect.
+
+        Samples up to COST_SAMPLES frames across the effect, costing each one as
+        a delta update from the frame before it.
+        """
+        if count <= 0:
+            return 0.0
+        if count == 1:
+            self._encoder.forget()
+            return float(len(self._encoder.encode_delta(frame_at(0))))
+
+        samples = min(count - 1, COST_SAMPLES)
+        total = 0
+        for i in range(samples):
+            k = 1 + (i * (count - 1)) // samples
+            self._encoder.forget()
+            self._encoder.encode_delta(frame_at(k - 1))
+            total += len(self._encoder.encode_delta(frame_at(k)))
+        return total / samples
+
+    def plan_motion(self, effect: str, frame_at: Callable[[int, int], bytes], frame_count: Callable[[int], int],
+                    speed: float) -> MotionPlan:
+        """
+        Smallest step that reaches a speed in columns per second.
+
+        Args:
+            effect: Name used in warnings
+            frame_at: Frame k of the effect when moving step columns at a time, as frame_at(k, step)
+            frame_count: Number of frames at a given step
+            speed: Requested columns per second
+        """
+        best = None
+        for step in range(1, self.max_step + 1):
+            count = frame_count(step)
+            cost = self.frame_bytes(lambda k: frame_at(k, step), count)
+            interval = step / speed if speed > 0 else math.inf
+            floor = self.link.min_interval(cost)
+            if interval >= floor:
+                return MotionPlan(effect, step, interval, count, cost, True)
+            # Keep the step that gets closest to the requested speed
+            candidate = MotionPlan(effect, step, floor, count, cost, False)
+            if best is None or candidate.speed > best.speed:
+                best = candidate
+
+        best.warning = (f"⚠️  {effect} at {speed:.0f} columns/s needs more than the link can carry "
+                        f"({best.bytes_per_frame:.0f} bytes/frame at {self.link.baud} baud); "
+                        f"running at {best.speed:.0f} columns/s with d={best.step}, t={best.interval:.3f}")
+        return best
+
+    def check(self, effect: str, frame_at: Callable[[int], bytes], count: int,
+              interval: float, step: int = 1) -> MotionPlan:
+        """Whether an effect with a fixed step and interval fits the link, with a suggestion if not."""
+        cost = self.frame_bytes(frame_at, count)
+        floor = self.link.min_interval(cost)
+        plan = MotionPlan(effect, step, interval, count, cost, interval >= floor)
+        if not plan.feasible:
+            plan.warning = (f"⚠️  {effect}(t={interval}, d={step}) asks for a frame every {interval * 1000:.0f} ms, "
+                            f"but {cost:.0f} bytes/frame at {self.link.baud} baud allows one every "
+                            f"{floor * 1000:.0f} ms at best; it will run slower than requested")
+        return plan
+
+    def plan_scroll(self, padded_message: bytes, window: int, speed: Optional[float] = None,
+                    duration: Optional[float] = None) -> MotionPlan:
+        """
+        Step and interval for scrolling a padded message through a window.
+
+        Args:
+            padded_message: Message with its leading and trailing blank padding
+            window: Columns visible at once
+            speed: Columns per second, or
+            duration: Seconds the whole scroll should take
+        """
+        travel = max(len(padded_message) - window, 0)
+        speed = _speed(travel, speed, duration)
+        return self.plan_motion("scroll", lambda k, step: padded_message[k * step:k * step + window],
+                                lambda step: travel // step + 1, speed)
+
+    def plan_rotate(self, message: bytes, columns: int, speed: Optional[float] = None,
+                    duration: Optional[float] = None) -> MotionPlan:
+        """Step and interval for rotating a message once through columns."""
+        speed = _speed(columns, speed, duration)
+        return self.plan_motion("rotate", lambda k, step: _rotated(message, k * step),
+                                lambda step: columns // step, speed)
+
+    def plan_video(self, fps: float, frames: Sequence[bytes] = ()) -> MotionPlan:
+        """
+        Frame stride and interval for playing a video at its source rate.
+
+        Args:
+            fps: Source frames per second
+            frames: Some decoded frames to cost; full frames are assumed without them
+        """
+        if frames:
+            cost = self.frame_bytes(lambda k: frames[k], len(frames))
+        else:
+            cost = float(len(self._encoder.encode(b'')))
+        floor = self.link.min_interval(cost)
+        stride = max(1, math.ceil(floor * fps - 1e-9))
+        plan = MotionPlan("video", stride, stride / fps, len(frames), cost, stride == 1)
+        if stride > 1:
+            plan.warning = (f"⚠️  video at {fps:g} fps needs a frame every {1000 / fps:.0f} ms, "
+                            f"but {cost:.0f} bytes/frame at {self.link.baud} baud allows one every "
+                            f"{floor * 1000:.0f} ms; showing every {stride} frames")
+        return plan
+
+
+def warn_once(plan: MotionPlan) -> MotionPlan:
+    """Print a plan's warning the first time it comes up."""
+    if plan.warning:
+        key = (plan.effect, round(plan.interval, 4), plan.step)
+        if key not in _warned:
+            _warned.add(key)
+            print(plan.warning)
+    return plan
+
+
+def _speed(travel: int, speed: Optional[float], duration: Optional[float]) -> float:
+    if speed is not None:
+        return speed
+    if duration:
+        return travel / duration
+    raise ValueError("Give either a speed or a duration")
+
+
+def _rotated(message: bytes, shift: int) -> bytes:
+    if not message:
+        return message
+    shift %= len(message)
+    return message[shift:] + message[:shift]
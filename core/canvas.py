@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Canvas Framebuffer for Flipdot Displays
+
+Holds the whole display as a NumPy pixel grid instead of hand-built lists of
+column bytes. Drawing (blit, shift, invert, mask) is vectorized, and the grid
+packs into 7-bit column bytes in one packbits call.
+
+Any fill() accepts a Canvas directly and places its module rows where the
+display's wiring reads them (on the main display the second row starts at
+column 75, not 30); to_buffer() does the same for a given configuration.
+"""
+
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from .display_config import DisplayConfig
+except ImportError:
+    from display_config import DisplayConfig
+
+# Pixel height of one module row, i.e. bits used in each column byte
+MODULE_HEIGHT = 7
+
+PixelSource = Union["Canvas", np.ndarray]
+
+
+class Canvas:
+    """A display-sized pixel grid, row 0 at the top."""
+
+    def __init__(self, width: int = 30, height: int = 14, module_height: int = MODULE_HEIGHT):
+        """
+        Create a blank canvas.
+
+        Args:
+            width: Width in pixels (display columns)
+            height: Height in pixels, normally a whole number of module rows
+            module_height: Pixels per column byte, bit 6 is the top pixel
+        """
+        if not 1 <= module_height <= 8:
+            raise ValueError("Module height must be between 1 and 8 pixels")
+        self.module_height = module_height
+        self.pixels = np.zeros((height, width), dtype=bool)
+
+    @classmethod
+    def for_config(cls, config: DisplayConfig) -> "Canvas":
+        """Blank canvas covering every visible pixel of a display configuration."""
+        return cls(config.screen_width, config.screen_height, config.module_height)
+
+    @classmethod
+    def from_array(cls, pixels: np.ndarray, module_height: int = MODULE_HEIGHT) -> "Canvas":
+        """Canvas over a copy of a 2D array, where any non-zero value is a lit dot."""
+        pixels = np.asarray(pixels)
+        if pixels.ndim != 2:
+            raise ValueError(f"Expected a 2D pixel array, got shape {pixels.shape}")
+        canvas = cls(pixels.shape[1], pixels.shape[0], module_height)
+        canvas.pixels[:] = pixels != 0
+        return canvas
+
+    @classmethod
+    def from_bytes(cls, message: bytes, width: int = 30, height: int = 14,
+                   module_height: int = MODULE_HEIGHT) -> "Canvas":
+        """
+        Unpack a display buffer (one byte per column, module row after module row).
+
+        Short buffers leave the remaining columns blank, extra bytes are ignored.
+        """
+        canvas = cls(width, height, module_height)
+        module_rows = canvas.module_rows
+        columns = np.zeros(module_rows * width, dtype=np.uint8)
+        data = np.frombuffer(bytes(message), dtype=np.uint8)[:columns.size]
+        columns[:data.size] = data
+
+        bits = np.unpackbits(columns.reshape(module_rows, 1, width), axis=1)
+        bits = bits[:, 8 - module_height:, :].reshape(module_rows * module_height, width)
+        canvas.pixels[:] = bits[:height].astype(bool)
+        return canvas
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    @property
+    def module_rows(self) -> int:
+        """Number of column bytes stacked in each display column."""
+        return -(-self.height // self.module_height)
+
+    def copy(self) -> "Canvas":
+        canvas = Canvas(self.width, self.height, self.module_height)
+        canvas.pixels[:] = self.pixels
+        return canvas
+
+    def clear(self) -> "Canvas":
+        """Turn every dot off."""
+        self.pixels[:] = False
+        return self
+
+    def invert(self) -> "Canvas":
+        """Flip every dot."""
+        np.logical_not(self.pixels, out=self.pixels)
+        return self
+
+    def mask(self, other: PixelSource, x: int = 0, y: int = 0) -> "Canvas":
+        """Keep only the dots that are also lit in other (placed at x, y), clearing the rest."""
+        keep = np.zeros_like(self.pixels)
+        self._region(keep, _pixels_of(other), x, y, "copy")
+        np.logical_and(self.pixels, keep, out=self.pixels)
+        return self
+
+    def blit(self, source: PixelSource, x: int = 0, y: int = 0, mode: str = "copy") -> "Canvas":
+        """
+        Draw source onto the canvas with its top left corner at (x, y).
+
+        Args:
+            source: Canvas or 2D array, clipped to the canvas edges
+            x: Column of the source's left edge (may be negative)
+            y: Row of the source's top edge (may be negative)
+            mode: "copy" replaces dots, "or" only lights dots, "xor" toggles them,
+                "and" keeps dots lit in both
+        """
+        self._region(self.pixels, _pixels_of(source), x, y, mode)
+        return self
+
+    def shift(self, dx: int = 0, dy: int = 0, wrap: bool = False) -> "Canvas":
+        """
+        Move the image right by dx and down by dy (negative values go left/up).
+
+        Dots moved off an edge are lost unless wrap is set, in which case they
+        come back in on the opposite edge.
+        """
+        if wrap:
+            self.pixels[:] = np.roll(self.pixels, (dy, dx), axis=(0, 1))
+            return self
+        shifted = np.zeros_like(self.pixels)
+        self._region(shifted, self.pixels, dx, dy, "copy")
+        self.pixels[:] = shifted
+        return self
+
+    def crop(self, x: int, y: int, width: int, height: int) -> "Canvas":
+        """New canvas holding a window of this one, blank where it falls outside."""
+        canvas = Canvas(width, height, self.module_height)
+        self._region(canvas.pixels, self.pixels, -x, -y, "copy")
+        return canvas
+
+    def to_bytes(self) -> bytes:
+        """
+        Pack into a display buffer: 7-bit column bytes, top module row first.
+
+        Byte (module_row * width + column) holds that module's column with the
+        top dot in bit 6. A display whose wiring doesn't read its rows back to
+        back needs to_buffer() instead.
+        """
+        rows = self.module_rows * self.module_height
+        pixels = self.pixels
+        if rows != self.height:
+            pixels = np.vstack([pixels, np.zeros((rows - self.height, self.width), dtype=bool)])
+
+        # Pad each module's column to 8 bits above the top dot, then pack each column in one go
+        bits = np.zeros((self.module_rows, 8, self.width), dtype=bool)
+        bits[:, 8 - self.module_height:, :] = pixels.reshape(self.module_rows, self.module_height, self.width)
+        return np.packbits(bits, axis=1).tobytes()
+
+    def to_buffer(self, config: DisplayConfig) -> bytes:
+        """
+        Pack into the message buffer a display configuration's fill() takes.
+
+        The canvas is cropped or padded to the configuration's screen, and each
+        module row goes where the wiring reads it.
+        """
+        if self.module_height != config.module_height:
+            raise ValueError(f"Canvas has {self.module_height} pixel modules, {config.name} has {config.module_height}")
+        canvas = self
+        if (self.width, self.height) != (config.screen_width, config.screen_height):
+            canvas = self.crop(0, 0, config.screen_width, config.screen_height)
+        return config.pack_screen(canvas.to_bytes())
+
+    def __bytes__(self) -> bytes:
+        return self.to_bytes()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Canvas):
+            return NotImplemented
+        return self.pixels.shape == other.pixels.shape and bool(np.array_equal(self.pixels, other.pixels))
+
+    def __repr__(self) -> str:
+        return f"Canvas({self.width}x{self.height}, {int(self.pixels.sum())} lit)"
+
+    def render(self, on: str = "O", off: str = ".") -> str:
+        """Text picture of the canvas, one line per pixel row."""
+        return "\n".join("".join(on if dot else off for dot in row) for row in self.pixels)
+
+    @staticmethod
+    def _region(target: np.ndarray, source: np.ndarray, x: int, y: int, mode: str) -> None:
+        """Combine source into target at (x, y), clipping both to their overlap."""
+        clipped = _clip(target.shape, source.shape, x, y)
+        if clipped is None:
+            return
+        target_window, source_window = clipped
+        region = target[target_window]
+        src = source[source_window]
+
+        if mode == "copy":
+            region[:] = src
+        elif mode == "or":
+            region |= src
+        elif mode == "xor":
+            region ^= src
+        elif mode == "and":
+            region &= src
+        else:
+            raise ValueError(f"Unknown blit mode: {mode}")
+
+
+def _pixels_of(source: PixelSource) -> np.ndarray:
+    """Boolean pixel array of a Canvas or array."""
+    if isinstance(source, Canvas):
+        return source.pixels
+    source = np.asarray(source)
+    if source.ndim != 2:
+        raise ValueError(f"Expected a 2D pixel array, got shape {source.shape}")
+    return source if source.dtype == bool else source != 0
+
+
+def _clip(target_shape: Tuple[int, int], source_shape: Tuple[int, int],
+          x: int, y: int) -> Optional[Tuple[Tuple[slice, slice], Tuple[slice, slice]]]:
+    """Overlapping windows of target and source when source sits at (x, y)."""
+    top, left = max(y, 0), max(x, 0)
+    bottom = min(y + source_shape[0], target_shape[0])
+    right = min(x + source_shape[1], target_shape[1])
+    if top >= bottom or left >= right:
+        return None
+    return ((slice(top, bottom), slice(left, right)),
+            (slice(top - y, bottom - y), slice(left - x, right - x)))
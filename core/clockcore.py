@@ -8,6 +8,10 @@ from past.utils import old_div
 import time
 from datetime import datetime, timedelta
 from . import core
+from .frame_clock import FrameClock
+from .frame_encoder import FrameEncoder
+from .glyph_atlas import GlyphAtlas
+from .serial_writer import QueuePolicy, SerialWriter
 import serial
 
 __author__ = 'boselowitz'
@@ -40,17 +44,16 @@ reset = b'\x81'
 row1 = b'\x81'
 row2 = b'\x82'
 
+frame_encoder = FrameEncoder([(reset + row1, ROW_BREAK), (reset + row2, ROW_BREAK)], cursor_row_break=ROW_BREAK)
+
 
 #Clock functionaility
+# Empty glyphs render as '?' like missing ones
+clock_atlas = GlyphAtlas({k: v for k, v in clockdict.items() if v}, clockdict['?'])
+
+
 def getbytes(m, delim=clockdict["space"], dmult=1):
-    buf = b''
-    for x in m:
-        if not clockdict.get(x):
-            buf += clockdict['?']
-        else:
-            buf += clockdict[x]
-        buf += delim * dmult
-    return buf[:len(buf) - len(delim * dmult)]
+    return clock_atlas.render(m, delim, dmult)
 
 
 def pad(m,padsym='',justify = CENTER_JUSTIFY):
@@ -82,12 +85,31 @@ def pad(m,padsym='',justify = CENTER_JUSTIFY):
             return (sp1*clockdict['space'])+(((old_div(padlen,2))+1)*padsym)+m+((old_div(padlen,2))*padsym)+(sp2*clockdict['space'])
 
 
+writer = None
+
+
+def start_writer(depth=2, policy=QueuePolicy.LATEST):
+    global writer
+    stop_writer()
+    writer = SerialWriter(ser_secondary, frame_encoder, depth, policy, name="flipdot-clock-writer")
+    return writer
+
+
+def stop_writer():
+    global writer
+    if writer:
+        writer.close()
+        writer = None
+
+
 def fill(m,fillmask=127):
-    ser_secondary.write(reset+row1)
-    for i in range(len(m)):
-        if i == ROW_BREAK:
-            ser_secondary.write(reset+row2)
-        ser_secondary.write(chr(ord(m[i])&fillmask))
+    m = bytes(m)  # also takes a Canvas
+    if writer:
+        writer.submit(m, fillmask, len(m))
+        return m
+    update = frame_encoder.encode_delta(m, fillmask, len(m))
+    if update:
+        ser_secondary.write(update)
     return m
 
 
@@ -96,12 +118,14 @@ def clear():
 
 
 def display_clock():
+    clock = FrameClock(1)
     while True:
         fill(pad(getbytes(time.strftime("%H:%M:%S")), justify=CENTER_JUSTIFY))
-        time.sleep(1)
+        clock.tick()
 
 
 def display_binary_clock():
+    clock = FrameClock(1)
     while True:
         now = datetime.now()
         hour = now.hour
@@ -123,12 +147,13 @@ def display_binary_clock():
             display_str = chr(col) + display_str
 
         fill(display_str + clockdict["space"] * 3 + getbytes(time.strftime("%H:%M")))
-        time.sleep(1)
+        clock.tick()
 
 
 def display_count_down(finish_message):
     previous_fill = b""
     fill_in_value = b"\x7f" * TCOLUMN_CLOCK
+    clock = FrameClock(0.12)
     for hex_value in fill_in_value:
         for position in range(TROW):
             if len(previous_fill) % 2 == 0:
@@ -139,9 +164,9 @@ def display_count_down(finish_message):
                 flip_with_new_dot = hex_value | BITMASK[position]
                 masked_off_top_bits = bytes([flip_with_new_dot & (0x7f << position)])
             fill(previous_fill + masked_off_top_bits)
-            time.sleep(0.12)
+            clock.tick()
             fill(core.negative(previous_fill) + masked_off_top_bits)
-            time.sleep(0.12)
+            clock.tick()
         previous_fill += masked_off_top_bits
         fill(previous_fill)
 
@@ -157,11 +182,12 @@ def strfdelta(tdelta, fmt):
 
 def display_count_down2(delta=timedelta(seconds=59)):
     future_date = datetime.now() + delta
+    clock = FrameClock(.5)
     while future_date > datetime.now():
         fill(pad(getbytes(strfdelta(future_date - datetime.now(), "{minutes}:{seconds:02d}"))))
-        time.sleep(.5)
+        clock.tick()
         fill(core.negative(pad(getbytes(strfdelta(future_date - datetime.now(), "{minutes}:{seconds:02d}")))))
-        time.sleep(.5)
+        clock.tick()
 
 
 class fallbackserialsecondary(object):
@@ -5,12 +5,33 @@ Enhanced Core System with Cross-Platform Serial Port Detection
 This version automatically detects available serial ports on both macOS and Linux.
 """
 
+import os
 import serial
 import serial.tools.list_ports
 import time
 import random
 import platform
-from typing import Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from serial.tools.list_ports_common import ListPortInfo
+from typing import Callable, Optional, List
+
+try:
+    from .animation_planner import AnimationPlanner, LinkModel, warn_once
+    from .display_config import DisplayConfig, SERPENTINE, STRAIGHT
+    from .frame_clock import FrameClock
+    from .glyph_atlas import GlyphAtlas
+    from .port_cache import device_key, forget_port, load_cache, remember_port
+    from .serial_writer import QueuePolicy, SerialWriter
+    from .wire_capture import WireRecorder
+except ImportError:
+    from animation_planner import AnimationPlanner, LinkModel, warn_once
+    from display_config import DisplayConfig, SERPENTINE, STRAIGHT
+    from frame_clock import FrameClock
+    from glyph_atlas import GlyphAtlas
+    from port_cache import device_key, forget_port, load_cache, remember_port
+    from serial_writer import QueuePolicy, SerialWriter
+    from wire_capture import WireRecorder
 
 # Copy all the constants and data from your original core.py directly
 TROW = 7  # Number of rows in the display
@@ -18,6 +39,14 @@ TCOLUMN = 105  # Number of columns in the display
 ROW_BREAK = 75  # Column index where the display wraps to the next row
 BITMASK = [1, 2, 4, 8, 0x10, 0x20, 0x40]  # Bitmask for each row
 DEFAULT_DELAY = 0.2  # Default animation delay
+PROBE_WORKERS = 8  # Serial ports probed at once when searching for the display
+HEADLESS = bool(os.environ.get("FLIPDOT_HEADLESS"))  # Simulate silently instead of printing the screen
+CAPTURE_PATH = os.environ.get("FLIPDOT_CAPTURE")  # Record all wire traffic to this file from the first frame
+STARTUP_BUDGET = 2.0  # Seconds from importing core to the first frame on the display
+
+# Reference point for measuring startup-to-first-frame time
+_imported_at = time.monotonic()
+_first_frame_after: Optional[float] = None
 
 # Serial control commands
 reset = b'\x81'
@@ -124,8 +153,11 @@ dict = {
     '}': b'A6\x08'
 }
 
-def find_serial_ports() -> List[str]:
-    """Find available serial ports that might be the flipdot display."""
+# Character dictionary compiled for getbytes()
+glyph_atlas = GlyphAtlas(dict, dict.get('?', b'\x00'))
+
+def find_serial_port_infos() -> List[ListPortInfo]:
+    """Find available serial ports that might be the flipdot display, with their USB ids."""
     ports = []
     
     # Get all available serial ports
@@ -140,23 +172,27 @@ def find_serial_ports() -> List[str]:
         # macOS patterns
         if system == "darwin":
             if "usbserial" in port_name or "tty.usb" in port_name:
-                ports.append(port_name)
+                ports.append(port)
         
         # Linux patterns
         elif system == "linux":
             if any(pattern in port_name for pattern in ["/dev/ttyUSB", "/dev/ttyACM", "/dev/serial"]):
-                ports.append(port_name)
+                ports.append(port)
             # Also check by description for FTDI, Arduino, etc.
             elif any(keyword in description for keyword in ["ftdi", "arduino", "usb", "serial"]):
-                ports.append(port_name)
+                ports.append(port)
         
         # Windows patterns (just in case)
         elif system == "windows":
             if port_name.startswith("COM"):
-                ports.append(port_name)
+                ports.append(port)
     
     return ports
 
+def find_serial_ports() -> List[str]:
+    """Find available serial ports that might be the flipdot display."""
+    return [port.device for port in find_serial_port_infos()]
+
 def test_flipdot_connection(port: str, baud: int = 38400) -> bool:
     """Test if a port responds like a flipdot display."""
     try:
@@ -169,28 +205,55 @@ def test_flipdot_connection(port: str, baud: int = 38400) -> bool:
     except Exception:
         return False
 
-def find_flipdot_port(baud: int = 38400) -> Optional[str]:
-    """Automatically find the flipdot display port."""
+def find_cached_port(candidates: List[ListPortInfo], baud: int = 38400) -> Optional[str]:
+    """Try the adapter the display was last found on, dropping it from the cache if it stopped answering."""
+    cache = load_cache()
+    for info in candidates:
+        key = device_key(info)
+        if key not in cache:
+            continue
+        if test_flipdot_connection(info.device, baud):
+            return info.device
+        forget_port(key)
+    return None
+
+def find_flipdot_port(baud: int = 38400, use_cache: bool = True) -> Optional[str]:
+    """
+    Automatically find the flipdot display port.
+    
+    The adapter found last time is tried first. Otherwise every candidate is
+    probed at once on a thread pool, so the search takes as long as the slowest
+    port rather than the sum of them all.
+    """
     print("Searching for flipdot display...")
     
-    candidate_ports = find_serial_ports()
+    candidates = find_serial_port_infos()
     
-    if not candidate_ports:
+    if not candidates:
         print("No USB serial ports found")
         return None
     
-    print(f"Found {len(candidate_ports)} potential serial ports:")
-    for port in candidate_ports:
-        print(f"  - {port}")
-    
-    # Test each port
-    for port in candidate_ports:
-        print(f"Testing {port}...")
-        if test_flipdot_connection(port, baud):
-            print(f"✅ Flipdot display found on {port}")
+    if use_cache:
+        port = find_cached_port(candidates, baud)
+        if port:
+            print(f"✅ Flipdot display found on {port} (cached)")
             return port
-        else:
-            print(f"❌ No response from {port}")
+    
+    print(f"Found {len(candidates)} potential serial ports:")
+    for info in candidates:
+        print(f"  - {info.device}")
+    
+    # Test every port concurrently, preferring the first candidate that answers
+    workers = min(PROBE_WORKERS, len(candidates))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flipdot-probe") as pool:
+        results = list(pool.map(lambda info: test_flipdot_connection(info.device, baud), candidates))
+    
+    for info, found in zip(candidates, results):
+        if found:
+            print(f"✅ Flipdot display found on {info.device}")
+            remember_port(device_key(info), info.device, baud)
+            return info.device
+        print(f"❌ No response from {info.device}")
     
     print("No flipdot display found on any port")
     return None
@@ -257,18 +320,61 @@ class FallbackSerial:
             print("| " + " ".join(row) + " |")
         print("="*32 + "\n")
 
+# Wire layout of the main display: five 30-column strips, every other strip
+# chains its modules backwards, and the second controller row starts at ROW_BREAK.
+# The controller takes cursor commands, so fills only send changed columns.
+# Only two rows of 30 columns are dots: wire columns 0-29 and ROW_BREAK onwards.
+WORKING_CORE_CONFIG = DisplayConfig(
+    "Working core 6x5 serpentine", 6, 5,
+    wiring=(STRAIGHT, SERPENTINE, STRAIGHT, SERPENTINE, STRAIGHT),
+    row_commands=((0, reset + row1), (ROW_BREAK, reset + row2)),
+    cursor_row_break=ROW_BREAK,
+    visible_rows=(0, ROW_BREAK),
+    visible_width=30
+)
+
 # Initialize serial connection with fallback
 ser_main = None
 
 class WorkingFlipdotCore:
     """Complete flipdot core that properly handles both rows."""
     
-    def __init__(self, port: Optional[str] = None, baud: int = 38400):
-        """Initialize display with auto-detection."""
+    writer: Optional[SerialWriter] = None
+    
+    def __init__(self, port: Optional[str] = None, baud: int = 38400, lazy: bool = False):
+        """Initialize display with auto-detection (deferred to first use if lazy)."""
+        self._recording = threading.local()
+        self.encoder = WORKING_CORE_CONFIG.create_encoder()
+        self.port = port
+        self.baud = baud
+        self.planner = AnimationPlanner(WORKING_CORE_CONFIG, LinkModel(baud))
+        self.connected = False
+        
+        if not lazy:
+            self.connect()
+    
+    @property
+    def recorder(self) -> Optional[Callable[[bytes, int], None]]:
+        """Takes this thread's frames instead of the display while an animation is compiled."""
+        return getattr(self._recording, "recorder", None)
+    
+    @recorder.setter
+    def recorder(self, recorder: Optional[Callable[[bytes, int], None]]) -> None:
+        self._recording.recorder = recorder
+    
+    def connect(self) -> None:
+        """Find and open the display's serial port, falling back to terminal simulation."""
         global ser_main
         
-        if port is None:
-            port = find_flipdot_port(baud)
+        self.connected = True
+        port, baud = self.port, self.baud
+        
+        try:
+            if port is None:
+                port = find_flipdot_port(baud)
+        except Exception as e:
+            print(f"Could not initialize display: {e}")
+            return
         
         if port:
             try:
@@ -277,51 +383,121 @@ class WorkingFlipdotCore:
             except (serial.SerialException, OSError) as e:
                 print(f"❌ Failed to connect to {port}: {e}")
                 print("🔄 Using terminal simulation mode")
-                ser_main = FallbackSerial()
+                ser_main = self._simulator()
         else:
             print("🔄 No flipdot display found, using terminal simulation mode")
-            ser_main = FallbackSerial()
+            ser_main = self._simulator()
+        
+        if CAPTURE_PATH:
+            self.record_wire(CAPTURE_PATH)
+    
+    def record_wire(self, path: str) -> Optional[WireRecorder]:
+        """
+        Log every write to the display, with timestamps, to a capture file.
+        
+        Replay it later with: python -m core.wire_capture replay <path>
+        """
+        global ser_main
+        
+        if not self.connected:
+            self.connect()
+        self.stop_recording()
+        if not ser_main:
+            return None
+        ser_main = WireRecorder(ser_main, path, WORKING_CORE_CONFIG.name)
+        if self.writer:
+            self.writer.port = ser_main
+        print(f"📼 Recording wire traffic to {path}")
+        return ser_main
+    
+    def stop_recording(self) -> None:
+        """Close the capture file and write to the display directly again."""
+        global ser_main
+        
+        if isinstance(ser_main, WireRecorder):
+            ser_main = ser_main.stop()
+            if self.writer:
+                self.writer.port = ser_main
+    
+    def _simulator(self):
+        """Stand-in for the display: a silent virtual panel when headless, else the terminal view."""
+        if HEADLESS:
+            return self.use_virtual_panel()
+        return FallbackSerial()
+    
+    def use_virtual_panel(self, history: int = 0, capture: bool = False):
+        """
+        Send frames to a silent in-memory panel instead of the display.
+        
+        Args:
+            history: Number of past frames to keep on the panel
+            capture: Keep every chunk of bytes written
+            
+        Returns:
+            The VirtualPanel, for snapshots and frame history
+        """
+        global ser_main
+        
+        try:
+            from .virtual_panel import VirtualPanel
+        except ImportError:
+            from virtual_panel import VirtualPanel
+        
+        self.stop_writer()
+        ser_main = VirtualPanel(WORKING_CORE_CONFIG, history, capture)
+        self.connected = True
+        self.encoder.forget()
+        return ser_main
+    
+    def start_writer(self, depth: int = 2, policy: QueuePolicy = QueuePolicy.LATEST) -> Optional[SerialWriter]:
+        """Send frames from a background thread so fill() never waits on the serial port."""
+        if not self.connected:
+            self.connect()
+        if not ser_main:
+            return None
+        self.stop_writer()
+        self.writer = SerialWriter(ser_main, self.encoder, depth, policy)
+        return self.writer
+    
+    def stop_writer(self) -> None:
+        """Write any queued frames, then go back to writing on the caller's thread."""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
     
     def clear(self) -> None:
         """Clear display."""
-        if ser_main:
-            ser_main.write(reset + row1)
-            ser_main.write(b'\x00' * TCOLUMN)
+        self.fill(b'')
     
     def getbytes(self, message: str, delim: bytes = dict['space'], dmult: int = 1) -> bytes:
-        """Get bytes for message."""
-        buf = b''
-        for x in message:
-            if x not in dict:
-                buf += dict.get('?', b'\x00')
-            else:
-                buf += dict[x]
-            buf += delim * dmult
-        
-        return buf[:-len(delim * dmult)] if dmult > 0 and delim else buf
+        """Get bytes for message (rendered once, then served from the glyph atlas cache)."""
+        return glyph_atlas.render(message, delim, dmult)
+    
+    def text_width(self, message: str, delim: bytes = dict['space'], dmult: int = 1) -> int:
+        """Columns getbytes() would produce for message, without rendering it."""
+        return glyph_atlas.width(message, delim, dmult)
     
     def fill(self, message: bytes, fillmask: int = 127) -> bytes:
-        """Fill display."""
+        """Fill display from a buffer of column bytes or a Canvas."""
+        if hasattr(message, "to_buffer"):
+            message = message.to_buffer(WORKING_CORE_CONFIG)
+        if self.recorder:
+            self.recorder(message, fillmask)
+            return message
+        if not self.connected:
+            self.connect()
         if not ser_main:
             return message
+        if _first_frame_after is None:
+            _record_first_frame()
+        
+        if self.writer:
+            self.writer.submit(message, fillmask)
+            return message
             
-        ser_main.write(reset + row1)
-
-        for i in range(150):
-            if i == ROW_BREAK:
-                ser_main.write(reset + row2)
-
-            if (i // 30) % 2 == 0:
-                if i < len(message):
-                    ser_main.write(bytes([message[i] & fillmask]))
-                else:
-                    ser_main.write(b"\x00")
-            else:
-                index = ((i % 30) + (25 - (10 * ((i % 30) // 5)))) + (30 * (i // 30))
-                if index < len(message):
-                    ser_main.write(bytes([message[index] & fillmask]))
-                else:
-                    ser_main.write(b"\x00")
+        update = self.encoder.encode_delta(message, fillmask)
+        if update:
+            ser_main.write(update)
 
         return message
     
@@ -347,8 +523,14 @@ class WorkingFlipdotCore:
         self.fill(chunk)
     
     def scrollleft(self, message: bytes, t: float = 0.2, d: int = 1, 
-                  pausedelay: Optional[float] = None, o: bool = False) -> bytes:
-        """Scroll left."""
+                  pausedelay: Optional[float] = None, o: bool = False,
+                  speed: Optional[float] = None, duration: Optional[float] = None) -> bytes:
+        """
+        Scroll left.
+
+        Pass speed (columns per second) or duration (seconds) instead of t and d
+        to have them planned for the serial link.
+        """
         if not o:
             padded_message = TCOLUMN * dict['space'] + message + TCOLUMN * dict['space']
         else:
@@ -356,94 +538,124 @@ class WorkingFlipdotCore:
             
         message_len = len(padded_message) - TCOLUMN
         
+        if speed or duration:
+            plan = warn_once(self.planner.plan_scroll(padded_message, TCOLUMN, speed, duration))
+            t, d = plan.interval, plan.step
+        else:
+            warn_once(self.planner.check("scrollleft", lambda k: padded_message[k*d:(k*d) + TCOLUMN],
+                                         (message_len // d) + 1, t, d))
+        
+        clock = FrameClock(t)
         for k in range((message_len // d) + 1):
             self.fill(padded_message[k*d:(k*d) + TCOLUMN])
             
             if pausedelay and k == ((message_len // d) + 1) // 2:
-                time.sleep(pausedelay - t)
-                
-            time.sleep(t)
+                clock.tick(pausedelay)
+            else:
+                clock.tick()
             
         return padded_message
     
-    def rotateleft(self, message: bytes, t: float = 0.2, d: int = 1) -> bytes:
-        """Rotate left."""
+    def _plan_rotate(self, effect: str, message: bytes, t: float, d: int,
+                     speed: Optional[float], duration: Optional[float]):
+        """Interval and step for a rotation, planned from speed/duration or checked against the link."""
+        if speed or duration:
+            plan = warn_once(self.planner.plan_rotate(message, TCOLUMN, speed, duration))
+            return plan.interval, plan.step
+        warn_once(self.planner.check(effect, lambda k: message[k*d:] + message[:k*d], TCOLUMN // d, t, d))
+        return t, d
+    
+    def rotateleft(self, message: bytes, t: float = 0.2, d: int = 1,
+                   speed: Optional[float] = None, duration: Optional[float] = None) -> bytes:
+        """Rotate left (speed in columns per second or duration in seconds replace t and d)."""
+        t, d = self._plan_rotate("rotateleft", message, t, d, speed, duration)
+        clock = FrameClock(t)
         for k in range(TCOLUMN // d):
             self.fill(message)
             message = message[d:] + message[:d]
-            time.sleep(t)
+            clock.tick()
         return message
     
-    def rotateright(self, message: bytes, t: float = 0.2, d: int = 1) -> bytes:
-        """Rotate right."""
+    def rotateright(self, message: bytes, t: float = 0.2, d: int = 1,
+                    speed: Optional[float] = None, duration: Optional[float] = None) -> bytes:
+        """Rotate right (speed in columns per second or duration in seconds replace t and d)."""
+        t, d = self._plan_rotate("rotateright", message, t, d, speed, duration)
+        clock = FrameClock(t)
         for k in range(TCOLUMN // d):
             self.fill(message)
             message = message[-d:] + message[:-d]
-            time.sleep(t)
+            clock.tick()
         return message
     
     def scrollup(self, message: bytes, t: float = 0.2) -> bytes:
         """Scroll up."""
+        clock = FrameClock(t)
         for _ in range(TROW):
             message = bytes([(x << 1) & 127 for x in message])
             self.fill(message)
-            time.sleep(t)
+            clock.tick()
         return message
     
     def scrolldown(self, message: bytes, t: float = 0.2) -> bytes:
         """Scroll down."""
+        clock = FrameClock(t)
         for _ in range(TROW):
             message = bytes([x >> 1 for x in message])
             self.fill(message)
-            time.sleep(t)
+            clock.tick()
         return message
     
     def fillfrombottomup(self, message: bytes, t: float = 0.2) -> bytes:
         """Fill from bottom up."""
         btm = 0
+        clock = FrameClock(t)
         for k in range(len(BITMASK)):
             btm += BITMASK[k]
             self.fill(message, btm)
-            time.sleep(t)
+            clock.tick()
         return message
     
     def fillfromtopdown(self, message: bytes, t: float = 0.2) -> bytes:
         """Fill from top down."""
         btm = 0
+        clock = FrameClock(t)
         for k in range(len(BITMASK) - 1, -1, -1):
             btm += BITMASK[k]
             self.fill(message, btm)
-            time.sleep(t)
+            clock.tick()
         return message
     
     def erasefromtopdown(self, message: bytes, t: float = 0.2) -> bytes:
         """Erase from top down."""
         btm = 127
+        clock = FrameClock(t)
         for k in range(len(BITMASK) - 1, -1, -1):
             btm -= BITMASK[k]
             self.fill(message, btm)
-            time.sleep(t)
+            clock.tick()
         return message
     
     def erasefrombottomup(self, message: bytes, t: float = 0.2) -> bytes:
         """Erase from bottom up."""
         btm = 127
+        clock = FrameClock(t)
         for k in range(len(BITMASK)):
             btm -= BITMASK[k]
             self.fill(message, btm)
-            time.sleep(t)
+            clock.tick()
         return message
     
     def fillrandomorder(self, message: bytes, t: float = 0.2) -> bytes:
         """Fill in random order."""
         btm = 0
+        clock = FrameClock(t)
         for k in range(8):
             if k < 6:
                 btm = min(random.getrandbits(TROW), 127)
             else:
                 btm = min(btm + random.getrandbits(TROW), 127)
             self.fill(message, btm)
-            time.sleep(t)
+            clock.tick()
             
         if btm < 127:
             self.fill(message)
@@ -453,13 +665,14 @@ class WorkingFlipdotCore:
     def eraserandomorder(self, message: bytes, t: float = 0.2) -> bytes:
         """Erase in random order."""
         btm = 127
+        clock = FrameClock(t)
         for k in range(8):
             if k < 6:
                 btm = max(127 - random.getrandbits(TROW), 0)
             else:
                 btm = max(btm - random.getrandbits(TROW), 0)
             self.fill(message, btm)
-            time.sleep(t)
+            clock.tick()
             
         if btm > 0:
             self.clear()
@@ -470,10 +683,11 @@ class WorkingFlipdotCore:
         """Fill typewriter style."""
         message_str = self.bytes_to_approx_string(message)
         
+        clock = FrameClock(0.1)
         for i in range(1, len(message_str) + 1):
             partial = message_str[:i]
             self.display_text(partial, justify='left')
-            time.sleep(0.1)
+            clock.tick()
     
     def fillmakerbot(self, message: bytes) -> None:
         """Fill makerbot style."""
@@ -519,23 +733,37 @@ class WorkingFlipdotCore:
         """Pad message."""
         return message
 
-# Create global instance for backward compatibility (safe initialization)
-working_core = None
+def _record_first_frame() -> None:
+    """Note how long it took from import to the first frame, warning if over budget."""
+    global _first_frame_after
+    _first_frame_after = time.monotonic() - _imported_at
+    if _first_frame_after > STARTUP_BUDGET:
+        print(f"⚠️ First frame took {_first_frame_after:.2f}s after startup (budget {STARTUP_BUDGET:.1f}s)")
+
+def startup_time() -> Optional[float]:
+    """Seconds from importing core to the first frame, or None before the first frame."""
+    return _first_frame_after
+
+# Create global instance for backward compatibility. Importing stays free of
+# serial I/O: the port is searched for and opened on the first frame.
+working_core = WorkingFlipdotCore(lazy=True)
 
 def init_display(port: Optional[str] = None):
-    """Initialize the display safely with auto-detection."""
-    global working_core
-    if working_core is None:
-        try:
-            working_core = WorkingFlipdotCore(port)
-        except Exception as e:
-            print(f"Could not initialize display: {e}")
-            working_core = WorkingFlipdotCore.__new__(WorkingFlipdotCore)
-            working_core.serial = None
+    """Connect the display now rather than on first use."""
+    if not working_core.connected:
+        if port is not None:
+            working_core.port = port
+        working_core.connect()
     return working_core
 
-# Initialize on first import
-init_display()
+def use_virtual_panel(history: int = 0, capture: bool = False):
+    return working_core.use_virtual_panel(history, capture)
+
+def record_wire(path: str):
+    return working_core.record_wire(path)
+
+def stop_recording() -> None:
+    working_core.stop_recording()
 
 # Export functions for compatibility with existing code
 def clear():
@@ -544,20 +772,26 @@ def clear():
 def getbytes(message: str, delim: bytes = dict['space'], dmult: int = 1) -> bytes:
     return working_core.getbytes(message, delim, dmult)
 
+def text_width(message: str, delim: bytes = dict['space'], dmult: int = 1) -> int:
+    return working_core.text_width(message, delim, dmult)
+
 def fill(message: bytes, fillmask: int = 127) -> bytes:
     return working_core.fill(message, fillmask)
 
 def negative(message: bytes) -> bytes:
     return working_core.negative(message)
 
-def scrollleft(message: bytes, t: float = 0.2, d: int = 1, pausedelay: Optional[float] = None, o: bool = False) -> bytes:
-    return working_core.scrollleft(message, t, d, pausedelay, o)
+def scrollleft(message: bytes, t: float = 0.2, d: int = 1, pausedelay: Optional[float] = None, o: bool = False,
+               speed: Optional[float] = None, duration: Optional[float] = None) -> bytes:
+    return working_core.scrollleft(message, t, d, pausedelay, o, speed, duration)
 
-def rotateleft(message: bytes, t: float = 0.2, d: int = 1) -> bytes:
-    return working_core.rotateleft(message, t, d)
+def rotateleft(message: bytes, t: float = 0.2, d: int = 1,
+               speed: Optional[float] = None, duration: Optional[float] = None) -> bytes:
+    return working_core.rotateleft(message, t, d, speed, duration)
 
-def rotateright(message: bytes, t: float = 0.2, d: int = 1) -> bytes:
-    return working_core.rotateright(message, t, d)
+def rotateright(message: bytes, t: float = 0.2, d: int = 1,
+                speed: Optional[float] = None, duration: Optional[float] = None) -> bytes:
+    return working_core.rotateright(message, t, d, speed, duration)
 
 def scrollup(message: bytes, t: float = 0.2) -> bytes:
     return working_core.scrollup(message, t)
@@ -595,6 +829,12 @@ def flip(message: str, d: int = 1) -> None:
 def pad(message: bytes, padsym: str = '', justify: int = 3) -> bytes:
     return working_core.pad(message, padsym, justify)
 
+def start_writer(depth: int = 2, policy: QueuePolicy = QueuePolicy.LATEST) -> Optional[SerialWriter]:
+    return working_core.start_writer(depth, policy)
+
+def stop_writer() -> None:
+    return working_core.stop_writer()
+
 if __name__ == "__main__":
     print("Enhanced Cross-Platform Core System")
     print("="*40)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Display Configuration and Module Wiring
+
+Describes the size of a flipdot display and how its modules are chained to the
+controller. Each configuration compiles its wiring once into an address table
+(wire column -> message byte) that the frame encoder gathers from.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+try:
+    from .frame_encoder import FrameEncoder, Segment
+except ImportError:
+    from frame_encoder import FrameEncoder, Segment
+
+# Commands sent before the first and second module rows by the reconfigurable protocol
+FIRST_ROW_COMMAND = b'\x81\x82'
+NEXT_ROW_COMMAND = b'\x83'
+
+
+@dataclass(frozen=True)
+class ModuleRowWiring:
+    """How one row of modules is chained to the controller."""
+    reverse_modules: bool = False  # modules are chained right to left (serpentine)
+    mirror_columns: bool = False  # columns inside each module are wired right to left
+    source_offset: Optional[int] = None  # first message byte for this row (default: row * total_width)
+
+
+STRAIGHT = ModuleRowWiring()
+SERPENTINE = ModuleRowWiring(reverse_modules=True)
+
+
+@dataclass
+class DisplayConfig:
+    """Configuration for a flipdot display setup."""
+    name: str
+    modules_wide: int
+    modules_high: int
+    module_width: int = 5  # pixels per module width
+    module_height: int = 7  # pixels per module height
+    wiring: Tuple[ModuleRowWiring, ...] = ()  # per module row, missing rows are STRAIGHT
+    row_commands: Tuple[Tuple[int, bytes], ...] = ()  # (wire column, command) pairs
+    cursor_row_break: Optional[int] = None  # columns per cursor row if delta updates are supported
+    # Wire column at the left end of each visible module row, for a display that shows only part of the
+    # wire; empty when every wire column is a dot column of the module grid
+    visible_rows: Tuple[int, ...] = ()
+    visible_width: int = 0  # dot columns in each visible row
+
+    @property
+    def total_width(self) -> int:
+        return self.modules_wide * self.module_width
+
+    @property
+    def total_height(self) -> int:
+        return self.modules_high * self.module_height
+
+    @property
+    def total_pixels(self) -> int:
+        return self.total_width * self.total_height
+
+    @property
+    def screen_width(self) -> int:
+        """Width of what is actually visible, in pixels."""
+        return self.visible_width if self.visible_rows else self.total_width
+
+    @property
+    def screen_height(self) -> int:
+        """Height of what is actually visible, in pixels."""
+        return len(self.visible_rows) * self.module_height if self.visible_rows else self.total_height
+
+    @property
+    def screen_rows(self) -> int:
+        """Visible module rows."""
+        return len(self.visible_rows) if self.visible_rows else self.modules_high
+
+    @property
+    def row_break(self) -> int:
+        """Where display wraps to next row (for original protocol compatibility)."""
+        return self.total_width
+
+    @property
+    def wire_columns(self) -> int:
+        """Number of column bytes in a full frame."""
+        return self.total_width * self.modules_high
+
+    def row_wiring(self, module_row: int) -> ModuleRowWiring:
+        """Wiring for one row of modules."""
+        if module_row < len(self.wiring):
+            return self.wiring[module_row]
+        return STRAIGHT
+
+    @cached_property
+    def address_table(self) -> Tuple[int, ...]:
+        """Message index feeding each wire column, compiled once from the wiring."""
+        table: List[int] = []
+        for module_row in range(self.modules_high):
+            wiring = self.row_wiring(module_row)
+            offset = module_row * self.total_width if wiring.source_offset is None else wiring.source_offset
+            for module in range(self.modules_wide):
+                source_module = self.modules_wide - 1 - module if wiring.reverse_modules else module
+                for column in range(self.module_width):
+                    source_column = self.module_width - 1 - column if wiring.mirror_columns else column
+                    table.append(offset + (source_module * self.module_width) + source_column)
+        return tuple(table)
+
+    @cached_property
+    def pixel_table(self) -> Tuple[int, ...]:
+        """
+        Screen position (module_row * screen_width + x) of each wire column, -1 if it isn't visible.
+
+        With visible_rows the position follows from the cursor alone; otherwise it is
+        the module grid position, the same as address_table unless a row reads its
+        message from a custom offset.
+        """
+        table: List[int] = []
+        if self.visible_rows:
+            table = [-1] * self.wire_columns
+            for row, start in enumerate(self.visible_rows):
+                for x in range(self.visible_width):
+                    if start + x < self.wire_columns:
+                        table[start + x] = row * self.visible_width + x
+            return tuple(table)
+        for module_row in range(self.modules_high):
+            wiring = self.row_wiring(module_row)
+            for module in range(self.modules_wide):
+                source_module = self.modules_wide - 1 - module if wiring.reverse_modules else module
+                for column in range(self.module_width):
+                    source_column = self.module_width - 1 - column if wiring.mirror_columns else column
+                    table.append(module_row * self.total_width + source_module * self.module_width + source_column)
+        return tuple(table)
+
+    @property
+    def buffer_length(self) -> int:
+        """Bytes of message the wire reads from."""
+        return max(self.address_table) + 1
+
+    @cached_property
+    def screen_table(self) -> Tuple[int, ...]:
+        """Message index shown at each screen column (module_row * screen_width + x), -1 if none feeds it."""
+        table = [-1] * (self.screen_width * self.screen_rows)
+        for address, pixel in zip(self.address_table, self.pixel_table):
+            if pixel >= 0:
+                table[pixel] = address
+        return tuple(table)
+
+    def pack_screen(self, columns: bytes) -> bytes:
+        """
+        Message buffer that shows screen column bytes (module row after module row, screen_width each).
+
+        Each column goes to the message byte the wiring reads for its position.
+        Where two positions read the same byte, the later one wins.
+        """
+        message = bytearray(self.buffer_length)
+        for column, address in zip(bytes(columns), self.screen_table):
+            if address >= 0:
+                message[address] = column
+        return bytes(message)
+
+    def unpack_screen(self, message: bytes) -> bytes:
+        """Screen column bytes (module row after module row) a message buffer shows; the reverse of pack_screen."""
+        message = bytes(message)
+        return bytes(message[address] if 0 <= address < len(message) else 0 for address in self.screen_table)
+
+    @cached_property
+    def frame_segments(self) -> Tuple[Segment, ...]:
+        """Row commands and the number of column bytes that follow each one."""
+        commands = self.row_commands
+        if not commands:
+            commands = ((0, FIRST_ROW_COMMAND),)
+            if self.modules_high > 1:
+                commands += ((self.total_width, NEXT_ROW_COMMAND),)
+
+        commands = sorted(commands)
+        if commands[0][0] != 0:
+            raise ValueError(f"{self.name}: first row command must start at wire column 0")
+
+        stops = [column for column, _ in commands[1:]] + [self.wire_columns]
+        return tuple((command, stop - column) for (column, command), stop in zip(commands, stops))
+
+    def create_encoder(self) -> FrameEncoder:
+        """Build a frame encoder for this configuration's wire layout."""
+        return FrameEncoder(self.frame_segments, self.address_table, self.cursor_row_break)
@@ -14,6 +14,11 @@ from typing import Dict, List, Tuple
 # Add the current directory to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+try:
+    from .frame_clock import FrameClock
+except ImportError:
+    from frame_clock import FrameClock
+
 # Double-height character dictionary (14 pixels tall)
 # Each character is represented as a list of column bytes
 # Top 7 bits go to top row, bottom 7 bits go to bottom row
@@ -269,6 +274,7 @@ def scroll_double_height_left(core_instance, message: str, t: float = 0.2, d: in
     
     total_width = len(padded_top)
     
+    clock = FrameClock(t)
     for offset in range(0, total_width - 30 + 1, d):
         # Extract 30-column window
         display_top = padded_top[offset:offset + 30]
@@ -292,7 +298,7 @@ def scroll_double_height_left(core_instance, message: str, t: float = 0.2, d: in
             display_buffer[75 + i] = display_bottom[i]
         
         core_instance.fill(bytes(display_buffer))
-        time.sleep(t)
+        clock.tick()
 
 def typewriter_double_height(core_instance, message: str, char_delay: float = 0.2):
     """
@@ -303,10 +309,11 @@ def typewriter_double_height(core_instance, message: str, char_delay: float = 0.
         message: Text to display
         char_delay: Delay between characters
     """
+    clock = FrameClock(char_delay)
     for i in range(1, len(message) + 1):
         partial_message = message[:i]
         display_double_height_text(core_instance, partial_message, justify='left')
-        time.sleep(char_delay)
+        clock.tick()
 
 def display_text_from_bytes_double_height(core_instance, top_bytes, bottom_bytes):
     """
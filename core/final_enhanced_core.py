@@ -6,12 +6,10 @@ Now using the proven quadrant buffer mapping that works on your display.
 Supports single-height, double-height, and double-wide double-height text.
 """
 
-import time
-
 # Import your existing core functionality
 try:
     from .core import *
-    print("✅ Imported existing core functions (relative)")
+    from .frame_clock import FrameClock
 except ImportError:
     try:
         import sys
@@ -20,7 +18,7 @@ except ImportError:
         parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         sys.path.append(parent_dir)
         from core.core import working_core, clear, getbytes, scrollleft
-        print("✅ Imported existing core functions")
+        from core.frame_clock import FrameClock
     except ImportError:
         print("❌ Could not import core functions")
 
@@ -795,6 +793,7 @@ def scroll_text_double_height(message, delay=0.12):
     
     total_length = len(padded_top) - 105
     
+    clock = FrameClock(delay)
     for offset in range(0, total_length, 2):
         top_chunk = padded_top[offset:offset + 105]
         bottom_chunk = padded_bottom[offset:offset + 105]
@@ -816,14 +815,15 @@ def scroll_text_double_height(message, delay=0.12):
                 quadrant_buffer[30 + i] = bottom_chunk[i]
         
         working_core.fill(bytes(quadrant_buffer))
-        time.sleep(delay)
+        clock.tick()
 
 def typewriter_text_double_height(message, char_delay=0.4):
     """Typewriter effect for double-height text using WORKING quadrant mapping."""
+    clock = FrameClock(char_delay)
     for i in range(1, len(message) + 1):
         partial = message[:i]
         display_text_double_height(partial, justify='left')
-        time.sleep(char_delay)
+        clock.tick()
 
 # Export enhanced core functions
 __all__ = [
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Frame Clock for Flipdot Animations
+
+Schedules animation frames against absolute monotonic deadlines instead of
+sleeping a fixed time after each fill(). Time spent encoding and writing a
+frame comes out of the frame's period, so long animations don't drift.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+class _ThreadTime(threading.local):
+    source: Any = None  # virtual time for clocks on this thread, see virtual_time()
+
+
+_thread_time = _ThreadTime()
+
+
+@contextmanager
+def virtual_time(source: Any) -> Iterator[Any]:
+    """
+    Run frame clocks on this thread against a virtual time source at real speed.
+
+    Clocks on other threads keep real time, so an animation can be compiled
+    while video or a clock is playing.
+
+    Args:
+        source: Anything with monotonic() and sleep(seconds)
+    """
+    saved, _thread_time.source = _thread_time.source, source
+    try:
+        yield source
+    finally:
+        _thread_time.source = saved
+
+
+class FrameClock:
+    """Paces animation frames against absolute deadlines."""
+
+    # Most recently started clock, for stats after an animation returns
+    last: Optional["FrameClock"] = None
+
+    # Run every animation this many times faster than real time (float("inf")
+    # for no waiting at all), e.g. when testing against a virtual panel
+    speedup: float = 1.0
+
+    # Time source and sleep: real time, unless this thread is in virtual_time()
+    @staticmethod
+    def monotonic() -> float:
+        source = _thread_time.source
+        return time.monotonic() if source is None else source.monotonic()
+
+    @staticmethod
+    def sleep(seconds: float) -> None:
+        source = _thread_time.source
+        if source is None:
+            time.sleep(seconds)
+        else:
+            source.sleep(seconds)
+
+    @classmethod
+    def rate(cls) -> float:
+        """How many times faster than real time clocks on this thread run."""
+        return cls.speedup if _thread_time.source is None else 1.0
+
+    def __init__(self, period: float = 0.2):
+        """
+        Start the clock now.
+
+        Args:
+            period: Default time between frames in seconds
+        """
+        self.period = period
+        self.start = self.monotonic()
+        self.deadline = self.start
+        self.planned = 0.0  # sum of requested periods, without skipped deadlines
+        self.frames = 0
+        self.late_frames = 0
+        self.skipped_deadlines = 0  # periods jumped over after running late, not frames left out
+        self.max_lateness = 0.0
+        if _thread_time.source is None:
+            FrameClock.last = self
+
+    def tick(self, period: Optional[float] = None) -> int:
+        """
+        Wait for the next frame deadline.
+
+        Args:
+            period: Time until the next deadline, if not the default period
+
+        Returns:
+            How many whole periods the caller is behind schedule. Those
+            deadlines are skipped rather than bursted through, and callers
+            that can drop frames (video) should skip that many and count
+            them as dropped themselves; loops that draw every step don't.
+        """
+        rate = self.rate()
+        period = (self.period if period is None else period) / rate
+        frame_period = self.period / rate
+        self.deadline += period
+        self.planned += period
+        self.frames += 1
+
+        lateness = self.monotonic() - self.deadline
+        if lateness <= 0:
+            self.sleep(-lateness)
+            return 0
+
+        self.late_frames += 1
+        self.max_lateness = max(self.max_lateness, lateness)
+        behind = int(lateness // frame_period) if frame_period > 0 else 0
+        if behind:
+            self.skipped_deadlines += behind
+            self.deadline += behind * frame_period
+        return behind
+
+    @classmethod
+    def pause(cls, seconds: float) -> None:
+        """Hold the current frame outside of a paced loop, sped up like frame periods."""
+        cls.sleep(seconds / cls.rate())
+
+    def reset(self) -> None:
+        """Restart the schedule from now, e.g. after an unpaced pause."""
+        now = self.monotonic()
+        self.planned += now - self.deadline
+        self.deadline = now
+
+    def stats(self) -> Dict[str, Any]:
+        """Frame counts and how far the animation drifted from its schedule."""
+        elapsed = self.monotonic() - self.start
+        return {
+            "frames": self.frames,
+            "late": self.late_frames,
+            "skipped_deadlines": self.skipped_deadlines,
+            "max_lateness": self.max_lateness,
+            "elapsed": elapsed,
+            "drift": elapsed - self.planned,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def last_stats() -> Optional[Dict[str, Any]]:
+    """Stats for the most recent animation, or None if nothing has run."""
+    return FrameClock.last.stats() if FrameClock.last else None
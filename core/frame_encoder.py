@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Frame Encoder for Flipdot Displays
+
+Assembles a complete wire frame (row commands plus every column byte) into one
+reusable buffer, so a fill() costs a single serial write instead of one write
+per column. Encoders for controllers with cursor addressing can also remember
+the last frame and send only the column spans that changed.
+"""
+
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# A segment is a row command followed by the number of column bytes sent after it
+Segment = Tuple[bytes, int]
+
+# Control bytes start at 129: the first sets the cursor column, a second one
+# straight after it moves the cursor down that many rows
+CURSOR_BASE = 129
+CURSOR_COMMAND_COST = 2
+
+# Translation tables applying a fillmask to every byte, built on first use
+_MASK_TABLES: Dict[int, bytes] = {}
+
+
+def mask_table(fillmask: int) -> bytes:
+    """bytes.translate() table that ANDs every byte with fillmask."""
+    table = _MASK_TABLES.get(fillmask)
+    if table is None:
+        table = _MASK_TABLES[fillmask] = bytes(b & fillmask for b in range(256))
+    return table
+
+
+class FrameEncoder:
+    """Encodes display buffers into complete wire frames."""
+
+    def __init__(self, segments: Sequence[Segment],
+                 address_table: Optional[Sequence[int]] = None,
+                 cursor_row_break: Optional[int] = None):
+        """
+        Compile the frame layout once.
+
+        Args:
+            segments: Row commands and how many column bytes follow each one
+            address_table: Message index feeding each wire column (identity if None)
+            cursor_row_break: Columns per cursor row if the controller accepts
+                cursor commands (wire column N is cursor address N), else None
+        """
+        self.segments = [(bytes(command), length) for command, length in segments]
+        self.columns = sum(length for _, length in self.segments)
+        if address_table is None:
+            address_table = range(self.columns)
+        if len(address_table) != self.columns:
+            raise ValueError(f"Address table has {len(address_table)} entries for {self.columns} columns")
+
+        # The frame is gathered from header + message, where the header holds
+        # every row command byte. Messages are zero-padded to span the table.
+        header = b''.join(command for command, _ in self.segments)
+        self._header = header
+        self.span = max(address_table, default=-1) + 1
+
+        gather = []
+        self._column_ends = []
+        header_pos = 0
+        column = 0
+        for command, length in self.segments:
+            gather.extend(range(header_pos, header_pos + len(command)))
+            header_pos += len(command)
+            for index in address_table[column:column + length]:
+                gather.append(len(header) + index)
+                self._column_ends.append(len(gather))
+            column += length
+        self._gather = itemgetter(*gather)
+        self._frame = bytearray(len(gather))
+
+        # Column bytes only, in wire order, for comparing against the last frame
+        self._column_gather = itemgetter(*[len(header) + index for index in address_table])
+        self.cursor_row_break = cursor_row_break
+        self._last = bytearray(self.columns)
+        self._known = 0  # leading columns whose on-display state is known
+
+    def _source(self, message: bytes, fillmask: int) -> bytes:
+        """Header plus the padded, masked message that frames are gathered from."""
+        message = bytes(message)
+        if len(message) < self.span:
+            message += bytes(self.span - len(message))
+        if fillmask != 0xff:
+            message = message.translate(mask_table(fillmask))
+        return self._header + message
+
+    def encode(self, message: bytes, fillmask: int = 127,
+               columns: Optional[int] = None) -> bytearray:
+        """
+        Encode a message into the reused frame buffer.
+
+        Args:
+            message: Display buffer, one byte per column
+            fillmask: Bitmask applied to every column byte
+            columns: Only encode the first N columns (and the commands before them)
+
+        Returns:
+            The wire frame, ready for a single write. The buffer is reused by the
+            next call, so copy it if it needs to outlive that.
+        """
+        gathered = self._gather(self._source(message, fillmask))
+        frame = self._frame
+        frame[:] = gathered if len(frame) > 1 else (gathered,)
+
+        if columns is None or columns >= self.columns:
+            return frame
+        if columns <= 0:
+            return frame[:len(self.segments[0][0])]
+        return frame[:self._column_ends[columns - 1]]
+
+    def forget(self) -> None:
+        """Forget the last frame, so the next delta update sends everything."""
+        self._known = 0
+
+    def encode_delta(self, message: bytes, fillmask: int = 127,
+                     columns: Optional[int] = None) -> bytes:
+        """
+        Encode only what changed since the last delta update.
+
+        Changed columns are grouped into spans, each prefixed by a cursor
+        command. If that costs more bytes than a full frame, the full frame is
+        sent instead. Without cursor addressing this is always the full frame.
+
+        Args:
+            message: Display buffer, one byte per column
+            fillmask: Bitmask applied to every column byte
+            columns: Only update the first N columns
+
+        Returns:
+            Bytes to write, empty if the display already shows this frame. The
+            first update, and one with no columns, is always a full frame.
+        """
+        if self.cursor_row_break is None:
+            return bytes(self.encode(message, fillmask, columns))
+
+        if columns is None or columns > self.columns:
+            columns = self.columns
+        row_break = self.cursor_row_break
+        new = self._column_gather(self._source(message, fillmask))
+        if self.columns == 1:
+            new = (new,)
+        last = self._last
+        known = self._known
+
+        # Changed column spans, never crossing a cursor row
+        spans: List[List[int]] = []
+        for i in range(columns):
+            if i < known and new[i] == last[i]:
+                continue
+            if (spans and i - spans[-1][1] <= CURSOR_COMMAND_COST
+                    and spans[-1][0] // row_break == i // row_break):
+                # Resending a short unchanged gap is no dearer than a new cursor command
+                spans[-1][1] = i + 1
+            else:
+                spans.append([i, i + 1])
+
+        last[:columns] = bytes(new[:columns])
+        self._known = max(known, columns)
+        if not known or columns <= 0:
+            # The first frame and an empty one still send the reset header, as a full frame does
+            return bytes(self.encode(message, fillmask, columns))
+        if not spans:
+            return b''
+
+        sparse_cost = sum(CURSOR_COMMAND_COST + stop - start for start, stop in spans)
+        full_cost = self._column_ends[columns - 1]
+        if sparse_cost >= full_cost:
+            return bytes(self.encode(message, fillmask, columns))
+
+        update = bytearray()
+        for start, stop in spans:
+            update.append(CURSOR_BASE + (start % row_break))
+            update.append(CURSOR_BASE + (start // row_break))
+            update += last[start:stop]
+        return bytes(update)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Frame Ingestion from the Message Bus
+
+Receives frames published to the "frames" fanout exchange without letting a
+fast publisher get ahead of the display. Receiving and displaying run on
+separate threads:
+
+    consumer  takes messages from a short broker queue (oldest dropped when it
+              is full) under a prefetch limit, acks them in batches, and puts
+              the raw bodies in a mailbox holding only the newest frame, or a
+              small ring of the newest frames
+    display   converts and shows whatever is newest, at most at the display's
+              frame rate, so frames that were replaced while waiting are
+              never converted at all
+
+Lag is reported from publish to display when publishers stamp their frames
+(see PUBLISHED_AT_HEADER), and from receipt to display otherwise.
+
+Usage:
+    ingest = FrameIngest(pika_connector("localhost"), core.WORKING_CORE_CONFIG)
+    ingest.start()
+    ingest.display(core.fill, fps=5.0)   # until interrupted or ingest.stop()
+    print(ingest.stats())
+
+For tests, connect to an in-process broker instead:
+    broker = LocalBroker()
+    ingest = FrameIngest(broker.connection, config)
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .canvas import Canvas
+    from .display_config import DisplayConfig
+    from .frame_clock import FrameClock
+    from .frame_message import decode_frame, is_frame_message, is_stale, read_header
+    from .serial_writer import QueuePolicy
+except ImportError:
+    from canvas import Canvas
+    from display_config import DisplayConfig
+    from frame_clock import FrameClock
+    from frame_message import decode_frame, is_frame_message, is_stale, read_header
+    from serial_writer import QueuePolicy
+
+EXCHANGE = "frames"
+# Header holding the wall-clock time (time.time()) a frame was published at
+PUBLISHED_AT_HEADER = "published_at"
+
+# (body, published at, received at)
+Delivery = Tuple[bytes, Optional[float], float]
+
+
+def pixels_to_buffer(body: bytes, config: DisplayConfig) -> bytes:
+    """
+    Display buffer for a published frame: a frame message (see frame_message),
+    or the old format of one byte per pixel, row after row, any non-zero byte
+    a lit dot.
+    """
+    width, height = config.total_width, config.total_height
+    if is_frame_message(body):
+        frame = decode_frame(body)
+        if not frame.header.matches(config):
+            raise ValueError(f"Expected a {width}x{height} frame, got {frame.header.width}x{frame.header.height}")
+        return Canvas.from_array(frame.pixels, config.module_height).to_bytes()
+    if len(body) != width * height:
+        raise ValueError(f"Expected a {width}x{height} frame of {width * height} bytes, got {len(body)}")
+    pixels = np.frombuffer(body, dtype=np.uint8).reshape(height, width)
+    return Canvas.from_array(pixels, config.module_height).to_bytes()
+
+
+def pika_connector(host: str = "localhost", **parameters: Any) -> Callable[[], Any]:
+    """Function opening a pika BlockingConnection to a RabbitMQ server."""
+    import pika
+
+    def connect() -> Any:
+        return pika.BlockingConnection(pika.ConnectionParameters(host=host, **parameters))
+    return connect
+
+
+def published_at(properties: Any) -> Optional[float]:
+    """When a message was published, from its header or AMQP timestamp (whole seconds)."""
+    headers = getattr(properties, "headers", None) or {}
+    if PUBLISHED_AT_HEADER in headers:
+        return float(headers[PUBLISHED_AT_HEADER])
+    timestamp = getattr(properties, "timestamp", None)
+    return float(timestamp) if timestamp else None
+
+
+class FrameIngest:
+    """Consumes frames from the message bus into a bounded mailbox and shows the newest."""
+
+    def __init__(self, connect: Callable[[], Any], config: DisplayConfig, exchange: str = EXCHANGE,
+                 depth: int = 1, policy: QueuePolicy = QueuePolicy.LATEST, prefetch: int = 8,
+                 ack_every: int = 4, max_queue: int = 16):
+        """
+        Args:
+            connect: Opens a connection, e.g. pika_connector(host) or LocalBroker().connection
+            config: Display the frames are for
+            exchange: Fanout exchange frames are published to
+            depth: Frames kept waiting for the display, for QueuePolicy.DROP_OLDEST
+            policy: LATEST to keep only the newest frame, DROP_OLDEST for a ring of depth frames
+            prefetch: Most messages delivered and not yet acked
+            ack_every: Messages acked at once; at most prefetch, or delivery would stall
+            max_queue: Most messages the broker queues for this receiver before dropping the oldest
+        """
+        if depth < 1 or prefetch < 1 or ack_every < 1 or max_queue < 1:
+            raise ValueError("Depth, prefetch, ack batch and queue length must be at least 1")
+        if QueuePolicy(policy) == QueuePolicy.BLOCK:
+            raise ValueError("Frame ingestion can't block the broker; use LATEST or DROP_OLDEST")
+        self.connect = connect
+        self.config = config
+        self.exchange = exchange
+        self.policy = QueuePolicy(policy)
+        self.depth = 1 if self.policy == QueuePolicy.LATEST else depth
+        self.prefetch = prefetch
+        self.ack_every = min(ack_every, prefetch)
+        self.max_queue = max_queue
+
+        self._mailbox: Deque[Delivery] = deque()
+        self._lock = threading.Condition()
+        self._running = False
+        self._connection: Any = None
+        self._channel: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._unacked = 0
+        self._sequence: Optional[int] = None  # newest frame message received
+
+        self.received = 0
+        self.displayed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.stale = 0
+        self.acked = 0
+        self.ack_batches = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self._lag_total = 0.0
+        self.last_error: Optional[Exception] = None
+
+    def start(self) -> "FrameIngest":
+        """Connect and start consuming on a background thread."""
+        ready = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._consume, args=(ready,), name="flipdot-ingest", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self.last_error:
+            raise self.last_error
+        return self
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """Stop consuming and end display()."""
+        with self._lock:
+            self._running = False
+            self._lock.notify_all()
+        if self._connection is not None and self._channel is not None:
+            try:
+                self._connection.add_callback_threadsafe(self._channel.stop_consuming)
+            except Exception:
+                pass  # connection already gone
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Delivery]:
+        """Next frame for the display (the newest, under LATEST), or None on timeout or stop."""
+        with self._lock:
+            self._lock.wait_for(lambda: self._mailbox or not self._running, timeout)
+            return self._mailbox.popleft() if self._mailbox else None
+
+    def display(self, fill: Callable[[bytes], Any], fps: float = 5.0, frames: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Show frames as they arrive, at most fps a second, until stop() (or a number of frames).
+
+        Args:
+            fill: Sends a display buffer, e.g. core.fill
+            fps: Highest frame rate to show
+            frames: Frames to show before returning, None for no limit
+
+        Returns:
+            stats()
+        """
+        clock = FrameClock(1.0 / fps)
+        while self._running and (frames is None or self.displayed < frames):
+            waited = time.monotonic()
+            delivery = self.get(timeout=0.5)
+            if delivery is None:
+                continue
+            if time.monotonic() - waited > clock.period:
+                # Nothing came in for a while: show this frame now rather than on a stale deadline
+                clock.reset()
+            body, sent_at, received_at = delivery
+            try:
+                buffer = pixels_to_buffer(body, self.config)
+            except ValueError as e:
+                print(f"⚠️  Skipping frame: {e}")
+                with self._lock:
+                    self.rejected += 1
+                continue
+            fill(buffer)
+            self._record_lag(time.time() - sent_at if sent_at is not None else time.monotonic() - received_at)
+            clock.tick()
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Frame counts, mailbox and ack state, and lag in seconds."""
+        with self._lock:
+            return {
+                "policy": self.policy.value,
+                "depth": self.depth,
+                "queued": len(self._mailbox),
+                "received": self.received,
+                "displayed": self.displayed,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "stale": self.stale,
+                "acked": self.acked,
+                "ack_batches": self.ack_batches,
+                "unacked": self._unacked,
+                "lag": self.lag_last,
+                "max_lag": self.lag_max,
+                "mean_lag": self._lag_total / self.displayed if self.displayed else 0.0,
+                "last_error": repr(self.last_error) if self.last_error else None,
+            }
+
+    def _record_lag(self, lag: float) -> None:
+        with self._lock:
+            self.displayed += 1
+            self.lag_last = lag
+            self.lag_max = max(self.lag_max, lag)
+            self._lag_total += lag
+
+    def _consume(self, ready: threading.Event) -> None:
+        """Consumer thread: declare the queue and hand messages to the mailbox until stopped."""
+        try:
+            self._connection = self.connect()
+            channel = self._connection.channel()
+            channel.exchange_declare(exchange=self.exchange, exchange_type="fanout")
+            # A short queue dropping its oldest messages, so a stalled receiver never builds a backlog
+            queue = channel.queue_declare(queue="", exclusive=True, arguments={
+                "x-max-length": self.max_queue,
+                "x-overflow": "drop-head",
+            })
+            channel.queue_bind(exchange=self.exchange, queue=queue.method.queue)
+            channel.basic_qos(prefetch_count=self.prefetch)
+            channel.basic_consume(queue=queue.method.queue, on_message_callback=self._on_message, auto_ack=False)
+            self._channel = channel
+        except Exception as e:
+            self.last_error = e
+            self._running = False
+            ready.set()
+            return
+        ready.set()
+
+        try:
+            if self._running:
+                channel.start_consuming()
+        except Exception as e:
+            print(f"Frame ingestion stopped: {e}")
+            self.last_error = e
+        finally:
+            with self._lock:
+                self._running = False
+                self._lock.notify_all()
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+
+    def _on_message(self, channel: Any, method: Any, properties: Any, body: bytes) -> None:
+        """Consumer callback: keep the frame unless it is stale, ack every ack_every messages in one go."""
+        delivery = (bytes(body), published_at(properties), time.monotonic())
+        sequence = None
+        try:
+            if is_frame_message(body):
+                sequence = read_header(body).sequence
+            keep = True
+        except ValueError as e:
+            print(f"⚠️  Skipping frame: {e}")
+            keep = False
+        with self._lock:
+            self.received += 1
+            if not keep:
+                self.rejected += 1
+            elif sequence is not None and is_stale(sequence, self._sequence):
+                # Reordered or duplicated: something newer has already been received
+                self.stale += 1
+                keep = False
+            elif sequence is not None:
+                self._sequence = sequence
+            if keep:
+                if self.policy == QueuePolicy.LATEST:
+                    self.dropped += len(self._mailbox)
+                    self._mailbox.clear()
+                elif len(self._mailbox) >= self.depth:
+                    self._mailbox.popleft()
+                    self.dropped += 1
+                self._mailbox.append(delivery)
+                self._lock.notify_all()
+            self._unacked += 1
+            batch = self._unacked if self._unacked >= self.ack_every else 0
+            if batch:
+                self._unacked = 0
+                self.acked += batch
+                self.ack_batches += 1
+        if batch:
+            channel.basic_ack(delivery_tag=method.delivery_tag, multiple=True)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Frame Message Wire Format
+
+Binary messages for frames published to the "frames" exchange. The old format
+was one byte per pixel; a message is now a 14-byte header followed by the
+pixels at one bit each, row after row:
+
+    magic     b"FD"
+    version   1
+    encoding  RAW (packed bits), RLE (run lengths of the bits) or ZLIB
+    width, height                 display size in pixels (u16 each)
+    module_width, module_height   module layout (u8 each)
+    sequence  u32, increasing per frame, for skipping stale frames
+
+A 30×35 frame packs into 132 bytes instead of 1050; sparse frames are smaller
+still as RLE or zlib, and encode_frame() picks whichever is smallest.
+
+Usage:
+    message = encode_frame(canvas.pixels, sequence, module_width=5, module_height=7)
+    frame = decode_frame(message)
+    core.fill(frame.to_buffer())
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional
+
+import numpy as np
+
+try:
+    from .canvas import Canvas
+    from .display_config import DisplayConfig
+except ImportError:
+    from canvas import Canvas
+    from display_config import DisplayConfig
+
+MAGIC = b"FD"
+VERSION = 1
+HEADER = struct.Struct("<2sBBHHBBI")
+SEQUENCE_MODULUS = 1 << 32
+# A sequence number further behind than this is a restarted publisher, not a stale frame
+STALE_WINDOW = 1024
+RUN_LIMIT = 255  # longest run in one RLE byte; longer runs continue after an empty run
+
+
+class Encoding(IntEnum):
+    AUTO = -1  # smallest of the others, only when encoding
+    RAW = 0
+    RLE = 1
+    ZLIB = 2
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    version: int
+    encoding: Encoding
+    width: int
+    height: int
+    module_width: int
+    module_height: int
+    sequence: int
+
+    def matches(self, config: DisplayConfig) -> bool:
+        """Whether the frame is for a display of this size."""
+        return (self.width, self.height) == (config.total_width, config.total_height)
+
+
+@dataclass(frozen=True)
+class FrameMessage:
+    """A decoded frame message."""
+    header: FrameHeader
+    pixels: np.ndarray  # height x width, bool
+
+    @property
+    def sequence(self) -> int:
+        return self.header.sequence
+
+    def canvas(self) -> Canvas:
+        return Canvas.from_array(self.pixels, self.header.module_height)
+
+    def to_buffer(self) -> bytes:
+        """Display buffer for fill()."""
+        return self.canvas().to_bytes()
+
+
+def is_frame_message(message: bytes) -> bool:
+    """Whether a message is in this format rather than the old one byte per pixel."""
+    return message[:2] == MAGIC
+
+
+def read_header(message: bytes) -> FrameHeader:
+    """Header of a message, without decoding its pixels."""
+    if len(message) < HEADER.size or not is_frame_message(message):
+        raise ValueError("Not a frame message")
+    _, version, encoding, width, height, module_width, module_height, sequence = HEADER.unpack_from(message)
+    if version != VERSION:
+        raise ValueError(f"Unsupported frame message version {version}")
+    try:
+        encoding = Encoding(encoding)
+    except ValueError:
+        raise ValueError(f"Unknown frame encoding {encoding}") from None
+    return FrameHeader(version, encoding, width, height, module_width, module_height, sequence)
+
+
+def is_stale(sequence: int, last: Optional[int]) -> bool:
+    """
+    Whether a frame is no newer than the last one shown.
+
+    Sequence numbers wrap around; a frame far behind the last one is taken as a
+    publisher that restarted its count, and is not stale.
+    """
+    if last is None:
+        return False
+    behind = (last - sequence) % SEQUENCE_MODULUS
+    return behind < STALE_WINDOW
+
+
+def rle_encode(bits: np.ndarray) -> bytes:
+    """
+    Run lengths of a flat bit array, one byte each, starting with a run of 0s
+    (empty if the first bit is 1). Runs over RUN_LIMIT are split by empty runs
+    of the other value.
+    """
+    bits = np.asarray(bits, dtype=bool).ravel()
+    if bits.size == 0:
+        return b""
+    starts = np.concatenate(([0], np.flatnonzero(bits[1:] != bits[:-1]) + 1))
+    lengths = np.diff(np.append(starts, bits.size))
+    if bits[0]:
+        lengths = np.concatenate(([0], lengths))
+
+    # A run of L becomes RUN_LIMIT, 0, RUN_LIMIT, 0, ..., rest: 2k + 1 bytes for k = (L - 1) // RUN_LIMIT
+    splits = np.maximum(lengths - 1, 0) // RUN_LIMIT
+    pieces = 2 * splits + 1
+    run = np.repeat(np.arange(lengths.size), pieces)
+    piece = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    out = np.where(piece % 2 == 1, 0, RUN_LIMIT)
+    last = piece == 2 * splits[run]
+    out[last] = (lengths - splits * RUN_LIMIT)[run[last]]
+    return out.astype(np.uint8).tobytes()
+
+
+def rle_decode(data: bytes, size: int) -> np.ndarray:
+    """Flat bit array of a given size from rle_encode() output."""
+    runs = np.frombuffer(data, dtype=np.uint8)
+    bits = np.repeat((np.arange(runs.size) & 1).astype(bool), runs)
+    if bits.size != size:
+        raise ValueError(f"Run lengths cover {bits.size} pixels, expected {size}")
+    return bits
+
+
+def encode_frame(pixels: np.ndarray, sequence: int = 0, encoding: Encoding = Encoding.AUTO,
+                 module_width: int = 5, module_height: int = 7) -> bytes:
+    """
+    Frame message for a 2D pixel array (any non-zero value is a lit dot).
+
+    Args:
+        pixels: height x width array, e.g. Canvas.pixels
+        sequence: Frame number, taken modulo 2**32
+        encoding: Payload encoding, AUTO for the smallest
+        module_width, module_height: Module layout of the display
+    """
+    pixels = np.asarray(pixels)
+    if pixels.ndim != 2:
+        raise ValueError(f"Expected a 2D pixel array, got shape {pixels.shape}")
+    height, width = pixels.shape
+    bits = (pixels != 0).ravel()
+
+    payloads = {}
+    if encoding in (Encoding.AUTO, Encoding.RAW, Encoding.ZLIB):
+        payloads[Encoding.RAW] = np.packbits(bits).tobytes()
+    if encoding in (Encoding.AUTO, Encoding.ZLIB):
+        payloads[Encoding.ZLIB] = zlib.compress(payloads[Encoding.RAW], 9)
+    if encoding in (Encoding.AUTO, Encoding.RLE):
+        payloads[Encoding.RLE] = rle_encode(bits)
+    if encoding != Encoding.AUTO:
+        chosen = Encoding(encoding)
+    else:
+        chosen = min(payloads, key=lambda option: (len(payloads[option]), option))
+
+    header = HEADER.pack(MAGIC, VERSION, chosen, width, height, module_width, module_height,
+                         sequence % SEQUENCE_MODULUS)
+    return header + payloads[chosen]
+
+
+def decode_frame(message: bytes) -> FrameMessage:
+    """Decode a frame message. Raises ValueError for anything malformed."""
+    header = read_header(message)
+    payload = message[HEADER.size:]
+    size = header.width * header.height
+    if header.encoding == Encoding.RLE:
+        bits = rle_decode(payload, size)
+    else:
+        if header.encoding == Encoding.ZLIB:
+            try:
+                payload = zlib.decompress(payload)
+            except zlib.error as e:
+                raise ValueError(f"Bad zlib payload: {e}") from None
+        if len(payload) != (size + 7) // 8:
+            raise ValueError(f"Expected {(size + 7) // 8} bytes of pixels, got {len(payload)}")
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=size).astype(bool)
+    return FrameMessage(header, bits.reshape(header.height, header.width))
+
+
+def with_sequence(message: bytes, sequence: int) -> bytes:
+    """Copy of an encoded message under another sequence number, e.g. when republishing pre-encoded frames."""
+    offset = HEADER.size - 4
+    return message[:offset] + struct.pack("<I", sequence % SEQUENCE_MODULUS) + message[HEADER.size:]
+
+
+def encode_config_frame(pixels: np.ndarray, config: DisplayConfig, sequence: int = 0,
+                        encoding: Encoding = Encoding.AUTO) -> bytes:
+    """Frame message for a display configuration's module layout."""
+    return encode_frame(pixels, sequence, encoding, config.module_width, config.module_height)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Paced Frame Publisher
+
+Publishes a frame set or packed video to the "frames" exchange at a steady,
+reproducible rate, for driving downstream signs and load-testing receivers.
+Frames are converted and encoded as frame messages once, when loaded; each
+publish only stamps the sequence number. Publishing is paced by a FrameClock
+against monotonic deadlines, so the rate doesn't drift with publish time:
+
+    loop    cycle through the frames until stopped (or for a duration)
+    count   publish a fixed number of frames, cycling as needed, then stop
+    burst   publish several frames back to back at each deadline, keeping the
+            same average rate, to test how receivers cope with bunched frames
+
+With publisher confirms on, each publish waits for the broker to take the
+frame, and refused frames are counted.
+
+Usage:
+    python -m core.frame_publisher "frame??.bmp" --fps 5
+    python -m core.frame_publisher video/packed/clip.fdv --mode count --count 600 --confirm
+    python -m core.frame_publisher "frame??.bmp" --mode burst --burst 4 --fps 20 --duration 30
+"""
+
+import argparse
+import glob
+import json
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+try:
+    from .canvas import Canvas
+    from .display_config import DisplayConfig
+    from .frame_clock import FrameClock
+    from .frame_ingest import EXCHANGE, PUBLISHED_AT_HEADER, pika_connector
+    from .frame_message import encode_config_frame, encode_frame, with_sequence
+    from .local_broker import BasicProperties, LocalChannel
+except ImportError:
+    from canvas import Canvas
+    from display_config import DisplayConfig
+    from frame_clock import FrameClock
+    from frame_ingest import EXCHANGE, PUBLISHED_AT_HEADER, pika_connector
+    from frame_message import encode_config_frame, encode_frame, with_sequence
+    from local_broker import BasicProperties, LocalChannel
+
+
+class PublishMode(Enum):
+    LOOP = "loop"  # cycle through the frames until stopped or out of time
+    COUNT = "count"  # publish a fixed number of frames
+    BURST = "burst"  # several frames back to back at each deadline
+
+
+@dataclass
+class EncodedFrames:
+    """Frame messages encoded once, and the order they are published in."""
+    messages: List[bytes]  # one per distinct frame
+    order: List[int]  # message published at each tick
+    fps: Optional[float] = None  # the source's own frame rate, if it has one
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+def encode_images(pattern: str, config: DisplayConfig) -> EncodedFrames:
+    """
+    Encode image files (a glob pattern, in name order) for a display.
+
+    Images are scaled to the display and converted to 1-bit; identical frames
+    are encoded once.
+    """
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"No images match {pattern!r}")
+    size = (config.total_width, config.total_height)
+    messages: List[bytes] = []
+    order: List[int] = []
+    seen: Dict[bytes, int] = {}
+    for path in paths:
+        with Image.open(path) as image:
+            image = image.convert("1")
+            if image.size != size:
+                image = image.resize(size, Image.NEAREST)
+            message = encode_config_frame(np.asarray(image), config)
+        order.append(seen.setdefault(message, len(messages)))
+        if order[-1] == len(messages):
+            messages.append(message)
+    return EncodedFrames(messages, order)
+
+
+def encode_packed_video(path: str, module_width: int = 5) -> EncodedFrames:
+    """Encode a packed video (see video.packed_video): each stored frame once, held frames repeated."""
+    from video.packed_video import PackedVideo, preset_config
+
+    with PackedVideo(path) as video:
+        # Frames of a preset are laid out for its wiring; wire layout frames are read as they are
+        config = preset_config(video.config_name)
+        messages: List[bytes] = []
+        refs: Dict[int, int] = {}
+        order: List[int] = []
+        for ref, hold in video.timeline():
+            if ref not in refs:
+                frame = config.unpack_screen(video.frame(ref)) if config else video.frame(ref)
+                pixels = Canvas.from_bytes(frame, video.width, video.height, video.module_height).pixels
+                refs[ref] = len(messages)
+                messages.append(encode_frame(pixels, module_width=module_width, module_height=video.module_height))
+            order.extend([refs[ref]] * hold)
+        return EncodedFrames(messages, order, video.fps)
+
+
+class FramePublisher:
+    """Publishes pre-encoded frames to the message bus at a target frame rate."""
+
+    def __init__(self, connect: Callable[[], Any], frames: EncodedFrames, exchange: str = EXCHANGE,
+                 confirm: bool = False, stamp: bool = True):
+        """
+        Args:
+            connect: Opens a connection, e.g. pika_connector(host) or LocalBroker().connection
+            frames: Frames to publish
+            exchange: Fanout exchange to publish to
+            confirm: Use publisher confirms, waiting for the broker to take each frame
+            stamp: Add a published_at header, for receivers to report lag
+        """
+        if not frames.order:
+            raise ValueError("No frames to publish")
+        self.connect = connect
+        self.frames = frames
+        self.exchange = exchange
+        self.confirm = confirm
+        self.stamp = stamp
+        self.sequence = 0  # carried on across publish() calls so receivers never see a frame as stale
+        self._running = False
+
+        self.published = 0
+        self.refused = 0
+        self.bytes_published = 0
+        self.last_error: Optional[Exception] = None
+        self.last_stats: Optional[Dict[str, Any]] = None
+
+    def stop(self) -> None:
+        """End a publish() running on another thread after its current deadline."""
+        self._running = False
+
+    def publish(self, fps: Optional[float] = None, mode: PublishMode = PublishMode.LOOP, count: Optional[int] = None,
+                burst: int = 1, duration: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Publish frames until the mode's end, a duration, or stop().
+
+        Args:
+            fps: Target frames per second (default: the source's own rate, else 12)
+            mode: LOOP, COUNT or BURST
+            count: Frames to publish; required for COUNT, a limit for the others
+            burst: Frames per deadline for BURST
+            duration: Seconds to publish for, None for no limit
+
+        Returns:
+            stats()
+        """
+        mode = PublishMode(mode)
+        fps = fps or self.frames.fps or 12.0
+        if fps <= 0:
+            raise ValueError("Frame rate must be positive")
+        if mode == PublishMode.COUNT and count is None:
+            raise ValueError("Count mode needs a frame count")
+        burst = burst if mode == PublishMode.BURST else 1
+        if burst < 1:
+            raise ValueError("Burst size must be at least 1")
+
+        clock: Optional[FrameClock] = None
+        connection = self.connect()
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(exchange=self.exchange, exchange_type="fanout")
+            if self.confirm:
+                channel.confirm_delivery()
+            properties = BasicProperties if isinstance(channel, LocalChannel) else _pika_properties()
+
+            self.published = self.refused = self.bytes_published = 0
+            self._running = True
+            clock = FrameClock(burst / fps)
+            tick = 0
+            # Each burst gets its whole period, so the rate is frames over elapsed time however the run ends
+            while self._running and (count is None or tick < count):
+                if duration is not None and clock.monotonic() - clock.start >= duration:
+                    break
+                for _ in range(burst if count is None else min(burst, count - tick)):
+                    self._publish_one(channel, properties, tick)
+                    tick += 1
+                clock.tick()
+        finally:
+            self._running = False
+            if clock is not None:
+                self.last_stats = self._stats(clock, fps, burst, mode)
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return self.last_stats
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Stats of the last publish(), None before the first."""
+        return self.last_stats
+
+    def _publish_one(self, channel: Any, properties: Any, tick: int) -> None:
+        frames = self.frames
+        self.sequence += 1
+        body = with_sequence(frames.messages[frames.order[tick % len(frames.order)]], self.sequence)
+        headers = {PUBLISHED_AT_HEADER: time.time()} if self.stamp else None
+        try:
+            channel.basic_publish(exchange=self.exchange, routing_key="", body=body,
+                                  properties=properties(headers=headers))
+        except Exception as e:
+            # Under confirms a nack raises; anything on a closed channel is fatal
+            if not self.confirm or not channel.is_open:
+                raise
+            self.refused += 1
+            self.last_error = e
+            return
+        self.published += 1
+        self.bytes_published += len(body)
+
+    def _stats(self, clock: FrameClock, fps: float, burst: int, mode: PublishMode) -> Dict[str, Any]:
+        timing = clock.stats()
+        elapsed = timing["elapsed"]
+        sent = self.published + self.refused
+        return {
+            "mode": mode.value,
+            "target_fps": fps,
+            "burst": burst,
+            "published": self.published,
+            "confirmed": self.published if self.confirm else None,
+            "refused": self.refused,
+            "bytes": self.bytes_published,
+            "bytes_per_frame": self.bytes_published / self.published if self.published else 0.0,
+            "elapsed": elapsed,
+            "publish_fps": sent / elapsed if elapsed > 0 else 0.0,
+            "late": timing["late"],
+            "skipped_deadlines": timing["skipped_deadlines"],
+            "max_lateness": timing["max_lateness"],
+            "drift": timing["drift"],
+            "last_error": repr(self.last_error) if self.last_error else None,
+        }
+
+
+def _pika_properties() -> Callable[..., Any]:
+    import pika
+    return pika.BasicProperties
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish frames to the message bus at a steady rate")
+    parser.add_argument("source", help="glob pattern of images, or a packed video file")
+    parser.add_argument("--host", default="localhost", help="RabbitMQ server")
+    parser.add_argument("--exchange", default=EXCHANGE)
+    parser.add_argument("--fps", type=float, help="target frame rate (default: the video's, or 12)")
+    parser.add_argument("--mode", default="loop", choices=[mode.value for mode in PublishMode])
+    parser.add_argument("--count", type=int, help="frames to publish (required for --mode count)")
+    parser.add_argument("--burst", type=int, default=4, help="frames per deadline in burst mode")
+    parser.add_argument("--duration", type=float, help="seconds to publish for")
+    parser.add_argument("--confirm", action="store_true", help="use publisher confirms")
+    parser.add_argument("--config", default="core", help="display the images are for: core or a preset name")
+    args = parser.parse_args()
+
+    if args.source.endswith(".fdv"):
+        frames = encode_packed_video(args.source)
+    else:
+        from video.packed_video import display_config
+        frames = encode_images(args.source, display_config(args.config))
+    print(f"Encoded {len(frames.messages)} distinct frames, {len(frames)} per cycle, "
+          f"{sum(map(len, frames.messages)) // len(frames.messages)} bytes each on average")
+
+    publisher = FramePublisher(pika_connector(args.host), frames, args.exchange, args.confirm)
+    try:
+        publisher.publish(args.fps, PublishMode(args.mode), args.count, args.burst, args.duration)
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(publisher.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Glyph Atlas for Flipdot Text Rendering
+
+Compiles a character dictionary once into a contiguous atlas of column bytes
+with offset and width tables. A string renders with a single join instead of
+repeated bytes concatenation, and whole rendered strings are kept in a bounded
+LRU cache so playlist messages shown over and over only render once.
+"""
+
+import hashlib
+from functools import lru_cache
+from itertools import repeat
+from typing import Callable, Dict, Mapping, Optional
+
+DEFAULT_CACHE_SIZE = 256  # rendered strings kept per atlas
+
+
+class GlyphAtlas:
+    """Character dictionary compiled for fast rendering."""
+
+    def __init__(self, glyphs: Mapping[str, bytes], fallback: bytes = b'\x00',
+                 key: Optional[Callable[[str], str]] = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Compile the glyphs.
+
+        Args:
+            glyphs: Column bytes for each character
+            fallback: Glyph used for characters missing from glyphs
+            key: Applied to each character before lookup (e.g. str.upper)
+            cache_size: Number of rendered strings to remember
+        """
+        self.fallback = bytes(fallback)
+        self.key = key
+
+        atlas = bytearray()
+        self.offsets: Dict[str, int] = {}
+        self.widths: Dict[str, int] = {}
+        for char, glyph in glyphs.items():
+            self.offsets[char] = len(atlas)
+            self.widths[char] = len(glyph)
+            atlas += glyph
+        self.atlas = bytes(atlas)
+
+        # Each glyph as its own slice of the atlas, ready to be joined
+        self._glyphs = {char: self.atlas[offset:offset + self.widths[char]]
+                        for char, offset in self.offsets.items()}
+        self._cached_render = lru_cache(maxsize=cache_size)(self._render)
+
+    @property
+    def fingerprint(self) -> str:
+        """Changes whenever any glyph does, for keying caches of rendered output."""
+        digest = hashlib.sha1(self.atlas)
+        digest.update(repr(sorted(self.offsets.items())).encode("utf-8"))
+        digest.update(self.fallback)
+        return digest.hexdigest()[:16]
+
+    def _chars(self, message: str):
+        return map(self.key, message) if self.key else message
+
+    def render(self, message: str, delim: bytes = b'\x00', dmult: int = 1) -> bytes:
+        """Column bytes for a string, glyphs separated by delim * dmult."""
+        # bytes() so a bytearray delimiter (as getbytes callers may pass) can key the cache
+        return self._cached_render(message, bytes(delim), dmult)
+
+    def _render(self, message: str, delim: bytes, dmult: int) -> bytes:
+        separator = delim * dmult if dmult > 0 else b''
+        return separator.join(map(self._glyphs.get, self._chars(message), repeat(self.fallback)))
+
+    def width(self, message: str, delim: bytes = b'\x00', dmult: int = 1) -> int:
+        """Rendered length of a string in columns, without rendering it."""
+        if not message:
+            return 0
+        fallback = len(self.fallback)
+        glyphs = sum(self.widths.get(char, fallback) for char in self._chars(message))
+        return glyphs + (len(message) - 1) * len(delim) * max(dmult, 0)
+
+    def cache_info(self):
+        """Hit and miss counts of the rendered string cache."""
+        return self._cached_render.cache_info()
+
+    def clear_cache(self) -> None:
+        self._cached_render.cache_clear()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+In-Process Message Broker
+
+A stand-in for the RabbitMQ server that frame publishers and receivers talk
+to, for tests and benchmarks without a broker: fanout exchanges, queues with
+x-max-length (oldest messages dropped), prefetch limits and acks, behind the
+part of pika's BlockingConnection API the flipdot code uses. Each consumer
+runs its callbacks on the thread that calls start_consuming(), as with pika.
+
+Usage:
+    broker = LocalBroker()
+    ingest = FrameIngest(broker.connection, config)
+    broker.connection().channel().basic_publish("frames", "", body)
+"""
+
+import itertools
+import threading
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class BasicProperties(SimpleNamespace):
+    """Message properties, like pika.BasicProperties."""
+
+    def __init__(self, headers: Optional[Dict[str, Any]] = None, timestamp: Optional[int] = None, **kwargs: Any):
+        super().__init__(headers=headers, timestamp=timestamp, **kwargs)
+
+
+class _Queue:
+    def __init__(self, name: str, max_length: Optional[int]):
+        self.name = name
+        self.max_length = max_length
+        self.messages: Deque[Tuple[bytes, BasicProperties]] = deque()
+        self.dropped = 0
+        self.published = 0
+
+
+class LocalBroker:
+    """Exchanges and queues shared by every connection made from it."""
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._exchanges: Dict[str, List[str]] = {}
+        self._queues: Dict[str, _Queue] = {}
+        self._names = itertools.count(1)
+
+    def connection(self) -> "LocalConnection":
+        return LocalConnection(self)
+
+    def queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Depth, messages published into and dropped from each queue."""
+        with self._lock:
+            return {name: {"messages": len(queue.messages), "published": queue.published, "dropped": queue.dropped}
+                    for name, queue in self._queues.items()}
+
+    def _declare_queue(self, name: str, arguments: Optional[Dict[str, Any]], passive: bool) -> _Queue:
+        with self._lock:
+            if passive and name not in self._queues:
+                raise KeyError(f"No queue {name!r}")
+            name = name or f"amq.gen-{next(self._names)}"
+            if name not in self._queues:
+                self._queues[name] = _Queue(name, (arguments or {}).get("x-max-length"))
+            return self._queues[name]
+
+    def _publish(self, exchange: str, body: bytes, properties: BasicProperties) -> None:
+        with self._lock:
+            if exchange not in self._exchanges:
+                raise KeyError(f"No exchange {exchange!r}")
+            for name in self._exchanges[exchange]:
+                queue = self._queues[name]
+                queue.messages.append((bytes(body), properties))
+                queue.published += 1
+                if queue.max_length is not None and len(queue.messages) > queue.max_length:
+                    queue.messages.popleft()
+                    queue.dropped += 1
+            self._lock.notify_all()
+
+
+class LocalConnection:
+    """One client connection, like pika.BlockingConnection."""
+
+    def __init__(self, broker: LocalBroker):
+        self.broker = broker
+        self.is_open = True
+        self._channels: List[LocalChannel] = []
+
+    def channel(self) -> "LocalChannel":
+        channel = LocalChannel(self)
+        self._channels.append(channel)
+        return channel
+
+    def add_callback_threadsafe(self, callback: Callable[[], Any]) -> None:
+        """Run a callback on the consuming thread."""
+        with self.broker._lock:
+            for channel in self._channels:
+                channel._callbacks.append(callback)
+                break
+            self.broker._lock.notify_all()
+
+    def close(self) -> None:
+        with self.broker._lock:
+            self.is_open = False
+            for channel in self._channels:
+                channel._consuming = False
+                # Unacked messages go back to the front of their queue
+                for queue, body, properties in reversed(list(channel._unacked.values())):
+                    queue.messages.appendleft((body, properties))
+                channel._unacked.clear()
+            self.broker._lock.notify_all()
+
+
+class LocalChannel:
+    """A channel on a LocalConnection, like pika's BlockingChannel."""
+
+    def __init__(self, connection: LocalConnection):
+        self.connection = connection
+        self._broker = connection.broker
+        self._prefetch = 0
+        self._consumers: Dict[str, Tuple[_Queue, Callable[..., Any], bool]] = {}
+        self._unacked: Dict[int, Tuple[_Queue, bytes, BasicProperties]] = {}
+        self._tags = itertools.count(1)
+        self._callbacks: List[Callable[[], Any]] = []
+        self._consuming = False
+        self._confirming = False
+
+    def exchange_declare(self, exchange: str, exchange_type: str = "fanout", **kwargs: Any) -> None:
+        if exchange_type != "fanout":
+            raise ValueError("The local broker only has fanout exchanges")
+        with self._broker._lock:
+            self._broker._exchanges.setdefault(exchange, [])
+
+    def queue_declare(self, queue: str = "", passive: bool = False, exclusive: bool = False,
+                      arguments: Optional[Dict[str, Any]] = None, **kwargs: Any) -> SimpleNamespace:
+        declared = self._broker._declare_queue(queue, arguments, passive)
+        return SimpleNamespace(method=SimpleNamespace(queue=declared.name, message_count=len(declared.messages)))
+
+    def queue_bind(self, queue: str, exchange: str, routing_key: Optional[str] = None, **kwargs: Any) -> None:
+        with self._broker._lock:
+            bound = self._broker._exchanges[exchange]
+            if queue not in bound:
+                bound.append(queue)
+
+    def confirm_delivery(self) -> None:
+        """Publisher confirms: every publish to an existing exchange is confirmed."""
+        self._confirming = True
+
+    def basic_qos(self, prefetch_count: int = 0, **kwargs: Any) -> None:
+        self._prefetch = prefetch_count
+
+    def basic_consume(self, queue: str, on_message_callback: Callable[..., Any], auto_ack: bool = False,
+                      **kwargs: Any) -> str:
+        tag = f"ctag-{len(self._consumers) + 1}"
+        self._consumers[tag] = (self._broker._queues[queue], on_message_callback, auto_ack)
+        return tag
+
+    def basic_publish(self, exchange: str, routing_key: str, body: bytes,
+                      properties: Optional[BasicProperties] = None, **kwargs: Any) -> None:
+        self._broker._publish(exchange, body, properties or BasicProperties())
+
+    def basic_ack(self, delivery_tag: int = 0, multiple: bool = False) -> None:
+        with self._broker._lock:
+            tags = [tag for tag in self._unacked if tag <= delivery_tag] if multiple else [delivery_tag]
+            for tag in tags:
+                self._unacked.pop(tag, None)
+            self._broker._lock.notify_all()
+
+    def stop_consuming(self) -> None:
+        self._consuming = False
+
+    def start_consuming(self) -> None:
+        """Deliver messages to the consumers' callbacks on this thread until stop_consuming()."""
+        self._consuming = True
+        while True:
+            with self._broker._lock:
+                self._broker._lock.wait_for(lambda: self._callbacks or not self._consuming or self._ready())
+                callbacks, self._callbacks = self._callbacks, []
+                delivery = None if callbacks or not self._consuming else self._take()
+            for callback in callbacks:
+                callback()
+            if delivery:
+                callback, method, properties, body = delivery
+                callback(self, method, properties, body)
+            if not self._consuming:
+                return
+
+    @property
+    def is_open(self) -> bool:
+        return self.connection.is_open
+
+    def close(self) -> None:
+        self._consuming = False
+
+    def _ready(self) -> bool:
+        """Whether a message can be delivered within the prefetch limit."""
+        if self._prefetch and len(self._unacked) >= self._prefetch:
+            return False
+        return any(queue.messages for queue, _, _ in self._consumers.values())
+
+    def _take(self) -> Optional[Tuple[Callable[..., Any], SimpleNamespace, BasicProperties, bytes]]:
+        if not self._ready():
+            return None
+        for consumer_tag, (queue, callback, auto_ack) in self._consumers.items():
+            if queue.messages:
+                body, properties = queue.messages.popleft()
+                tag = next(self._tags)
+                if not auto_ack:
+                    self._unacked[tag] = (queue, body, properties)
+                method = SimpleNamespace(delivery_tag=tag, consumer_tag=consumer_tag, redelivered=False)
+                return callback, method, properties, body
+        return None
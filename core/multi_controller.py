@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Multi-Controller Flipdot Display
+
+A sign too big for one 38400 baud link is split between several controllers,
+each on its own serial port and owning one rectangular region of a single
+logical display. fill() cuts a frame into the regions, writes them on per-port
+threads at the same time and waits at a frame barrier until every controller
+has its part, so all regions change together and a wall twice the size
+refreshes as fast as one controller's share.
+
+Usage:
+    wall = MultiControllerDisplay.side_by_side("current", ["/dev/ttyUSB0", "/dev/ttyUSB1"])
+    wall.fill(Canvas.for_config(wall.config).invert())
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import serial
+
+try:
+    from .canvas import Canvas
+    from .display_config import DisplayConfig
+    from .reconfigurable_flipdot import DISPLAY_CONFIGS, FallbackSerial, HEADLESS
+except ImportError:
+    from canvas import Canvas
+    from display_config import DisplayConfig
+    from reconfigurable_flipdot import DISPLAY_CONFIGS, FallbackSerial, HEADLESS
+
+BARRIER_TIMEOUT = 10.0  # seconds a frame may take on the slowest port before the others stop waiting
+
+
+@dataclass
+class ControllerRegion:
+    """One controller's part of the logical display."""
+    config: Union[str, DisplayConfig]  # preset name or configuration of this controller's modules
+    port: Optional[str] = None  # serial port, None for a simulated controller
+    x: int = 0  # left column in the logical display
+    y: int = 0  # top pixel row in the logical display, a multiple of the module height
+    baud: int = 38400
+
+    def __post_init__(self):
+        if isinstance(self.config, str):
+            self.config = DISPLAY_CONFIGS[self.config]
+
+
+class _Controller:
+    """A region's port, encoder and writer thread."""
+
+    def __init__(self, region: ControllerRegion, display_width: int, port: Any):
+        config = region.config
+        self.region = region
+        self.port = port
+        self.encoder = config.create_encoder()
+        self.piece = b''
+        self.fillmask = 127
+
+        # Logical message slice for each of the region's visible module rows
+        first_row = region.y // config.module_height
+        self.slices = [slice((first_row + row) * display_width + region.x,
+                             (first_row + row) * display_width + region.x + config.screen_width)
+                       for row in range(config.screen_rows)]
+
+        self.frames = 0
+        self.bytes_written = 0
+        self.busy_time = 0.0
+        self.last_error: Optional[Exception] = None
+        self.sending = False
+        self.thread: Optional[threading.Thread] = None
+
+    def cut(self, message: bytes) -> bytes:
+        """This region's display buffer out of the logical one, laid out as its wiring reads it."""
+        return self.region.config.pack_screen(b''.join(message[s] for s in self.slices))
+
+    def send(self) -> None:
+        """Write the current piece and wait for the port to drain."""
+        started = time.perf_counter()
+        self.sending = True
+        try:
+            update = self.encoder.encode_delta(self.piece, self.fillmask)
+            if update:
+                self.port.write(update)
+                if hasattr(self.port, "flush"):
+                    self.port.flush()
+                self.bytes_written += len(update)
+            self.frames += 1
+        except Exception as e:
+            # The controller's state is unknown after a failed write
+            print(f"Serial write failed on {self.region.port}: {e}")
+            self.last_error = e
+            self.encoder.forget()
+        self.sending = False
+        self.busy_time += time.perf_counter() - started
+
+
+class MultiControllerDisplay:
+    """One logical display driven through several controllers at once."""
+
+    def __init__(self, regions: Sequence[ControllerRegion], name: str = "Multi-controller display",
+                 headless: bool = HEADLESS):
+        """
+        Open every controller's port and start its writer thread.
+
+        Args:
+            regions: Controllers and where their modules sit; regions may not overlap
+            name: Name of the logical display configuration
+            headless: Simulate missing ports with silent virtual panels instead of printing them
+        """
+        if not regions:
+            raise ValueError("A display needs at least one controller")
+        module_width = regions[0].config.module_width
+        module_height = regions[0].config.module_height
+        for region in regions:
+            if (region.config.module_width, region.config.module_height) != (module_width, module_height):
+                raise ValueError("All controllers must use the same module size")
+            if region.x < 0 or region.y < 0 or region.y % module_height:
+                raise ValueError(f"Region at ({region.x}, {region.y}) must start on a module row")
+
+        width = max(region.x + region.config.screen_width for region in regions)
+        height = max(region.y + region.config.screen_height for region in regions)
+        self.config = DisplayConfig(name, -(-width // module_width), height // module_height,
+                                    module_width, module_height)
+        self._check_overlap(regions)
+
+        self.controllers = [_Controller(region, self.config.total_width, self._open(region, headless))
+                            for region in regions]
+        self.frames = 0
+        self.timeouts = 0
+        self.max_frame_time = 0.0
+        self._closing = False
+        self._lock = threading.Lock()
+        # Writers and fill() meet here twice per frame: once to start, once when all parts are out
+        self._barrier = threading.Barrier(len(self.controllers) + 1)
+        # After a frame times out, writers park here until fill() has reset the barrier
+        self._recovery = threading.Condition()
+        self._parked = 0
+        for index, controller in enumerate(self.controllers):
+            controller.thread = threading.Thread(target=self._run, args=(controller,),
+                                                 name=f"flipdot-controller-{index}", daemon=True)
+            controller.thread.start()
+
+        print(f"Initializing display: {name} ({self.config.total_width}×{self.config.total_height}) "
+              f"on {len(self.controllers)} controllers")
+
+    @classmethod
+    def side_by_side(cls, config: Union[str, DisplayConfig], ports: Sequence[Optional[str]],
+                     baud: int = 38400, **kwargs) -> "MultiControllerDisplay":
+        """Identical controllers in a row, left to right in the order of ports."""
+        if isinstance(config, str):
+            config = DISPLAY_CONFIGS[config]
+        regions = [ControllerRegion(config, port, x=i * config.screen_width, baud=baud)
+                   for i, port in enumerate(ports)]
+        return cls(regions, **kwargs)
+
+    def _check_overlap(self, regions: Sequence[ControllerRegion]) -> None:
+        owners: Dict[int, int] = {}
+        width = self.config.total_width
+        for index, region in enumerate(regions):
+            first_row = region.y // self.config.module_height
+            for row in range(first_row, first_row + region.config.screen_rows):
+                for x in range(region.x, region.x + region.config.screen_width):
+                    if owners.setdefault(row * width + x, index) != index:
+                        raise ValueError(f"Regions {owners[row * width + x]} and {index} overlap at column {x}")
+
+    @staticmethod
+    def _open(region: ControllerRegion, headless: bool) -> Any:
+        if region.port:
+            try:
+                port = serial.Serial(region.port, region.baud, timeout=1)
+                print(f"Connected to flipdot controller on {region.port}")
+                return port
+            except (serial.SerialException, OSError):
+                print(f"Serial port {region.port} not available, simulating that controller")
+        if headless:
+            try:
+                from .virtual_panel import VirtualPanel
+            except ImportError:
+                from virtual_panel import VirtualPanel
+            return VirtualPanel(region.config)
+        return FallbackSerial(region.config)
+
+    def _run(self, controller: _Controller) -> None:
+        """Writer thread: send this controller's part of each frame between the two barrier waits."""
+        while True:
+            try:
+                self._barrier.wait()
+                if self._closing:
+                    return
+                controller.send()
+                self._barrier.wait()
+            except threading.BrokenBarrierError:
+                self._park()
+                if self._closing:
+                    return
+
+    def _park(self) -> None:
+        """Writer thread: wait out a broken frame until fill() has reset the barrier."""
+        with self._recovery:
+            self._parked += 1
+            self._recovery.notify_all()
+            self._recovery.wait_for(lambda: not self._barrier.broken or self._closing)
+
+    def _recover(self) -> bool:
+        """
+        Reset the barrier once every writer has finished its part of a broken frame.
+
+        Returns:
+            False if a controller is still busy after BARRIER_TIMEOUT
+        """
+        with self._recovery:
+            if not self._recovery.wait_for(lambda: self._parked == len(self.controllers), BARRIER_TIMEOUT):
+                return False
+            self._parked = 0
+            self._barrier.reset()
+            self._recovery.notify_all()
+        return True
+
+    def _busy_ports(self) -> List[Optional[str]]:
+        return [controller.region.port for controller in self.controllers if controller.sending]
+
+    def fill(self, message: Union[bytes, Canvas], fillmask: int = 127) -> Union[bytes, Canvas]:
+        """
+        Show a frame on every controller at once.
+
+        A frame that takes longer than BARRIER_TIMEOUT on some port is counted
+        in timeouts and the controllers are brought back in step for the next
+        one. If a port stays stuck, this and every later fill() raise until it
+        comes back.
+
+        Args:
+            message: Logical display buffer (module row after module row), or a Canvas
+            fillmask: Bitmask for filtering display content
+
+        Returns:
+            The displayed message
+        """
+        buffer = bytes(message)
+        if len(buffer) < self.config.wire_columns:
+            buffer += bytes(self.config.wire_columns - len(buffer))
+
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("Display is closed")
+            if self._barrier.broken and not self._recover():
+                raise RuntimeError(f"Controllers on {self._busy_ports()} are still stuck on an earlier frame")
+            started = time.perf_counter()
+            for controller in self.controllers:
+                controller.piece = controller.cut(buffer)
+                controller.fillmask = fillmask
+            try:
+                self._barrier.wait(BARRIER_TIMEOUT)  # go
+                self._barrier.wait(BARRIER_TIMEOUT)  # every part written
+            except threading.BrokenBarrierError:
+                # The slow parts still go out; wait for them, then start the next frame in step
+                self.timeouts += 1
+                print(f"⚠️  Frame took over {BARRIER_TIMEOUT}s on {self._busy_ports()}, resynchronizing")
+                if not self._recover():
+                    raise RuntimeError(f"Controllers on {self._busy_ports()} are stuck writing a frame") from None
+            self.frames += 1
+            self.max_frame_time = max(self.max_frame_time, time.perf_counter() - started)
+        return message
+
+    def clear(self) -> None:
+        self.fill(b'')
+
+    def use_virtual_panel(self, history: int = 0, capture: bool = False) -> List[Any]:
+        """
+        Send every controller's frames to its own silent in-memory panel.
+
+        Returns:
+            The VirtualPanels, in region order
+        """
+        try:
+            from .virtual_panel import VirtualPanel
+        except ImportError:
+            from virtual_panel import VirtualPanel
+
+        with self._lock:
+            for controller in self.controllers:
+                controller.port = VirtualPanel(controller.region.config, history, capture)
+                controller.encoder.forget()
+        return [controller.port for controller in self.controllers]
+
+    def snapshot(self) -> Canvas:
+        """What the whole display shows, assembled from simulated controllers."""
+        canvas = Canvas.for_config(self.config)
+        for controller in self.controllers:
+            if hasattr(controller.port, "snapshot"):
+                canvas.blit(controller.port.snapshot(), controller.region.x, controller.region.y)
+        return canvas
+
+    def stats(self) -> Dict[str, Any]:
+        """Frame count, slowest frame and per-controller throughput."""
+        return {
+            "frames": self.frames,
+            "timeouts": self.timeouts,
+            "max_frame_time": self.max_frame_time,
+            "controllers": [{
+                "port": controller.region.port,
+                "frames": controller.frames,
+                "bytes_written": controller.bytes_written,
+                "busy_time": controller.busy_time,
+                "last_error": repr(controller.last_error) if controller.last_error else None,
+            } for controller in self.controllers],
+        }
+
+    def close(self) -> None:
+        """Stop the writer threads and close the ports."""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            with self._recovery:
+                self._recovery.notify_all()
+            if not self._barrier.broken:
+                try:
+                    self._barrier.wait(BARRIER_TIMEOUT)
+                except threading.BrokenBarrierError:
+                    pass
+        for controller in self.controllers:
+            controller.thread.join(BARRIER_TIMEOUT)
+            if hasattr(controller.port, "close"):
+                controller.port.close()
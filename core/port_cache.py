@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Serial Port Cache for Flipdot Displays
+
+Remembers which USB serial adapter the display was found on, keyed by the
+adapter's VID/PID/serial number rather than its device path, so the next start
+can go straight to it even if the OS renumbered /dev/ttyUSB* in between.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+# State file location, overridable for multiple installs on one host
+PORT_CACHE_FILE = os.environ.get(
+    "FLIPDOT_PORT_CACHE", os.path.join(os.path.expanduser("~"), ".flipdot_ports.json")
+)
+
+
+def device_key(port_info: Any) -> Optional[str]:
+    """
+    Stable identity for a serial port from serial.tools.list_ports.
+
+    Returns:
+        "VID:PID:serial" for USB adapters, None for ports without USB ids
+    """
+    vid = getattr(port_info, "vid", None)
+    pid = getattr(port_info, "pid", None)
+    if vid is None or pid is None:
+        return None
+    serial_number = getattr(port_info, "serial_number", None) or ""
+    return f"{vid:04x}:{pid:04x}:{serial_number}"
+
+
+def load_cache(path: str = PORT_CACHE_FILE) -> Dict[str, Dict[str, Any]]:
+    """Cached displays by device key, empty if the file is missing or unreadable."""
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def remember_port(key: Optional[str], device: str, baud: int, path: str = PORT_CACHE_FILE) -> None:
+    """Record that a display answered on this adapter. Failures are not fatal."""
+    if key is None:
+        return
+    cache = load_cache(path)
+    cache[key] = {"device": device, "baud": baud, "found": time.time()}
+    try:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not save port cache: {e}")
+
+
+def forget_port(key: Optional[str], path: str = PORT_CACHE_FILE) -> None:
+    """Drop an adapter that no longer answers like a display."""
+    cache = load_cache(path)
+    if key not in cache:
+        return
+    del cache[key]
+    try:
+        with open(path, "w") as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
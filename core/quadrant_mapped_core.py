@@ -12,11 +12,9 @@ Fixed to work with your actual display buffer mapping:
 # Import all your existing core functionality
 try:
     from core.core import *
-    print("✅ Imported existing core functions")
 except ImportError:
     try:
         from .core import *
-        print("✅ Imported existing core functions (relative)")
     except ImportError:
         print("❌ Could not import core.core - make sure it's in the core/ folder")
 
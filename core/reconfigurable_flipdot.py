@@ -7,48 +7,44 @@ the exact same protocol as the original working core.py, but with
 configurable dimensions.
 """
 
+import os
 import serial
 import random
 import time
 from enum import Enum
 from typing import List, Dict, Union, Optional, Tuple, ByteString
-from dataclasses import dataclass
+
+try:
+    from .animation_planner import AnimationPlanner, LinkModel
+    from .display_config import DisplayConfig, ModuleRowWiring, STRAIGHT
+    from .frame_clock import FrameClock
+    from .frame_encoder import FrameEncoder
+    from .glyph_atlas import GlyphAtlas
+    from .serial_writer import QueuePolicy, SerialWriter
+    from .wire_capture import WireRecorder
+except ImportError:
+    from animation_planner import AnimationPlanner, LinkModel
+    from display_config import DisplayConfig, ModuleRowWiring, STRAIGHT
+    from frame_clock import FrameClock
+    from frame_encoder import FrameEncoder
+    from glyph_atlas import GlyphAtlas
+    from serial_writer import QueuePolicy, SerialWriter
+    from wire_capture import WireRecorder
 
 __author__ = 'boselowitz (protocol compatible version)'
 
-# Display configuration presets
-@dataclass
-class DisplayConfig:
-    """Configuration for a flipdot display setup."""
-    name: str
-    modules_wide: int
-    modules_high: int
-    module_width: int = 5  # pixels per module width
-    module_height: int = 7  # pixels per module height
-    
-    @property
-    def total_width(self) -> int:
-        return self.modules_wide * self.module_width
-    
-    @property
-    def total_height(self) -> int:
-        return self.modules_high * self.module_height
-    
-    @property
-    def total_pixels(self) -> int:
-        return self.total_width * self.total_height
-    
-    @property
-    def row_break(self) -> int:
-        """Where display wraps to next row (for original protocol compatibility)."""
-        return self.total_width
+# Odd module rows are fed backwards, one module short of the row start
+def _backward_row(modules_wide: int, module_width: int = 5) -> ModuleRowWiring:
+    return ModuleRowWiring(mirror_columns=True, source_offset=(modules_wide - 1) * module_width)
 
 
 # Predefined configurations
 DISPLAY_CONFIGS = {
-    "current": DisplayConfig("Current 2x6", 6, 2),  # 30w × 14h
+    "current": DisplayConfig("Current 2x6", 6, 2,  # 30w × 14h
+                             wiring=(STRAIGHT, _backward_row(6))),
     "original": DisplayConfig("Original 21x1", 21, 1),  # 105w × 7h  
-    "square": DisplayConfig("Square 4x4", 4, 4),  # 20w × 28h
+    "square": DisplayConfig("Square 4x4", 4, 4,  # 20w × 28h
+                            wiring=(STRAIGHT, _backward_row(4), STRAIGHT, _backward_row(4))),
     "wide": DisplayConfig("Wide 8x1", 8, 1),  # 40w × 7h
 }
 
@@ -168,6 +164,9 @@ CHAR_DICT = {
     '}': b'A6\x08'
 }
 
+# Characters are looked up in upper case
+TEXT_ATLAS = GlyphAtlas(CHAR_DICT, CHAR_DICT.get('?', b'\x00'), key=str.upper)
+
 # Use EXACT serial commands from your original working core.py
 RESET = b'\x81'
 ROW1 = b'\x82'  # This matches your working system
@@ -178,6 +177,9 @@ BITMASK = [1, 2, 4, 8, 0x10, 0x20, 0x40]  # For 7-pixel high modules
 
 DEFAULT_DELAY = 0.2
 
+# Simulate silently instead of printing the screen when no display is attached
+HEADLESS = bool(os.environ.get("FLIPDOT_HEADLESS"))
+
 
 class FallbackSerial:
     """Simulates the flipdot display when hardware is not available."""
@@ -252,7 +254,8 @@ class FallbackSerial:
 class ReconfigurableFlipdotDisplay:
     """Reconfigurable controller using original protocol."""
     
-    def __init__(self, config_name: str = DEFAULT_CONFIG, port: str = '/dev/tty.usbserial-A3000lDq', baud: int = 38400):
+    def __init__(self, config_name: str = DEFAULT_CONFIG, port: str = '/dev/tty.usbserial-A3000lDq', baud: int = 38400,
+                 headless: bool = HEADLESS):
         """
         Initialize the flipdot display.
         
@@ -260,16 +263,88 @@ class ReconfigurableFlipdotDisplay:
             config_name: Name of the display configuration to use
             port: Serial port for the display
             baud: Baud rate for serial communication
+            headless: Simulate with a silent virtual panel instead of printing the screen
         """
         self.config = DISPLAY_CONFIGS[config_name]
+        self.encoder = self.config.create_encoder()
+        self.planner = AnimationPlanner(self.config, LinkModel(baud))
+        self.writer: Optional[SerialWriter] = None
         print(f"Initializing display: {self.config.name} ({self.config.total_width}×{self.config.total_height})")
         
         try:
             self.serial = serial.Serial(port, baud, timeout=1)
             print(f"Connected to flipdot display on {port}")
         except (serial.SerialException, OSError):
-            print("Serial port not available, using text simulation")
-            self.serial = FallbackSerial(self.config)
+            if headless:
+                self.use_virtual_panel()
+            else:
+                print("Serial port not available, using text simulation")
+                self.serial = FallbackSerial(self.config)
+    
+    def use_virtual_panel(self, history: int = 0, capture: bool = False):
+        """
+        Send frames to a silent in-memory panel instead of the display.
+        
+        Args:
+            history: Number of past frames to keep on the panel
+            capture: Keep every chunk of bytes written
+            
+        Returns:
+            The VirtualPanel, for snapshots and frame history
+        """
+        try:
+            from .virtual_panel import VirtualPanel
+        except ImportError:
+            from virtual_panel import VirtualPanel
+        
+        self.stop_writer()
+        self.serial = VirtualPanel(self.config, history, capture)
+        self.encoder.forget()
+        return self.serial
+    
+    def record_wire(self, path: str) -> WireRecorder:
+        """
+        Log every write to the display, with timestamps, to a capture file.
+        
+        Args:
+            path: Capture file, replayable with python -m core.wire_capture
+            
+        Returns:
+            The recorder wrapping the serial port
+        """
+        self.stop_recording()
+        self.serial = WireRecorder(self.serial, path, self.config.name)
+        if self.writer:
+            self.writer.port = self.serial
+        return self.serial
+    
+    def stop_recording(self) -> None:
+        """Close the capture file and write to the display directly again."""
+        if isinstance(self.serial, WireRecorder):
+            self.serial = self.serial.stop()
+            if self.writer:
+                self.writer.port = self.serial
+    
+    def start_writer(self, depth: int = 2, policy: QueuePolicy = QueuePolicy.LATEST) -> SerialWriter:
+        """
+        Send frames from a background thread so fill() never waits on the serial port.
+        
+        Args:
+            depth: Maximum number of frames waiting to be written
+            policy: What to do with new frames when the queue is full
+            
+        Returns:
+            The writer, whose stats() report queue depth and dropped frames
+        """
+        self.stop_writer()
+        self.writer = SerialWriter(self.serial, self.encoder, depth, policy)
+        return self.writer
+    
+    def stop_writer(self) -> None:
+        """Write any queued frames, then go back to writing on the caller's thread."""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
     
     def get_text_bytes(self, message: str, delim: bytes = CHAR_DICT['space'], dmult: int = 1) -> bytes:
         """
@@ -284,64 +359,29 @@ class ReconfigurableFlipdotDisplay:
         Returns:
             Byte representation of the text
         """
-        buf = b''
-        for x in message:
-            char_key = x.upper()  # Convert to uppercase for lookup
-            if char_key not in CHAR_DICT:
-                buf += CHAR_DICT.get('?', b'\x00')
-            else:
-                buf += CHAR_DICT[char_key]
-            buf += delim * dmult
-        
-        # Remove the last delimiter (original behavior)
-        return buf[:-len(delim * dmult)] if dmult > 0 and delim else buf
+        return TEXT_ATLAS.render(message, delim, dmult)
     
     def clear(self) -> None:
         """Clear the display using original protocol."""
-        self.serial.write(RESET + ROW1)
-        self.serial.write(b'\x00' * self.config.total_width)
-        
-        if self.config.modules_high > 1:
-            self.serial.write(ROW2)
-            self.serial.write(b'\x00' * self.config.total_width)
+        self.fill(b'')
     
     def fill(self, message: bytes, fillmask: int = 127) -> bytes:
         """
         Fill display using ORIGINAL algorithm adapted for configurable size.
         
         Args:
-            message: Bytes to display
+            message: Bytes to display, or a Canvas
             fillmask: Bitmask for filtering display content
             
         Returns:
             The displayed message
         """
-        self.serial.write(RESET + ROW1)
-
-        # Adapt original fill algorithm for configurable width
-        total_pixels = self.config.total_width * self.config.modules_high
-        
-        for i in range(total_pixels):
-            # Switch to ROW2 when we reach the second row of modules
-            if i == self.config.total_width and self.config.modules_high > 1:
-                self.serial.write(ROW2)
-
-            # Original algorithm adapted
-            if (i // self.config.total_width) % 2 == 0:
-                # Top row or single row
-                if i < len(message):
-                    self.serial.write(bytes([message[i] & fillmask]))
-                else:
-                    self.serial.write(b"\x00")
-            else:
-                # Bottom row - use original backward logic
-                col_in_row = i % self.config.total_width
-                adjusted_index = col_in_row + (self.config.total_width - 1 - (2 * (col_in_row % 5)))
-                
-                if adjusted_index < len(message):
-                    self.serial.write(bytes([message[adjusted_index] & fillmask]))
-                else:
-                    self.serial.write(b"\x00")
+        if hasattr(message, "to_buffer"):
+            message = message.to_buffer(self.config)
+        if self.writer:
+            self.writer.submit(message, fillmask)
+        else:
+            self.serial.write(self.encoder.encode(message, fillmask))
 
         return message
     
@@ -393,24 +433,27 @@ class ReconfigurableFlipdotDisplay:
         message_len = len(padded_text) - self.config.total_width
         d = 1  # Distance per step
         
+        clock = FrameClock(speed)
         for k in range((message_len // d) + 1):
             chunk = padded_text[k*d:(k*d) + self.config.total_width]
             self.fill(chunk)
-            time.sleep(speed)
+            clock.tick()
     
     def display_frame(self, frame_data: bytes) -> None:
         """
         Display a video frame using original protocol.
         
         Args:
-            frame_data: Raw frame data
+            frame_data: Column bytes of the screen, module row after module row;
+                each module row is sent where the wiring reads it
         """
-        if len(frame_data) > self.config.total_width:
-            frame_data = frame_data[:self.config.total_width]
-        elif len(frame_data) < self.config.total_width:
-            frame_data += b'\x00' * (self.config.total_width - len(frame_data))
+        frame_size = self.config.screen_width * self.config.screen_rows
+        if len(frame_data) > frame_size:
+            frame_data = frame_data[:frame_size]
+        elif len(frame_data) < frame_size:
+            frame_data += b'\x00' * (frame_size - len(frame_data))
             
-        self.fill(frame_data)
+        self.fill(self.config.pack_screen(frame_data))
     
     def get_config_info(self) -> str:
         """Get information about the current display configuration."""
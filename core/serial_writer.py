@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Background Serial Writer for Flipdot Displays
+
+Moves frame encoding and serial I/O onto a per-display thread fed by a bounded
+queue, so playlists, video and clocks never wait on the UART. Frames are
+encoded on the writer thread, which keeps delta updates correct when queued
+frames are dropped.
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Optional, Tuple
+
+try:
+    from .frame_encoder import FrameEncoder
+except ImportError:
+    from frame_encoder import FrameEncoder
+
+
+class QueuePolicy(Enum):
+    BLOCK = "block"  # producers wait for room in the queue
+    DROP_OLDEST = "drop_oldest"  # a full queue discards its oldest frame
+    LATEST = "latest"  # only the newest frame is kept, pending ones are discarded
+
+
+class SerialWriter:
+    """Writes frames to a serial port from a background thread."""
+
+    def __init__(self, port: Any, encoder: FrameEncoder, depth: int = 2,
+                 policy: QueuePolicy = QueuePolicy.LATEST, name: str = "flipdot-writer"):
+        """
+        Start the writer thread.
+
+        Args:
+            port: Serial port (or simulator) with a write() method
+            encoder: Frame encoder for the display, used only by the writer thread
+            depth: Maximum number of frames waiting to be written
+            policy: What to do when a frame arrives and the queue is full
+            name: Thread name
+        """
+        if depth < 1:
+            raise ValueError("Queue depth must be at least 1")
+        self.port = port
+        self.encoder = encoder
+        self.depth = depth
+        self.policy = QueuePolicy(policy)
+
+        self._queue: Deque[Tuple[bytes, int, Optional[int]]] = deque()
+        self._lock = threading.Condition()
+        self._busy = False
+        self._running = True
+
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self.max_depth_seen = 0
+        self.last_error: Optional[Exception] = None
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Frames currently waiting to be written."""
+        return len(self._queue)
+
+    def submit(self, message: bytes, fillmask: int = 127, columns: Optional[int] = None) -> None:
+        """
+        Queue a frame for the display.
+
+        Only QueuePolicy.BLOCK ever waits; the other policies drop frames instead.
+        """
+        frame = (bytes(message), fillmask, columns)
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("Serial writer is closed")
+            self.frames_submitted += 1
+
+            if self.policy == QueuePolicy.LATEST:
+                self.frames_dropped += len(self._queue)
+                self._queue.clear()
+            elif len(self._queue) >= self.depth:
+                if self.policy == QueuePolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self.frames_dropped += 1
+                else:
+                    self._lock.wait_for(lambda: len(self._queue) < self.depth or not self._running)
+                    if not self._running:
+                        return
+
+            self._queue.append(frame)
+            self.max_depth_seen = max(self.max_depth_seen, len(self._queue))
+            self._lock.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued frame has been written. Returns False on timeout."""
+        with self._lock:
+            return self._lock.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout: Optional[float] = 2.0) -> None:
+        """Write what is queued, then stop the thread."""
+        self.flush(timeout)
+        with self._lock:
+            self._running = False
+            self._lock.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue and throughput counters."""
+        with self._lock:
+            return {
+                "policy": self.policy.value,
+                "depth": self.depth,
+                "queued": len(self._queue),
+                "max_queued": self.max_depth_seen,
+                "submitted": self.frames_submitted,
+                "written": self.frames_written,
+                "dropped": self.frames_dropped,
+                "bytes_written": self.bytes_written,
+                "last_error": repr(self.last_error) if self.last_error else None,
+            }
+
+    def _run(self) -> None:
+        """Writer thread: encode and send frames until closed."""
+        while True:
+            with self._lock:
+                self._lock.wait_for(lambda: self._queue or not self._running)
+                if not self._queue:
+                    return
+                message, fillmask, columns = self._queue.popleft()
+                self._busy = True
+                self._lock.notify_all()
+
+            update = b''
+            try:
+                update = self.encoder.encode_delta(message, fillmask, columns)
+                if update:
+                    self.port.write(update)
+                failed = False
+            except Exception as e:
+                # The display state is unknown after a failed write
+                print(f"Serial write failed: {e}")
+                self.last_error = e
+                self.encoder.forget()
+                failed = True
+                time.sleep(0.1)
+
+            with self._lock:
+                self._busy = False
+                if not failed:
+                    self.frames_written += 1
+                    self.bytes_written += len(update)
+                self._lock.notify_all()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Checks for canvas packing, run with pytest
+
+Canvases are packed for each display configuration and decoded again by a
+virtual panel with the same wiring, so a module row packed into the wrong
+part of the message shows up as moved dots.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("FLIPDOT_HEADLESS", "1")
+
+# Add the repository root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.canvas import Canvas
+from core.core import WORKING_CORE_CONFIG
+from core.reconfigurable_flipdot import DISPLAY_CONFIGS
+from core.virtual_panel import VirtualPanel
+
+CONFIGS = {**DISPLAY_CONFIGS, "core": WORKING_CORE_CONFIG}
+
+
+def make_pattern(width: int, height: int, seed: int = 7) -> np.ndarray:
+    """Lit dots with no symmetry: every column and row is different."""
+    return np.random.default_rng(seed).random((height, width)) < 0.5
+
+
+def show(config, message: bytes) -> Canvas:
+    """What a panel with a configuration's wiring shows for a message."""
+    panel = VirtualPanel(config)
+    panel.write(config.create_encoder().encode(message))
+    return panel.snapshot()
+
+
+def shared_columns(config) -> set:
+    """Screen columns that read the same message byte as a later one, so can't show their own."""
+    table = config.screen_table
+    return {index for index, address in enumerate(table) if address in table[index + 1:]}
+
+
+def test_top_dot_is_bit_6():
+    canvas = Canvas(2, 14)
+    canvas.pixels[0, 0] = True
+    canvas.pixels[13, 1] = True
+    assert canvas.to_bytes() == bytes([0x40, 0x00, 0x00, 0x01])
+
+
+def test_from_bytes_reverses_to_bytes():
+    canvas = Canvas.from_array(make_pattern(30, 14))
+    assert Canvas.from_bytes(canvas.to_bytes(), 30, 14) == canvas
+
+
+@pytest.mark.parametrize("name", sorted(CONFIGS))
+def test_to_buffer_shows_the_canvas(name):
+    config = CONFIGS[name]
+    pixels = make_pattern(config.screen_width, config.screen_height)
+    shown = show(config, Canvas.from_array(pixels).to_buffer(config))
+
+    wrong = (shown.pixels != pixels).reshape(
+        config.screen_rows, config.module_height, config.screen_width).any(axis=1).ravel()
+    assert set(np.flatnonzero(wrong).tolist()) <= shared_columns(config)
+
+
+@pytest.mark.parametrize("name", sorted(CONFIGS))
+def test_unpack_screen_reverses_pack_screen(name):
+    config = CONFIGS[name]
+    columns = Canvas.from_array(make_pattern(config.screen_width, config.screen_height)).to_bytes()
+    message = config.pack_screen(columns)
+
+    assert len(message) == config.buffer_length
+    unpacked = config.unpack_screen(message)
+    shared = shared_columns(config)
+    assert [b for i, b in enumerate(unpacked) if i not in shared] == \
+           [b for i, b in enumerate(columns) if i not in shared]
+    assert config.pack_screen(unpacked) == message
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Checks for the frame message wire format, run with pytest
+
+Frames are encoded and decoded in every encoding, including sparse, solid and
+long-run pictures that exercise the RLE run splitting.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("FLIPDOT_HEADLESS", "1")
+
+# Add the repository root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.canvas import Canvas
+from core.frame_message import (
+    HEADER, SEQUENCE_MODULUS, STALE_WINDOW, Encoding, decode_frame, encode_frame, is_stale, with_sequence,
+)
+
+ENCODINGS = [Encoding.RAW, Encoding.RLE, Encoding.ZLIB, Encoding.AUTO]
+
+
+def pictures():
+    """Pixel arrays from noisy to solid, at a size whose bits don't fill the last byte."""
+    rng = np.random.default_rng(3)
+    sparse = np.zeros((35, 30), dtype=bool)
+    sparse[10, 4:9] = True
+    long_runs = np.zeros((35, 30), dtype=bool)
+    long_runs[20:] = True  # runs of 600 and 450 dots, past RUN_LIMIT
+    return {
+        "noise": rng.random((35, 30)) < 0.5,
+        "sparse": sparse,
+        "blank": np.zeros((35, 30), dtype=bool),
+        "solid": np.ones((35, 30), dtype=bool),
+        "long_runs": long_runs,
+        "odd_size": rng.random((7, 3)) < 0.5,
+    }
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS, ids=lambda encoding: encoding.name)
+@pytest.mark.parametrize("name", sorted(pictures()))
+def test_encode_decode_round_trip(name, encoding):
+    pixels = pictures()[name]
+    message = encode_frame(pixels, 41, encoding)
+    frame = decode_frame(message)
+
+    if encoding != Encoding.AUTO:
+        assert frame.header.encoding == encoding
+    assert (frame.header.width, frame.header.height) == (pixels.shape[1], pixels.shape[0])
+    assert frame.sequence == 41
+    assert np.array_equal(frame.pixels, pixels)
+
+
+@pytest.mark.parametrize("name", sorted(pictures()))
+def test_auto_picks_the_smallest(name):
+    pixels = pictures()[name]
+    sizes = [len(encode_frame(pixels, encoding=encoding)) for encoding in ENCODINGS[:-1]]
+    assert len(encode_frame(pixels)) == min(sizes)
+
+
+def test_to_buffer_matches_the_canvas():
+    pixels = pictures()["noise"]
+    assert decode_frame(encode_frame(pixels)).to_buffer() == Canvas.from_array(pixels).to_bytes()
+
+
+def test_with_sequence_changes_only_the_sequence():
+    message = encode_frame(pictures()["noise"], 5)
+    renumbered = with_sequence(message, SEQUENCE_MODULUS + 9)
+
+    assert decode_frame(renumbered).sequence == 9
+    assert renumbered[:HEADER.size - 4] == message[:HEADER.size - 4]
+    assert renumbered[HEADER.size:] == message[HEADER.size:]
+
+
+@pytest.mark.parametrize("sequence, last, stale", [
+    (0, None, False),
+    (10, 10, True),
+    (9, 10, True),
+    (11, 10, False),
+    (0, SEQUENCE_MODULUS - 1, False),  # wrapped around
+    (SEQUENCE_MODULUS - 1, 0, True),
+    (10, 10 + STALE_WINDOW, False),  # a restarted publisher
+])
+def test_is_stale(sequence, last, stale):
+    assert is_stale(sequence, last) == stale
+
+
+@pytest.mark.parametrize("message", [
+    b"",
+    b"\x00" * 40,
+    encode_frame(np.ones((7, 5)), encoding=Encoding.RAW)[:-1],  # short payload
+    encode_frame(np.ones((7, 5)), encoding=Encoding.RLE)[:-1],  # runs don't cover the frame
+    encode_frame(np.ones((7, 5)), encoding=Encoding.ZLIB)[:-3],  # truncated stream
+    b"FD\x09" + encode_frame(np.ones((7, 5)))[3:],  # unknown version
+])
+def test_malformed_messages_raise_value_error(message):
+    with pytest.raises(ValueError):
+        decode_frame(message)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Checks for the virtual panel, run with pytest
+
+Full frames and the core's cursor-addressed delta updates are decoded side by
+side, so a cursor command the panel reads differently from the encoder shows
+up as a frame that doesn't match.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("FLIPDOT_HEADLESS", "1")
+
+# Add the repository root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.canvas import Canvas
+from core.core import WORKING_CORE_CONFIG
+from core.reconfigurable_flipdot import DISPLAY_CONFIGS
+from core.virtual_panel import VirtualPanel
+
+
+def make_frames(config, count: int = 12, seed: int = 5):
+    """Message buffers that change a little, a lot, or not at all from one to the next."""
+    rng = np.random.default_rng(seed)
+    pixels = rng.random((config.screen_height, config.screen_width)) < 0.5
+    frames = []
+    for index in range(count):
+        if index % 4 == 1:
+            pixels = pixels.copy()
+            pixels[rng.integers(config.screen_height), rng.integers(config.screen_width)] ^= True
+        elif index % 4 == 2:
+            pixels = rng.random(pixels.shape) < 0.5
+        frames.append(Canvas.from_array(pixels).to_buffer(config))
+    return frames
+
+
+def test_delta_updates_show_the_same_as_full_frames():
+    config = WORKING_CORE_CONFIG
+    full, delta = VirtualPanel(config), VirtualPanel(config)
+    full_encoder, delta_encoder = config.create_encoder(), config.create_encoder()
+
+    for message in make_frames(config):
+        full.write(full_encoder.encode(message))
+        delta.write(delta_encoder.encode_delta(message))
+        assert delta.snapshot() == full.snapshot()
+        assert delta.to_bytes() == full.to_bytes()
+    assert delta.bytes_written < full.bytes_written
+
+
+@pytest.mark.parametrize("name", sorted(DISPLAY_CONFIGS))
+def test_full_frames_show_the_message(name):
+    config = DISPLAY_CONFIGS[name]
+    panel = VirtualPanel(config)
+    encoder = config.create_encoder()
+    for message in make_frames(config, 3):
+        panel.write(encoder.encode(message))
+        assert panel.to_bytes() == config.unpack_screen(message)
+
+
+def test_history_keeps_the_latest_frames():
+    config = DISPLAY_CONFIGS["wide"]
+    panel = VirtualPanel(config, history=2, capture=True)
+    encoder = config.create_encoder()
+    frames = make_frames(config, 4)
+    for message in frames:
+        panel.write(encoder.encode(message))
+
+    assert [canvas.to_bytes() for _, canvas in panel.frames()] == frames[-2:]
+    assert panel.frame() == panel.snapshot()
+    assert len(panel.captured) == 4
+    panel.reset()
+    assert not panel.pixels.any() and not panel.frames() and not panel.captured
+
+
+def test_columns_past_the_last_wire_column_are_dropped():
+    config = DISPLAY_CONFIGS["wide"]
+    panel = VirtualPanel(config)
+    panel.write(bytes(config.create_encoder().encode(make_frames(config, 1)[0])) + b"\x7f" * 4)
+
+    stats = panel.stats()
+    assert stats["columns_written"] == config.wire_columns + 4
+    assert stats["columns_dropped"] == 4
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Headless Virtual Flipdot Panel
+
+A silent stand-in for the serial port that decodes the exact wire protocol,
+cursor commands included, into a NumPy state array. Nothing is printed, so
+playlists and benchmarks run as fast as they can generate frames, and the
+resulting display can be inspected, snapshotted or replayed from history.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .canvas import Canvas
+    from .display_config import DisplayConfig
+except ImportError:
+    from canvas import Canvas
+    from display_config import DisplayConfig
+
+# Row commands of the reconfigurable protocol (controllers without cursor addressing)
+RESET = 0x81
+ROW1 = 0x82
+ROW2 = 0x83
+
+
+class VirtualPanel:
+    """In-memory display that can be written to like a serial port."""
+
+    def __init__(self, config: DisplayConfig, history: int = 0, capture: bool = False):
+        """
+        Create a blank panel.
+
+        Args:
+            config: Display whose wiring and protocol are emulated
+            history: Number of past frames (one per write) to keep, 0 for none
+            capture: Keep every written chunk of bytes, for replay or inspection
+        """
+        self.config = config
+        self.cursor_protocol = config.cursor_row_break is not None
+        self.row_break = config.cursor_row_break or config.total_width
+
+        # Column bytes in wire order, and where the visible ones sit on the display
+        self.wire = np.zeros(config.wire_columns, dtype=np.uint8)
+        pixel_table = np.asarray(config.pixel_table, dtype=np.intp)
+        self._visible = np.flatnonzero(pixel_table >= 0)
+        self._pixel_index = pixel_table[self._visible]
+        self._display_columns = config.screen_width * config.screen_rows
+
+        self.cursor = 0
+        self._after_control = False  # last byte set the cursor column
+
+        self.history: Optional[Deque[Tuple[float, np.ndarray]]] = deque(maxlen=history) if history else None
+        self.captured: Optional[List[bytes]] = [] if capture else None
+        self.writes = 0
+        self.bytes_written = 0
+        self.columns_written = 0
+        self.columns_dropped = 0  # data sent past the last wire column
+
+    def write(self, data: bytes) -> int:
+        """Decode bytes exactly as the controller would. Returns the number of bytes taken."""
+        data = bytes(data)
+        stream = np.frombuffer(data, dtype=np.uint8)
+
+        start = 0
+        for position in np.flatnonzero(stream > 128).tolist():
+            self._columns(stream[start:position])
+            self._command(int(stream[position]))
+            start = position + 1
+        self._columns(stream[start:])
+
+        self.writes += 1
+        self.bytes_written += len(data)
+        if self.captured is not None:
+            self.captured.append(data)
+        if self.history is not None:
+            self.history.append((time.monotonic(), self.wire.copy()))
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing is buffered; present for serial port compatibility."""
+
+    def close(self) -> None:
+        """Present for serial port compatibility."""
+
+    def reset(self) -> None:
+        """Blank the panel and forget history and captures."""
+        self.wire[:] = 0
+        self.cursor = 0
+        self._after_control = False
+        if self.history is not None:
+            self.history.clear()
+        if self.captured is not None:
+            self.captured.clear()
+
+    def to_bytes(self, wire: Optional[np.ndarray] = None) -> bytes:
+        """What is visible (column bytes, module row after module row) for the current or a past wire state."""
+        columns = np.zeros(self._display_columns, dtype=np.uint8)
+        columns[self._pixel_index] = (self.wire if wire is None else wire)[self._visible]
+        return (columns & 0x7f).tobytes()
+
+    def snapshot(self) -> Canvas:
+        """What the panel currently shows."""
+        return self._canvas(self.wire)
+
+    @property
+    def pixels(self) -> np.ndarray:
+        """Current dot states as a (height, width) boolean array."""
+        return self.snapshot().pixels
+
+    def frame(self, index: int = -1) -> Canvas:
+        """A frame from history, where -1 is the most recent write."""
+        if not self.history:
+            raise IndexError("Panel has no frame history")
+        return self._canvas(self.history[index][1])
+
+    def frames(self) -> List[Tuple[float, Canvas]]:
+        """Every frame in history with the monotonic time it was written."""
+        return [(written_at, self._canvas(wire)) for written_at, wire in (self.history or ())]
+
+    def render(self) -> str:
+        """Text picture of the panel, for printing on demand."""
+        return self.snapshot().render()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "writes": self.writes,
+            "bytes_written": self.bytes_written,
+            "columns_written": self.columns_written,
+            "columns_dropped": self.columns_dropped,
+            "history": len(self.history) if self.history is not None else 0,
+        }
+
+    def _canvas(self, wire: np.ndarray) -> Canvas:
+        config = self.config
+        return Canvas.from_bytes(self.to_bytes(wire), config.screen_width, config.screen_height, config.module_height)
+
+    def _columns(self, run: np.ndarray) -> None:
+        """Store a run of column bytes from the cursor onwards."""
+        if not len(run):
+            return
+        self._after_control = False
+        start = self.cursor
+        stop = min(start + len(run), len(self.wire))
+        if start < stop:
+            self.wire[start:stop] = run[:stop - start]
+        self.columns_written += len(run)
+        self.columns_dropped += len(run) - max(stop - start, 0)
+        self.cursor += len(run)
+
+    def _command(self, byte: int) -> None:
+        """Move the cursor for a control byte."""
+        if not self.cursor_protocol and byte in (RESET, ROW1, ROW2):
+            self.cursor = self.row_break if byte == ROW2 else 0
+            self._after_control = False
+        elif self._after_control:
+            # A second control byte moves the cursor down that many rows
+            self.cursor += (byte - 129) * self.row_break
+            self._after_control = False
+        else:
+            self.cursor = byte - 129
+            self._after_control = True
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Wire Traffic Capture and Replay
+
+An optional tap on the display's serial port that logs every write with a
+monotonic timestamp to a compact binary capture file, and a replayer that
+streams a capture back to a device or the virtual panel at its original
+speed, scaled, or as fast as possible.
+
+Capture format (little endian):
+    header: b"FLIPCAP" + version (u8) + wall clock start (f64) + label length (u16) + label (utf-8)
+    record: nanoseconds since capture start (u64) + length (u32) + bytes written
+
+Usage:
+    python -m core.wire_capture info show.cap
+    python -m core.wire_capture replay show.cap --speed 2
+    python -m core.wire_capture replay show.cap --max --port /dev/ttyUSB0
+"""
+
+import argparse
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+MAGIC = b"FLIPCAP"
+VERSION = 1
+_HEADER = struct.Struct("<BdH")
+_RECORD = struct.Struct("<QI")
+
+
+class CaptureError(Exception):
+    """A file is not a wire capture or is truncated."""
+
+
+class WireRecorder:
+    """Serial port wrapper that logs every write before passing it on."""
+
+    def __init__(self, port: Any, path: str, label: str = ""):
+        """
+        Start capturing.
+
+        Args:
+            port: Serial port (or simulator) that writes are passed on to
+            path: Capture file to create
+            label: Free text stored in the header, e.g. the display configuration
+        """
+        self.port = port
+        self.path = path
+        self.records = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._start = time.monotonic_ns()
+        self._file: Optional[BinaryIO] = open(path, "wb")
+
+        label_bytes = label.encode("utf-8")
+        self._file.write(MAGIC + _HEADER.pack(VERSION, time.time(), len(label_bytes)) + label_bytes)
+
+    def write(self, data: bytes) -> Optional[int]:
+        """Log the write, then send it to the port."""
+        data = bytes(data)
+        with self._lock:
+            if self._file:
+                self._file.write(_RECORD.pack(time.monotonic_ns() - self._start, len(data)) + data)
+                self.records += 1
+                self.bytes += len(data)
+        return self.port.write(data)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.flush()
+        if hasattr(self.port, "flush"):
+            self.port.flush()
+
+    def stop(self) -> Any:
+        """Close the capture file and return the unwrapped port."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        return self.port
+
+    def close(self) -> None:
+        self.stop()
+        if hasattr(self.port, "close"):
+            self.port.close()
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (timeout, in_waiting, ...) behaves like the wrapped port
+        return getattr(self.port, name)
+
+
+def read_header(f: BinaryIO) -> Dict[str, Any]:
+    """Read and check a capture header."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise CaptureError("Not a flipdot wire capture")
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise CaptureError("Truncated capture header")
+    version, started, label_length = _HEADER.unpack(header)
+    if version != VERSION:
+        raise CaptureError(f"Unsupported capture version {version}")
+    return {"version": version, "started": started, "label": f.read(label_length).decode("utf-8")}
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, bytes]]:
+    """
+    Records in a capture file.
+
+    Yields:
+        (seconds since capture start, bytes written). A record cut short by a
+        crash mid-write ends the capture quietly.
+    """
+    with open(path, "rb") as f:
+        read_header(f)
+        while True:
+            record = f.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return
+            offset, length = _RECORD.unpack(record)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield offset / 1e9, data
+
+
+def capture_info(path: str) -> Dict[str, Any]:
+    """Header fields and totals of a capture."""
+    with open(path, "rb") as f:
+        info = read_header(f)
+    records = total = 0
+    duration = largest_gap = 0.0
+    for offset, data in read_capture(path):
+        if records:
+            largest_gap = max(largest_gap, offset - duration)
+        records += 1
+        total += len(data)
+        duration = offset
+    info.update(records=records, bytes=total, duration=duration, largest_gap=largest_gap)
+    return info
+
+
+def replay(path: str, port: Any, speed: Optional[float] = 1.0) -> Dict[str, Any]:
+    """
+    Stream a capture to a port with its original timing.
+
+    Args:
+        path: Capture file
+        port: Anything with write(), e.g. a serial port or VirtualPanel
+        speed: 1.0 for original speed, 2.0 for twice as fast, None for no waiting
+
+    Returns:
+        Records and bytes sent, how long it took and the worst lateness
+    """
+    records = total = 0
+    max_lateness = 0.0
+    start = time.monotonic()
+    for offset, data in read_capture(path):
+        if speed:
+            lateness = time.monotonic() - (start + offset / speed)
+            if lateness < 0:
+                time.sleep(-lateness)
+            else:
+                max_lateness = max(max_lateness, lateness)
+        port.write(data)
+        records += 1
+        total += len(data)
+    return {"records": records, "bytes": total, "elapsed": time.monotonic() - start, "max_lateness": max_lateness}
+
+
+def _replay_target(args: argparse.Namespace) -> Any:
+    """Serial port or virtual panel to replay into."""
+    if args.port:
+        import serial
+        return serial.Serial(args.port, args.baud, timeout=1)
+
+    try:
+        from .virtual_panel import VirtualPanel
+        from .core import WORKING_CORE_CONFIG
+        from .reconfigurable_flipdot import DISPLAY_CONFIGS
+    except ImportError:
+        from virtual_panel import VirtualPanel
+        from core import WORKING_CORE_CONFIG
+        from reconfigurable_flipdot import DISPLAY_CONFIGS
+    config = WORKING_CORE_CONFIG if args.config == "core" else DISPLAY_CONFIGS[args.config]
+    return VirtualPanel(config)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and replay flipdot wire captures")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info = commands.add_parser("info", help="show what a capture contains")
+    info.add_argument("capture")
+
+    play = commands.add_parser("replay", help="send a capture to a display or the virtual panel")
+    play.add_argument("capture")
+    play.add_argument("--speed", type=float, default=1.0, help="playback speed factor (default: original speed)")
+    play.add_argument("--max", action="store_true", help="send as fast as possible")
+    play.add_argument("--port", help="serial port to replay to (default: virtual panel)")
+    play.add_argument("--baud", type=int, default=38400)
+    play.add_argument("--config", default="core", help="virtual panel layout: core or a reconfigurable preset name")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        for key, value in capture_info(args.capture).items():
+            print(f"{key:12} {value}")
+        return
+
+    target = _replay_target(args)
+    stats = replay(args.capture, target, None if args.max else args.speed)
+    print(stats)
+    if hasattr(target, "render"):
+        print(target.render())
+
+
+if __name__ == "__main__":
+    main()
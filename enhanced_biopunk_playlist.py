@@ -7,7 +7,7 @@ for dramatic visual impact and varied text sizing.
 """
 
 from __future__ import absolute_import
-from video import video
+from video import library, video
 from games.scavengerhunt import scavengerhunt
 import time
 
@@ -178,6 +178,9 @@ def run_biopunk_playlist(playlist, playlist_name, loop=True):
     print("=" * 60)
     print("Press Ctrl+C to stop")
     
+    # Decode the playlist's videos into memory while the first items play
+    video.warm([item["parameter"] for item in playlist if item["function"] is video.display_video])
+    
     try:
         cycle_count = 0
         while True:
@@ -239,6 +242,9 @@ if __name__ == "__main__":
     print("=" * 60)
     print("Now with dramatic multi-size text effects!")
     
+    # Pack any new or changed videos while the playlist runs
+    library.start_background_conversion(["core"], method=video.METHOD)
+    
     mode = input("\nChoose mode:\n1. Run playlist\n2. Demo text sizes\n3. Interactive selection\nChoice (1-3): ").strip()
     
     if mode == "1":
@@ -1,61 +1,48 @@
-from __future__ import print_function
-from __future__ import absolute_import
-from builtins import chr
-from builtins import range
-import pika
-import threading
-import time
-from core import core
+#!/usr/bin/env python3
+"""
+Show frames published to the "frames" exchange on the core display.
+
+Receiving and displaying are decoupled: only the newest frame (or, with
+--depth, a small ring of the newest) is kept, the broker queue is bounded,
+acks go out in batches and the display never runs faster than --fps.
+
+Usage:
+    python receive_messages.py --host localhost --fps 5
+"""
 
-from PIL import Image
-image = Image.open("favicon.png")
-image = image.convert("1")
+import argparse
+import json
+
+from core import core
+from core.frame_ingest import FrameIngest, pika_connector
+from core.serial_writer import QueuePolicy
 
-# CURRENT_FRAME = str(bytearray(image.getdata()))
 FPS = 5.0
 
 __author__ = 'boselowitz'
 
-def display_frame(CURRENT_FRAME):
-    #while True:
-    if CURRENT_FRAME:
-        fill_value = ""
-        frame_to_display = CURRENT_FRAME
-        for matrix_row in range(5):
-            for col in range(30):
-                col_value = 0
-                for row in range(7):
-                    pixel = ord(frame_to_display[col + (row * 30) + (matrix_row * 210)])
-                    if pixel:
-                        col_value |= ord(core.BITMASK[6 - row])
-                fill_value += chr(col_value)
-        core.fill(fill_value)
-        connection.sleep(1.0 / FPS)
-        print("Displayed Frame")
-
-# t = threading.Thread(target=display_frame)
-# t.daemon = True
-# try:
-#     t.start()
-# except (KeyboardInterrupt, SystemExit):
-#     exit()
-
-connection = pika.BlockingConnection(pika.ConnectionParameters(host="localhost"))
-channel = connection.channel()
-
-channel.exchange_declare(exchange="frames", type="fanout")
-queue = channel.queue_declare(exclusive=True) #, arguments={"x-max-length": 1})
-channel.queue_bind(exchange="frames", queue=queue.method.queue)
-
-def callback(ch, method, properties, body):
-    # global CURRENT_FRAME
-    # CURRENT_FRAME = body
-    display_frame(body)
-    # print "Setting frame"
-    # connection.sleep(0)
-
-channel.basic_consume(callback,
-                      queue=queue.method.queue,
-                      no_ack=True)
-
-channel.start_consuming()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show frames from the message bus on the flipdot display")
+    parser.add_argument("--host", default="localhost", help="RabbitMQ server")
+    parser.add_argument("--fps", type=float, default=FPS, help="highest frame rate to show")
+    parser.add_argument("--depth", type=int, default=1, help="newest frames kept for the display (1: latest only)")
+    parser.add_argument("--prefetch", type=int, default=8, help="most unacked messages in flight")
+    parser.add_argument("--ack-every", type=int, default=4, help="messages acked at once")
+    parser.add_argument("--max-queue", type=int, default=16, help="broker queue length before dropping the oldest")
+    args = parser.parse_args()
+
+    policy = QueuePolicy.LATEST if args.depth == 1 else QueuePolicy.DROP_OLDEST
+    ingest = FrameIngest(pika_connector(args.host), core.WORKING_CORE_CONFIG, depth=args.depth, policy=policy,
+                         prefetch=args.prefetch, ack_every=args.ack_every, max_queue=args.max_queue).start()
+    try:
+        ingest.display(core.fill, args.fps)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ingest.stop()
+        print(json.dumps(ingest.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import your existing core
 try:
     from core.core import working_core, clear, getbytes, scrollleft
-    print("✅ Successfully imported working_core")
+    from core.animation_cache import cached_transition
+    from core.frame_clock import FrameClock
 except ImportError as e:
     print(f"❌ Could not import core: {e}")
     print("Make sure this file is in the same directory as your core/ folder")
@@ -752,6 +753,7 @@ def wide_text(message):
     
     display_double_height_WORKING(bytes(all_top_bytes), bytes(all_bottom_bytes))
 
+@cached_transition(font=DOUBLE_HEIGHT_PATTERNS)
 def scroll_double_text(message):
     """Scroll double-height text."""
     all_top_bytes = []
@@ -773,6 +775,7 @@ def scroll_double_text(message):
     
     total_length = len(padded_top) - 105
     
+    clock = FrameClock(0.12)
     for offset in range(0, total_length, 2):
         top_chunk = padded_top[offset:offset + 105]
         bottom_chunk = padded_bottom[offset:offset + 105]
@@ -794,29 +797,33 @@ def scroll_double_text(message):
                 quadrant_buffer[30 + i] = bottom_chunk[i]
         
         working_core.fill(bytes(quadrant_buffer))
-        time.sleep(0.12)
+        clock.tick()
 
 # ============================================================================
 # TRANSITION FUNCTIONS
 # ============================================================================
 
+@cached_transition(font=DOUBLE_HEIGHT_PATTERNS)
 def double_flash(message):
     """Flash double-height text."""
+    clock = FrameClock(0.3)
     for _ in range(5):
         double_text(message)
-        time.sleep(0.3)
+        clock.tick()
         clear()
-        time.sleep(0.3)
+        clock.tick()
 
+@cached_transition(font=DOUBLE_HEIGHT_PATTERNS)
 def wide_dramatic(message):
     """Dramatic double-wide text."""
+    clock = FrameClock()
     for i in range(3):
         wide_text(message)
-        time.sleep(0.2)
+        clock.tick(0.2)
         clear()
-        time.sleep(0.1)
+        clock.tick(0.1)
     wide_text(message)
-    time.sleep(3)
+    FrameClock.pause(3)
 
 def impact_text(message):
     """Maximum impact based on message length."""
@@ -826,7 +833,7 @@ def impact_text(message):
         double_flash(message)
     else:
         single_text(message)
-        time.sleep(3)
+        FrameClock.pause(3)
 
 def smart_text(message):
     """Smart text sizing."""
@@ -836,7 +843,7 @@ def smart_text(message):
         double_text(message)
     else:
         single_text(message)
-    time.sleep(3)
+    FrameClock.pause(3)
 
 # ============================================================================
 # SIMPLE PLAYLIST EXAMPLE
@@ -1,33 +1,16 @@
-from builtins import str
-import pika
-import sys
-import glob
-from PIL import Image
+from core import core
+from core.frame_ingest import pika_connector
+from core.frame_publisher import FramePublisher, encode_images
 
 __author__ = 'boselowitz'
 
-connection = pika.BlockingConnection(pika.ConnectionParameters(host='localhost'))
-channel = connection.channel()
+FPS = 5.0
 
-channel.exchange_declare(exchange="frames", type='fanout')
-
-message = " ".join(sys.argv[1:]) or "info: Hello World!"
-while True:
-    for frame_path in glob.glob("frame??.bmp"):
-        image = Image.open(frame_path)
-        image = image.convert("1")
-        channel.basic_publish(exchange="frames", routing_key="", body=str(bytearray(image.getdata())))
-        
-        
-        
-        # print "Sent"
-        # for row in range(30):
-        #     for col in range(35):
-        #         if ord(str(bytearray(image.getdata()))[(row * col) + col]) > 0:
-        #             print "0",
-        #         else:
-        #             print ".",
-        #     print ""
-                
-
-connection.close()
+# Frames are converted and encoded once, then published at a steady FPS; see
+# python -m core.frame_publisher for counts, bursts and publisher confirms
+publisher = FramePublisher(pika_connector("localhost"), encode_images("frame??.bmp", core.WORKING_CORE_CONFIG))
+try:
+    publisher.publish(FPS)
+except KeyboardInterrupt:
+    pass
+print(publisher.stats())
@@ -7,20 +7,24 @@ Updated transitions that use the working core system with perfect positioning.
 
 import time
 import random
-from core.core import working_core, getbytes, scrollleft, fillfrombottomup, fillfromtopdown, erasefromtopdown, erasefrombottomup, fillrandomorder, eraserandomorder, clear
+from core.core import working_core, getbytes, text_width, scrollleft, fillfrombottomup, fillfromtopdown, erasefromtopdown, erasefrombottomup, fillrandomorder, eraserandomorder, clear
+from core.animation_cache import cached_transition
+from core.frame_clock import FrameClock
 
+@cached_transition
 def upnext(message: str):
     """Up next announcement with flashing."""
     for j in range(3):
+        clock = FrameClock()
         for i in range(5):
             working_core.display_text("UP NEXT", justify='center')
-            time.sleep(0.25)
+            clock.tick(0.25)
             clear()
-            time.sleep(0.2)
+            clock.tick(0.2)
             working_core.display_text("UP NEXT", justify='center')
-            time.sleep(0.1)
+            clock.tick(0.1)
             clear()
-            time.sleep(0.2)
+            clock.tick(0.2)
         
         # Show the message
         if j == 2:
@@ -29,36 +33,40 @@ def upnext(message: str):
             msg_bytes = getbytes(message)
             scrollleft(msg_bytes, t=0.15, d=3)
 
+@cached_transition
 def righttoleft(message: str):
     """Simple right to left scroll."""
     msg_bytes = getbytes(message)
     scrollleft(msg_bytes, t=0.2)
 
+@cached_transition
 def pop(message: str):
     """Flashing pop effect."""
     clear()
+    clock = FrameClock(0.25)
     for i in range(7):
         working_core.display_text(message, justify='center')
-        time.sleep(0.25)
+        clock.tick()
         clear()
-        time.sleep(0.25)
+        clock.tick()
     clear()
-    time.sleep(1)
+    FrameClock.pause(1)
 
 def amdissolve(message: str):
     """AMD dissolve effect."""
     msg_bytes = getbytes(message)
     working_core.display_text_from_bytes(msg_bytes)
-    time.sleep(2)
+    FrameClock.pause(2)
     eraserandomorder(msg_bytes)
 
 def dissolve(message: str):
     """Dissolve effect."""
     msg_bytes = getbytes(message)
     working_core.display_text_from_bytes(msg_bytes)
-    time.sleep(2)
+    FrameClock.pause(2)
     eraserandomorder(msg_bytes)
 
+@cached_transition
 def magichat(message: str):
     """Magic hat effect with multi-screen support."""
     # Split long messages into screens
@@ -75,8 +83,7 @@ def magichat(message: str):
         # Find good break point
         for i in range(21, 0, -1):
             if long_string[i] == " ":
-                test_bytes = getbytes(long_string[:i])
-                if len(test_bytes) < 60:  # Fits reasonably on display
+                if text_width(long_string[:i]) < 60:  # Fits reasonably on display
                     screens.append(long_string[:i])
                     long_string = long_string[i+1:]
                     break
@@ -84,10 +91,11 @@ def magichat(message: str):
     for screen in screens:
         msg_bytes = getbytes(screen)
         fillfrombottomup(msg_bytes, t=0.3)
-        time.sleep(1)
+        FrameClock.pause(1)
         if screen != screens[-1]:  # Not last screen
             erasefromtopdown(msg_bytes, t=0.2)
 
+@cached_transition
 def adventurelook(message: str):
     """Adventure game style display."""
     # Split message similar to magichat
@@ -103,8 +111,7 @@ def adventurelook(message: str):
         
         for i in range(21, 0, -1):
             if long_string[i] == " ":
-                test_bytes = getbytes(long_string[:i])
-                if len(test_bytes) < 60:
+                if text_width(long_string[:i]) < 60:
                     screens.append(long_string[:i])
                     long_string = long_string[i+1:]
                     break
@@ -114,53 +121,60 @@ def adventurelook(message: str):
         fillfrombottomup(msg_bytes, t=0.2)
         
         if i == len(screens) - 1:
-            time.sleep(5)  # Longer pause for last screen
+            FrameClock.pause(5)  # Longer pause for last screen
         else:
-            time.sleep(1)
+            FrameClock.pause(1)
             erasefrombottomup(msg_bytes, t=0.2)
 
+@cached_transition
 def plain(message: str):
     """Plain scrolling."""
     msg_bytes = getbytes(message)
     scrollleft(msg_bytes, t=0.2)
 
+@cached_transition
 def typewriter(message: str):
     """Typewriter effect."""
+    clock = FrameClock(0.1)
     for i in range(1, len(message) + 1):
         partial = message[:i]
         working_core.display_text(partial, justify='left')
-        time.sleep(0.1)
-    time.sleep(2)
+        clock.tick()
+    FrameClock.pause(2)
 
 def matrix_effect(message: str):
     """Matrix digital rain effect."""
     # Matrix effect with random characters
+    clock = FrameClock(0.1)
     for _ in range(15):
         random_text = ''.join(random.choice('01') for _ in range(10))
         working_core.display_text(random_text, justify='left')
-        time.sleep(0.1)
+        clock.tick()
     
     clear()
-    time.sleep(0.5)
+    FrameClock.pause(0.5)
     righttoleft(message)
 
+@cached_transition
 def bounce(message: str):
     """Bouncing text effect."""
     msg_bytes = getbytes(message)
     
+    clock = FrameClock()
     for _ in range(6):
         working_core.display_text_from_bytes(msg_bytes)
-        time.sleep(0.2)
+        clock.tick(0.2)
         clear()
-        time.sleep(0.1)
+        clock.tick(0.1)
         working_core.display_text_from_bytes(msg_bytes)
-        time.sleep(0.2)
+        clock.tick(0.2)
 
+@cached_transition
 def slide_in_left(message: str):
     """Slide in from left using scroll effect."""
     # Use partial scroll to simulate sliding
     msg_bytes = getbytes(' ' * 10 + message)  # Pad with spaces
-    scrollleft(msg_bytes, t=0.05, d=2)
+    scrollleft(msg_bytes, speed=40)  # columns/s; step and interval planned for the link
 
 # Transition lists
 TRANSITION_LIST = [plain, upnext, magichat, adventurelook, typewriter, matrix_effect, bounce]
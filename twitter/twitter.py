@@ -36,12 +36,36 @@ RATE_LIMIT_WAIT_TIME = 60  # seconds
 # Initialize Twitter client
 twitter = Twython(APP_KEY, APP_SECRET, OAUTH_TOKEN, OAUTH_TOKEN_SECRET)
 
-# Verify credentials on startup
-try:
-    twitter.verify_credentials()
-    print("Twitter credentials verified successfully")
-except (TwythonError, TwythonRateLimitError, ConnectionError) as e:
-    print(f"Error verifying Twitter credentials: {e}")
+CREDENTIALS_VERIFIED = False
+VERIFY_RETRY_AT: Optional[float] = None  # no new check until then after a failed one
+VERIFY_BACKOFF = RATE_LIMIT_WAIT_TIME  # seconds until the next check, doubled after each failure
+MAX_VERIFY_BACKOFF = 30 * 60  # seconds
+
+
+def verify_credentials() -> bool:
+    """
+    Verify the Twitter credentials once, on first API use rather than at import.
+    
+    A failure is remembered too: calls within the backoff after it return
+    False without asking Twitter again, and each failure doubles the backoff
+    up to MAX_VERIFY_BACKOFF.
+    
+    Returns:
+        True if the credentials have been verified
+    """
+    global CREDENTIALS_VERIFIED, VERIFY_RETRY_AT, VERIFY_BACKOFF
+    if CREDENTIALS_VERIFIED or (VERIFY_RETRY_AT and time.time() < VERIFY_RETRY_AT):
+        return CREDENTIALS_VERIFIED
+    try:
+        twitter.verify_credentials()
+        CREDENTIALS_VERIFIED = True
+        VERIFY_RETRY_AT = None
+        print("Twitter credentials verified successfully")
+    except (TwythonError, TwythonRateLimitError, ConnectionError) as e:
+        VERIFY_RETRY_AT = time.time() + VERIFY_BACKOFF
+        print(f"Error verifying Twitter credentials: {e}, retrying in {VERIFY_BACKOFF:.0f}s")
+        VERIFY_BACKOFF = min(VERIFY_BACKOFF * 2, MAX_VERIFY_BACKOFF)
+    return CREDENTIALS_VERIFIED
 
 
 class TwitterRateLimitError(Exception):
@@ -145,6 +169,7 @@ def get_latest_direct_messages() -> List[Dict[str, Any]]:
         List of direct message objects
     """
     global LAST_DM_ID
+    verify_credentials()
     
     try:
         if LAST_DM_ID:
@@ -174,6 +199,7 @@ def get_latest_mentions() -> List[Dict[str, Any]]:
         List of mention objects
     """
     global LAST_MENTION_ID
+    verify_credentials()
     
     try:
         if LAST_MENTION_ID:
@@ -203,6 +229,7 @@ def send_tweet(message: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    verify_credentials()
     try:
         twitter.update_status(status=message)
         return True
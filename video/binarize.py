@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Vectorized Binarization and Dithering
+
+Turns grayscale frames into lit/unlit dots. Every method takes a single
+(height, width) uint8 frame or a (frames, height, width) stack and works on
+the whole stack at once:
+
+    threshold  fixed brightness level
+    otsu       per-frame automatic level (Otsu's method)
+    bayer      ordered dithering with a Bayer matrix
+    floyd-steinberg, atkinson
+               error-diffusion dithering, pixel by pixel but across all
+               frames of the stack in one step; floyd-steinberg lights the
+               same dots as PIL's convert("1")
+
+Usage:
+    lit = binarizer("bayer", size=4)(gray_frames)
+    buffers = display_buffers(lit, module_height=7)
+"""
+
+from functools import partial
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 128
+
+# Grayscale (height, width) or (frames, height, width) uint8 -> boolean array of lit dots
+Binarize = Callable[[np.ndarray], np.ndarray]
+
+# Error diffusion kernels as (down, right, weight) offsets from the current pixel
+DIFFUSION_KERNELS: Dict[str, Tuple[Tuple[int, int, float], ...]] = {
+    "floyd-steinberg": ((0, 1, 7 / 16), (1, -1, 3 / 16), (1, 0, 5 / 16), (1, 1, 1 / 16)),
+    "atkinson": ((0, 1, 1 / 8), (0, 2, 1 / 8), (1, -1, 1 / 8), (1, 0, 1 / 8), (1, 1, 1 / 8), (2, 0, 1 / 8)),
+}
+
+
+def _stack(gray: np.ndarray) -> np.ndarray:
+    """View of gray as (frames, height, width)."""
+    gray = np.asarray(gray)
+    if gray.ndim == 2:
+        return gray[np.newaxis]
+    if gray.ndim != 3:
+        raise ValueError(f"Expected a frame or a stack of frames, got shape {gray.shape}")
+    return gray
+
+
+def threshold(gray: np.ndarray, level: int = DEFAULT_THRESHOLD) -> np.ndarray:
+    """Dots brighter than level are lit."""
+    return np.asarray(gray) > level
+
+
+def otsu_levels(gray: np.ndarray) -> np.ndarray:
+    """Otsu threshold of each frame in a stack, as a (frames,) array."""
+    frames = _stack(gray)
+    count = len(frames)
+    pixels = frames[0].size
+
+    # One 256-bin histogram per frame from a single bincount
+    bins = (np.arange(count, dtype=np.int64)[:, np.newaxis] * 256 + frames.reshape(count, -1)).ravel()
+    histograms = np.bincount(bins, minlength=count * 256).reshape(count, 256).astype(np.float64)
+
+    weight_below = np.cumsum(histograms, axis=1)
+    sum_below = np.cumsum(histograms * np.arange(256), axis=1)
+    weight_above = pixels - weight_below
+    total = sum_below[:, -1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_below = sum_below / weight_below
+        mean_above = (total - sum_below) / weight_above
+        between = weight_below * weight_above * (mean_below - mean_above) ** 2
+    between[~np.isfinite(between)] = -1
+    # A frame of a single brightness can't be split; fall back to the fixed level
+    return np.where(between.max(axis=1) > 0, between.argmax(axis=1), DEFAULT_THRESHOLD)
+
+
+def otsu(gray: np.ndarray) -> np.ndarray:
+    """Threshold each frame at its own Otsu level."""
+    frames = _stack(gray)
+    lit = frames > otsu_levels(frames)[:, np.newaxis, np.newaxis]
+    return lit if np.ndim(gray) == 3 else lit[0]
+
+
+def bayer_matrix(size: int = 4) -> np.ndarray:
+    """Normalized (0..1) Bayer index matrix of a power-of-two size."""
+    if size < 2 or size & (size - 1):
+        raise ValueError("Bayer matrix size must be a power of two of at least 2")
+    matrix = np.array([[0, 2], [3, 1]])
+    while len(matrix) < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return (matrix + 0.5) / matrix.size
+
+
+def bayer(gray: np.ndarray, size: int = 4) -> np.ndarray:
+    """Ordered dithering: each dot's threshold comes from a tiled Bayer matrix."""
+    gray = np.asarray(gray)
+    height, width = gray.shape[-2:]
+    matrix = bayer_matrix(size)
+    levels = np.tile(matrix * 255, (-(-height // size), -(-width // size)))[:height, :width]
+    return gray > levels
+
+
+def error_diffusion(gray: np.ndarray, kernel: str = "floyd-steinberg") -> np.ndarray:
+    """
+    Dither by pushing each dot's rounding error onto its unvisited neighbours.
+
+    Pixels are visited in raster order, each step covering every frame of the stack.
+    """
+    frames = _stack(gray)
+    offsets = DIFFUSION_KERNELS[kernel]
+    count, height, width = frames.shape
+    pad = max(abs(dx) for _, dx, _ in offsets)
+    depth = max(dy for dy, _, _ in offsets)
+
+    work = np.zeros((count, height + depth, width + 2 * pad), dtype=np.float32)
+    work[:, :height, pad:pad + width] = frames
+    lit = np.zeros(frames.shape, dtype=bool)
+    for y in range(height):
+        for x in range(width):
+            column = x + pad
+            value = work[:, y, column]
+            on = value > 127.5
+            lit[:, y, x] = on
+            error = value - on * 255.0
+            for dy, dx, weight in offsets:
+                work[:, y + dy, column + dx] += error * weight
+    return lit if np.ndim(gray) == 3 else lit[0]
+
+
+def floyd_steinberg(gray: np.ndarray) -> np.ndarray:
+    """
+    Floyd-Steinberg dithering in the integer arithmetic of PIL's convert("1").
+
+    Each dot's level is clipped to 0-255 before its error is passed on, and the
+    errors reaching a dot are divided by 16 together, so grayscale frames
+    dither to exactly the dots convert("1") gives them.
+    """
+    frames = _stack(gray).astype(np.int32)
+    count, height, width = frames.shape
+    lit = np.zeros(frames.shape, dtype=bool)
+    below = np.zeros((count, width + 1), dtype=np.int32)  # errors for the next row, 16ths, shifted by one column
+    for y in range(height):
+        right = np.zeros(count, dtype=np.int32)  # error for the next dot in this row
+        down = np.zeros(count, dtype=np.int32)  # errors gathered for the dot below
+        down_right = np.zeros(count, dtype=np.int32)
+        for x in range(width):
+            total = right + below[:, x + 1]
+            level = np.clip(frames[:, y, x] + np.sign(total) * (np.abs(total) // 16), 0, 255)
+            on = level > 128
+            lit[:, y, x] = on
+            error = level - on * 255
+            below[:, x] = 3 * error + down
+            down = 5 * error + down_right
+            down_right = error
+            right = 7 * error
+        below[:, width] = down
+    return lit if np.ndim(gray) == 3 else lit[0]
+
+
+BINARIZERS: Dict[str, Callable[..., np.ndarray]] = {
+    "threshold": threshold,
+    "otsu": otsu,
+    "bayer": bayer,
+    "floyd-steinberg": floyd_steinberg,
+    "atkinson": partial(error_diffusion, kernel="atkinson"),
+}
+
+
+def binarizer(method: str = "threshold", **params) -> Binarize:
+    """
+    Binarization function by name.
+
+    Args:
+        method: One of BINARIZERS
+        **params: Method options, e.g. level for threshold or size for bayer
+    """
+    try:
+        function = BINARIZERS[method]
+    except KeyError:
+        raise ValueError(f"Unknown binarization method {method!r}, expected one of {', '.join(BINARIZERS)}")
+    return partial(function, **params) if params else function
+
+
+def display_buffers(lit: np.ndarray, module_height: int = 7) -> np.ndarray:
+    """
+    Pack lit dots into display buffers (one byte per column, module row after module row).
+
+    Args:
+        lit: (height, width) or (frames, height, width) boolean array
+        module_height: Pixels per column byte, bit module_height - 1 is the top pixel
+
+    Returns:
+        (frames, module rows * width) uint8 array, one row per frame
+    """
+    frames = _stack(lit)
+    count, height, width = frames.shape
+    module_rows = -(-height // module_height)
+
+    bits = np.zeros((count, module_rows, 8, width), dtype=bool)
+    padded = np.zeros((count, module_rows * module_height, width), dtype=bool)
+    padded[:, :height] = frames
+    bits[:, :, 8 - module_height:, :] = padded.reshape(count, module_rows, module_height, width)
+    return np.packbits(bits, axis=2).reshape(count, module_rows * width)
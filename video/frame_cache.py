@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Decoded Video Frame Cache
+
+Playlists show the same few clips over and over, and a whole clip decoded for
+a display is a few kilobytes. Videos are kept decoded in memory, keyed by
+name, frame layout, frame rate and binarization, so after the first showing a clip
+plays with no globbing, file access, image decoding or patching. The least
+recently played videos are evicted when the cache is over its memory budget,
+and a playlist can warm the cache for its videos in the background.
+
+Set FLIPDOT_FRAME_CACHE to a budget in megabytes, or to "off" to disable it.
+
+Usage:
+    video = frame_cache.load("barber-pole-10s.mov", frames_dir, config)
+    video.play(display.fill)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.display_config import DisplayConfig
+from video.binarize import DEFAULT_THRESHOLD
+from video.packed_video import DecodedVideo, PackedVideo, ensure_packed, layout_tag
+
+CACHE_SETTING = os.environ.get("FLIPDOT_FRAME_CACHE", "")
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# (video name, frame layout, module height, fps, threshold, method)
+CacheKey = Tuple[str, str, int, float, int, str]
+
+
+def cache_key(video_name: str, config: DisplayConfig, fps: float = 12.0, threshold: int = DEFAULT_THRESHOLD,
+              method: str = "threshold") -> CacheKey:
+    """Key of a video decoded for a display, frame rate and binarization."""
+    return (video_name, layout_tag(config), config.module_height, float(fps), threshold, method)
+
+
+class FrameCache:
+    """Decoded videos in memory, evicted by total size and last use."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._videos: "OrderedDict[CacheKey, Tuple[DecodedVideo, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[CacheKey, List[Any]] = {}  # [lock, threads loading or waiting]
+
+    def get(self, key: CacheKey) -> Optional[DecodedVideo]:
+        """Cached video, marking it as recently used. None if it isn't cached."""
+        with self._lock:
+            cached = self._videos.get(key)
+            if cached is None:
+                return None
+            self._videos.move_to_end(key)
+            return cached[0]
+
+    def store(self, key: CacheKey, video: DecodedVideo) -> None:
+        """Keep a video, then evict the least recently used ones if the cache is over its budget."""
+        size = video.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._videos:
+                self.size -= self._videos.pop(key)[1]
+            self._videos[key] = (video, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._videos.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def invalidate(self, video_name: Optional[str] = None) -> None:
+        """Forget a video in every size and binarization (e.g. after repacking it), or everything."""
+        with self._lock:
+            for key in [key for key in self._videos if video_name is None or key[0] == video_name]:
+                self.size -= self._videos.pop(key)[1]
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def load(self, video_name: str, frames_dir: str, config: DisplayConfig, fps: float = 12.0,
+             threshold: int = DEFAULT_THRESHOLD, method: str = "threshold") -> Optional[DecodedVideo]:
+        """
+        Decoded video, packing and decoding it on a miss.
+
+        Args:
+            video_name: Name of the video
+            frames_dir: Its frames directory, packed if there is no up to date packed file
+            config: Display the frames are for
+            fps: Frame rate to pack at
+            threshold: Brightness above which a dot is lit, for the threshold method
+            method: Binarization or dithering method
+
+        Returns:
+            The video, or None if there are neither frames nor a packed file
+        """
+        key = cache_key(video_name, config, fps, threshold, method)
+        video = self._lookup(key)
+        if video is not None:
+            return video
+
+        with self._lock:
+            entry = self._loading.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+            loading = entry[0]
+        # One thread packs and decodes a video; another wanting it meanwhile waits for that
+        try:
+            with loading:
+                video = self._lookup(key, miss=True)
+                if video is not None:
+                    return video
+                packed = ensure_packed(video_name, frames_dir, config, fps, threshold, method)
+                if packed is None:
+                    return None
+                with PackedVideo(packed) as packed_video:
+                    video = packed_video.decode()
+                self.store(key, video)
+        finally:
+            # The last thread through forgets the load, whether or not it worked
+            with self._lock:
+                self._loading[key][1] -= 1
+                if not self._loading[key][1]:
+                    del self._loading[key]
+        return video
+
+    def _lookup(self, key: CacheKey, miss: bool = False) -> Optional[DecodedVideo]:
+        """get() that counts a hit, and a miss too if asked."""
+        with self._lock:
+            cached = self._videos.get(key)
+            if cached is not None:
+                self._videos.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            if miss:
+                self.misses += 1
+            return None
+
+    def warm(self, video_names: Iterable[str], frames_root: str, config: DisplayConfig, fps: float = 12.0,
+             threshold: int = DEFAULT_THRESHOLD, method: str = "threshold") -> threading.Thread:
+        """
+        Load videos in a background thread, e.g. the ones coming up in a playlist.
+
+        Args:
+            video_names: Videos to load, in the order they are needed
+            frames_root: Directory holding each video's frames directory
+            config, fps, threshold, method: As for load()
+        """
+        names = list(dict.fromkeys(video_names))
+
+        def run() -> None:
+            for name in names:
+                try:
+                    self.load(name, os.path.join(frames_root, name), config, fps, threshold, method)
+                except Exception as e:
+                    print(f"Could not preload {name}: {e}")
+
+        thread = threading.Thread(target=run, name="flipdot-frame-cache", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "videos": len(self._videos),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _max_bytes(setting: str) -> Optional[int]:
+    """Cache budget from FLIPDOT_FRAME_CACHE, None when disabled."""
+    if setting.lower() in ("off", "0", "false"):
+        return None
+    try:
+        return int(float(setting) * 1024 * 1024) if setting else DEFAULT_MAX_BYTES
+    except ValueError:
+        print(f"⚠️  FLIPDOT_FRAME_CACHE={setting!r} is not a size in megabytes, using the default")
+        return DEFAULT_MAX_BYTES
+
+
+# Shared cache used by the video modules; with caching off nothing is ever kept
+frame_cache = FrameCache(_max_bytes(CACHE_SETTING) or 0)
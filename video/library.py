@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Video Library Pre-Conversion
+
+Packs every video in video/videos for the displays in use on a process pool,
+so no playlist item has to wait on ffmpeg. A manifest next to the packed
+files records each source's size, modification time and content hash along
+with the conversion parameters; sources whose content and parameters haven't
+changed are skipped, and a touched but unchanged file is only re-hashed.
+
+Usage:
+    python -m video.library --config core --config current
+    python -m video.library --method bayer --workers 4
+
+or at startup, in the background (from under if __name__ == "__main__", as the
+workers import the calling script):
+    from video import library
+    library.start_background_conversion(["core"])
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from core.display_config import DisplayConfig
+from video import packed_video
+from video.binarize import BINARIZERS, DEFAULT_THRESHOLD
+from video.frame_cache import frame_cache
+from video.packed_video import display_config, pack_video, packed_path
+
+VIDEOS_DIR = os.path.join(os.path.dirname(__file__), "videos")
+VIDEO_FILE_TYPES = ["*.mov", "*.mp4", "*.m4v", "*.avi", "*.mkv", "*.webm", "*.gif"]
+MANIFEST_FILE = "manifest.json"
+HASH_CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class ConversionJob:
+    """One source video packed for one display."""
+    source: str
+    output: str
+    config: DisplayConfig
+    fps: float = 12.0
+    threshold: int = DEFAULT_THRESHOLD
+    method: str = "threshold"
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Everything besides the source's content that the packed frames depend on."""
+        return {
+            "format": packed_video.VERSION,
+            "layout": packed_video.layout_tag(self.config),
+            "module_height": self.config.module_height,
+            "fps": self.fps,
+            "threshold": self.threshold,
+            "method": self.method,
+        }
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _start_worker(ffmpeg: str, ffprobe: str) -> None:
+    """Worker process: use the same ffmpeg and ffprobe as the process that started the pool."""
+    packed_video.FFMPEG, packed_video.FFPROBE = ffmpeg, ffprobe
+
+
+def _convert(job: ConversionJob, known_digest: Optional[str]) -> Tuple[str, str, int]:
+    """
+    Worker process: pack a source unless its content turns out to be unchanged.
+
+    Returns:
+        (status, content digest, frames packed), status being "converted" or "unchanged"
+    """
+    digest = file_digest(job.source)
+    if digest == known_digest and os.path.exists(job.output):
+        return "unchanged", digest, 0
+    frames = pack_video(job.source, job.output, job.config, job.fps, job.threshold, job.method)
+    return "converted", digest, frames
+
+
+class VideoLibrary:
+    """The videos directory, packed for a set of displays."""
+
+    def __init__(self, configs: Sequence[Union[str, DisplayConfig]] = ("core",), fps: float = 12.0,
+                 threshold: int = DEFAULT_THRESHOLD, method: str = "threshold", videos_dir: str = VIDEOS_DIR,
+                 workers: Optional[int] = None):
+        """
+        Args:
+            configs: Display configurations, or their names (core or reconfigurable presets), to pack for
+            fps: Frames per second to sample videos at
+            threshold: Brightness above which a dot is lit, for the threshold method
+            method: Binarization or dithering method
+            videos_dir: Directory of source videos
+            workers: Conversion processes (default: one per CPU)
+        """
+        self.configs = [display_config(config) if isinstance(config, str) else config for config in configs]
+        self.fps = fps
+        self.threshold = threshold
+        self.method = method
+        self.videos_dir = videos_dir
+        self.workers = workers
+        self.results: Dict[str, Any] = {}
+        self._pending: Dict[str, ConversionJob] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(packed_video.PACKED_DIR, MANIFEST_FILE)
+
+    def sources(self) -> List[str]:
+        """Video files in the library, in name order."""
+        files = []
+        for file_type in VIDEO_FILE_TYPES:
+            files.extend(glob.glob(os.path.join(self.videos_dir, file_type)))
+        return sorted(files)
+
+    def jobs(self) -> List[ConversionJob]:
+        """Every source packed for every display."""
+        return [ConversionJob(source, packed_path(os.path.basename(source), config, self.threshold, self.method,
+                                                  source="video"),
+                              config, self.fps, self.threshold, self.method)
+                for source in self.sources() for config in self.configs]
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """Write the manifest atomically."""
+        os.makedirs(packed_video.PACKED_DIR, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def is_current(job: ConversionJob, entry: Optional[Dict[str, Any]]) -> bool:
+        """Whether a job's output is up to date, or its source known to fail, without hashing the source."""
+        if not entry or entry.get("params") != job.params:
+            return False
+        if "error" not in entry and not os.path.exists(job.output):
+            return False
+        stat = os.stat(job.source)
+        return entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime
+
+    def pending(self, video_name: Optional[str] = None) -> bool:
+        """Whether conversions (of one video, if given) are still queued or running."""
+        with self._lock:
+            if video_name is None:
+                return bool(self._pending)
+            return any(os.path.basename(job.source) == video_name for job in self._pending.values())
+
+    def convert(self) -> Dict[str, Any]:
+        """
+        Pack every new or changed source, skipping the rest.
+
+        Returns:
+            Counts of packed files converted, found unchanged by hash and skipped, and failures by packed file
+        """
+        manifest = self.load_manifest()
+        results: Dict[str, Any] = {"converted": 0, "unchanged": 0, "skipped": 0, "failed": {}}
+        todo = []
+        for job in self.jobs():
+            if self.is_current(job, manifest.get(os.path.basename(job.output))):
+                results["skipped"] += 1
+            else:
+                todo.append(job)
+
+        if todo:
+            os.makedirs(packed_video.PACKED_DIR, exist_ok=True)
+            print(f"Converting {len(todo)} videos ({results['skipped']} up to date)...")
+            with self._lock:
+                self._pending = {job.output: job for job in todo}
+            # Workers start from a fresh interpreter: forking this process, which runs writer, playback and
+            # this conversion's own threads, could copy a lock some other thread holds
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method),
+                                     initializer=_start_worker,
+                                     initargs=(packed_video.FFMPEG, packed_video.FFPROBE)) as pool:
+                futures = {}
+                for job in todo:
+                    entry = manifest.get(os.path.basename(job.output)) or {}
+                    known = entry.get("sha256") if entry.get("params") == job.params else None
+                    futures[pool.submit(_convert, job, known)] = job
+
+                for future in as_completed(futures):
+                    job = futures[future]
+                    stat = os.stat(job.source)
+                    entry = {
+                        "source": os.path.basename(job.source),
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "params": job.params,
+                    }
+                    try:
+                        status, entry["sha256"], frames = future.result()
+                        results[status] += 1
+                        if status == "converted":
+                            frame_cache.invalidate(os.path.basename(job.source))
+                    except Exception as e:
+                        # Recorded so a broken source isn't retried until it changes
+                        print(f"Error converting {os.path.basename(job.source)}: {e}")
+                        results["failed"][os.path.basename(job.output)] = entry["error"] = str(e)
+                    manifest[os.path.basename(job.output)] = entry
+                    # Saved as each video finishes, so an interrupted run keeps its progress
+                    self.save_manifest(manifest)
+                    with self._lock:
+                        self._pending.pop(job.output, None)
+
+        self.results = results
+        return results
+
+    def start(self) -> "VideoLibrary":
+        """Convert in a background thread; playback carries on meanwhile."""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                # Counted as pending until the worker thread has looked at them
+                self._pending = {job.output: job for job in self.jobs()}
+            self._thread = threading.Thread(target=self._run, name="flipdot-video-library", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            self.convert()
+        except Exception as e:
+            print(f"Video library conversion failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.clear()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background conversion. Returns False on timeout."""
+        if self._thread:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+
+# Library being converted in the background, if started
+background: Optional[VideoLibrary] = None
+
+
+def start_background_conversion(configs: Sequence[Union[str, DisplayConfig]] = ("core",),
+                                **kwargs) -> VideoLibrary:
+    """
+    Start packing the whole library in the background, e.g. when a playlist starts.
+
+    Args:
+        configs: Display configurations, or their names, to pack for
+        **kwargs: Other VideoLibrary options (fps, threshold, method, workers)
+    """
+    global background
+    background = VideoLibrary(configs, **kwargs).start()
+    return background
+
+
+def converting(video_name: str) -> bool:
+    """Whether the background conversion hasn't finished with a video yet."""
+    return background is not None and background.pending(video_name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack every video in the library")
+    parser.add_argument("--config", action="append", help="core or a reconfigurable preset name (repeatable)")
+    parser.add_argument("--fps", type=float, default=12.0)
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--method", default="threshold", choices=list(BINARIZERS))
+    parser.add_argument("--workers", type=int, help="conversion processes (default: one per CPU)")
+    parser.add_argument("--videos", default=VIDEOS_DIR, help="directory of source videos")
+    args = parser.parse_args()
+
+    library = VideoLibrary(args.config or ["core"], args.fps, args.threshold, args.method, args.videos, args.workers)
+    results = library.convert()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
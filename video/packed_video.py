@@ -0,0 +1,739 @@
+#!/usr/bin/env python3
+"""
+Packed Flipdot Video Format
+
+Compiles a directory of frames, or a video decoded through an ffmpeg rawvideo
+pipe, once into a single file of display buffers (binarized or dithered with
+video.binarize), so playback is just slicing frames out of a memory-mapped
+file: no globbing, image decoding or per-pixel loops while the video runs.
+Repeated frames are stored once and held, cycles stored once and looped, and
+near-identical frames stored as small patches (see video.temporal). Videos can
+also be converted and shown live.
+
+File format (little endian):
+    header: b"FLIPVID" + version (u8) + fps (f64) + width (u16) + height (u16)
+            + module height (u8) + frame count (u32) + config name length (u16)
+            + config name (utf-8)
+    tables: tables offset (u32) + stored frames (u32) + entries (u32) + loops (u32)
+    data:   stored frames, each a display buffer of frame_size bytes as fill()
+            takes them (the screen's column bytes laid out for the display's
+            wiring, see DisplayConfig.pack_screen) or a patch of (offset u16,
+            value u8) pairs on the frame stored before it
+    at the tables offset:
+            stored frame table (offset u32, length u32, patched frame i32 or -1)
+            entries (stored frame u32, hold ticks u32)
+            loops (first entry u32, entry count u32, repeats u32)
+
+Version 1 files, which are just frame count display buffers after the header,
+and version 2 files are still played. Both stored frames of displays with
+several module rows as plain screen columns, module row after module row;
+those are laid out for the display they were packed for as they are read.
+
+Usage:
+    python -m video.packed_video pack video/frames/movie.mov -o movie.fdv --config current
+    python -m video.packed_video pack video/videos/movie.mov -o movie.fdv --config current
+    python -m video.packed_video info movie.fdv
+"""
+
+import abc
+import argparse
+import glob
+import mmap
+import os
+import struct
+import sys
+import threading
+from subprocess import PIPE, Popen
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from core.animation_planner import AnimationPlanner, warn_once
+from core.display_config import DisplayConfig
+from core.frame_clock import FrameClock
+from video.binarize import BINARIZERS, DEFAULT_THRESHOLD, Binarize, binarizer, display_buffers
+from video.temporal import ENTRY_DTYPE, FRAME_DTYPE, LOOP_DTYPE, TimelineBuilder, apply_patch, expand, find_loops
+
+MAGIC = b"FLIPVID"
+VERSION = 3
+_HEADER = struct.Struct("<BdHHBIH")
+_TABLES = struct.Struct("<IIII")
+
+EXTENSION = ".fdv"
+PACKED_DIR = os.path.join(os.path.dirname(__file__), "packed")
+FRAME_FILE_TYPES = ["*.png", "*.jpg", "*.gif", "*.bmp"]
+FFMPEG = "ffmpeg"
+FFPROBE = "ffprobe"
+BATCH_FRAMES = 256  # frames binarized together when converting
+
+# Binarization method name (see video.binarize) or function
+Method = Union[str, Binarize]
+
+# Stats of the most recent playback, also when it was interrupted
+last_playback: Optional[Dict[str, Any]] = None
+
+
+class PackedVideoError(Exception):
+    """A file is not a packed video or is truncated."""
+
+
+def frame_size(width: int, height: int, module_height: int = 7) -> int:
+    """Bytes in one display buffer."""
+    return -(-height // module_height) * width
+
+
+def playback_stats(clock: FrameClock, fps: float, frames: int, sent: int, dropped: int) -> Dict[str, Any]:
+    """
+    How closely a playback kept to the wall clock.
+
+    Args:
+        clock: The playback's frame clock
+        fps: Video frames per second
+        frames: Video frames played through, shown or not
+        sent: Frames written to the display
+        dropped: Video frames that never made it to the display
+    """
+    elapsed = clock.monotonic() - clock.start
+    duration = frames / fps / clock.rate()
+    return {
+        "frames": frames,
+        "sent": sent,
+        "held": frames - sent - dropped,  # ticks a frame just stayed up
+        "dropped": dropped,
+        "late": clock.late_frames,
+        "max_lateness": clock.max_lateness,
+        "elapsed": elapsed,
+        "drift": elapsed - duration,  # behind the video's own timeline at the end
+        "fps": frames / elapsed if elapsed > 0 else 0.0,  # video frames played per second
+        "sent_fps": sent / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def playback_summary(stats: Optional[Dict[str, Any]] = None) -> str:
+    """One line about a playback, the most recent one by default."""
+    stats = stats or last_playback
+    if not stats:
+        return "No video played yet"
+    return (f"Played {stats['frames']} frames in {stats['elapsed']:.2f} s ({stats['fps']:.1f} fps): "
+            f"{stats['sent']} sent, {stats['held']} held, {stats['dropped']} dropped, "
+            f"drift {stats['drift'] * 1000:+.0f} ms")
+
+
+def write_packed(path: str, frames: Iterable[bytes], width: int, height: int, fps: float,
+                 module_height: int = 7, config_name: str = "") -> int:
+    """
+    Write display buffers to a packed video file.
+
+    Written to a temporary file first, so an interrupted conversion never leaves
+    a truncated video behind.
+
+    Returns:
+        Number of frames written
+    """
+    size = frame_size(width, height, module_height)
+    name = config_name.encode("utf-8")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # unique, conversions may run concurrently
+    timeline = TimelineBuilder(size)
+    stored = []
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC + _HEADER.pack(VERSION, fps, width, height, module_height, 0, len(name)) + name)
+            f.write(_TABLES.pack(0, 0, 0, 0))
+            for frame in frames:
+                frame = bytes(frame)[:size]
+                new = timeline.add(frame + bytes(size - len(frame)))
+                if new:
+                    data, base = new
+                    stored.append((f.tell(), len(data), base))
+                    f.write(data)
+
+            entries, loops = find_loops(timeline.entries)
+            tables = f.tell()
+            for rows, dtype in ((stored, FRAME_DTYPE), (entries, ENTRY_DTYPE), (loops, LOOP_DTYPE)):
+                f.write(np.array(rows, dtype=dtype).tobytes())
+            # Now that the frame count and tables are known
+            f.seek(len(MAGIC))
+            f.write(_HEADER.pack(VERSION, fps, width, height, module_height, timeline.ticks, len(name)) + name)
+            f.write(_TABLES.pack(tables, len(stored), len(entries), len(loops)))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return timeline.ticks
+
+
+def wire_layout(config: DisplayConfig) -> bool:
+    """
+    Whether a display's videos are packed in its wire layout instead of scaled to its screen.
+
+    The main display shows only wire columns 0-29 and 75-104, and its videos are
+    drawn for that: a strip one module high, each column sent as one byte as it is.
+    """
+    return bool(config.visible_rows)
+
+
+def layout_tag(config: DisplayConfig) -> str:
+    """Name of the frame layout a display's videos are packed in, e.g. 40x7, or wire7 for a wire layout."""
+    if wire_layout(config):
+        return f"wire{config.module_height}"
+    return f"{config.total_width}x{config.total_height}"
+
+
+def frame_shape(config: DisplayConfig, source_size: Tuple[int, int]) -> Tuple[int, int]:
+    """(width, height) a display's frames are packed at, for a source of (width, height) pixels."""
+    if wire_layout(config):
+        return source_size[0], config.module_height
+    return config.total_width, config.total_height
+
+
+def screen_packer(config: DisplayConfig) -> Callable[[bytes], bytes]:
+    """
+    How a display's frames go from screen column bytes (module row after module row) to what fill() takes.
+
+    Wire layout frames are sent as they are; other displays read their module
+    rows from wherever their wiring puts them (see DisplayConfig.pack_screen).
+    """
+    return bytes if wire_layout(config) else config.pack_screen
+
+
+def image_to_gray(image: Image.Image, width: int, height: int) -> np.ndarray:
+    """(height, width) uint8 grayscale array of an image, scaled if it isn't that size."""
+    image = image.convert("L")
+    if image.size != (width, height):
+        image = image.resize((width, height), Image.NEAREST)
+    return np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(height, width)
+
+
+def frame_binarizer(method: Method = "threshold", threshold: int = DEFAULT_THRESHOLD) -> Binarize:
+    """Binarization for a method name (see video.binarize) or a custom function."""
+    if callable(method):
+        return method
+    if method == "threshold":
+        return binarizer("threshold", level=threshold)
+    return binarizer(method)
+
+
+def convert_frames(grays: Iterable[np.ndarray], binarize: Binarize, config: DisplayConfig,
+                   batch: int = BATCH_FRAMES) -> Iterator[bytes]:
+    """Display buffers for grayscale frames, binarized a batch at a time and laid out for the display."""
+    pack = screen_packer(config)
+    pending: List[np.ndarray] = []
+    for gray in grays:
+        pending.append(gray)
+        if len(pending) >= batch:
+            yield from map(pack, display_buffers(binarize(np.stack(pending)), config.module_height))
+            pending = []
+    if pending:
+        yield from map(pack, display_buffers(binarize(np.stack(pending)), config.module_height))
+
+
+def image_to_frame(image: Image.Image, width: int, height: int, module_height: int = 7,
+                   threshold: int = DEFAULT_THRESHOLD, method: Method = "threshold") -> bytes:
+    """Screen column bytes (module row after module row) for an image, scaled to the display and binarized."""
+    lit = frame_binarizer(method, threshold)(image_to_gray(image, width, height))
+    return display_buffers(lit, module_height)[0].tobytes()
+
+
+def frame_files(frames_dir: str) -> list:
+    """Image files in a frames directory, in playback order."""
+    files = []
+    for file_type in FRAME_FILE_TYPES:
+        files.extend(glob.glob(os.path.join(frames_dir, file_type)))
+    return sorted(files)
+
+
+def pack_frames(frames_dir: str, path: str, config: DisplayConfig, fps: float = 12.0,
+                threshold: int = DEFAULT_THRESHOLD, method: Method = "threshold") -> int:
+    """
+    Compile a directory of frame images into a packed video for a display.
+
+    Returns:
+        Number of frames packed
+    """
+    files = frame_files(frames_dir)
+    if not files:
+        raise PackedVideoError(f"No frame files found in {frames_dir}")
+    with Image.open(files[0]) as image:
+        width, height = frame_shape(config, image.size)
+
+    def grays() -> Iterator[np.ndarray]:
+        for file in files:
+            with Image.open(file) as image:
+                yield image_to_gray(image, width, height)
+
+    frames = convert_frames(grays(), frame_binarizer(method, threshold), config)
+    return write_packed(path, frames, width, height, fps, config.module_height, config.name)
+
+
+def video_size(video_path: str) -> Tuple[int, int]:
+    """(width, height) of a video, read with ffprobe."""
+    process = Popen([FFPROBE, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height",
+                     "-of", "csv=p=0:s=x", os.path.abspath(video_path)], stdout=PIPE)
+    output = process.communicate()[0].decode("ascii", "replace").strip()
+    try:
+        width, height = map(int, output.splitlines()[0].split("x")[:2])
+    except (IndexError, ValueError):
+        raise PackedVideoError(f"ffprobe could not read the size of {video_path} "
+                               f"(return code: {process.returncode})") from None
+    return width, height
+
+
+def video_shape(video_path: str, config: DisplayConfig) -> Tuple[int, int]:
+    """(width, height) a video's frames are packed at for a display (see frame_shape)."""
+    return frame_shape(config, video_size(video_path) if wire_layout(config) else (0, 0))
+
+
+def ffmpeg_frames(video_path: str, width: int, height: int, fps: float = 12.0) -> Iterator[np.ndarray]:
+    """
+    Decode a video through an ffmpeg pipe, already at the size frames are packed at (see video_shape).
+
+    Yields:
+        (height, width) uint8 grayscale frames
+    """
+    size = width * height
+    process = Popen([FFMPEG, "-nostdin", "-loglevel", "error", "-i", os.path.abspath(video_path),
+                     "-r", str(fps), "-vf", f"scale={width}:{height}:flags=area",
+                     "-f", "rawvideo", "-pix_fmt", "gray", "-"], stdout=PIPE, bufsize=size * 16)
+    try:
+        while True:
+            data = process.stdout.read(size)
+            if len(data) < size:
+                break
+            yield np.frombuffer(data, dtype=np.uint8).reshape(height, width)
+    finally:
+        # Also reached when the consumer stops early
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+    if process.returncode > 0:
+        raise PackedVideoError(f"ffmpeg failed on {video_path} (return code: {process.returncode})")
+
+
+def video_frames(video_path: str, config: DisplayConfig, fps: float = 12.0, threshold: int = DEFAULT_THRESHOLD,
+                 method: Method = "threshold", batch: int = BATCH_FRAMES) -> Iterator[bytes]:
+    """
+    Display buffers for a video, converted as ffmpeg decodes it.
+
+    Args:
+        video_path: Any video ffmpeg can read
+        config: Display the frames are packed for (see frame_shape)
+        fps: Frames per second to sample the video at
+        threshold: Brightness above which a dot is lit, for the threshold method
+        method: Binarization method name (see video.binarize) or function
+        batch: Frames binarized together; 1 for the lowest latency
+    """
+    grays = ffmpeg_frames(video_path, *video_shape(video_path, config), fps)
+    return convert_frames(grays, frame_binarizer(method, threshold), config, batch)
+
+
+def pack_video(video_path: str, path: str, config: DisplayConfig, fps: float = 12.0,
+               threshold: int = DEFAULT_THRESHOLD, method: Method = "threshold") -> int:
+    """Compile a video straight into a packed video, with no intermediate images."""
+    width, height = video_shape(video_path, config)
+    frames = convert_frames(ffmpeg_frames(video_path, width, height, fps), frame_binarizer(method, threshold),
+                            config)
+    return write_packed(path, frames, width, height, fps, config.module_height, config.name)
+
+
+def stream_video(video_path: str, config: DisplayConfig, fill: Callable[[bytes], Any], fps: float = 12.0,
+                 threshold: int = DEFAULT_THRESHOLD, method: Method = "threshold",
+                 planner: Optional[AnimationPlanner] = None) -> Dict[str, Any]:
+    """
+    Show a video live as ffmpeg decodes it, without packing it first.
+
+    Args:
+        video_path: Any video ffmpeg can read
+        config: Display configuration
+        fill: Display fill function
+        fps: Playback rate
+        threshold: Brightness above which a dot is lit, for the threshold method
+        method: Binarization method name (see video.binarize) or function
+        planner: Display's planner, to skip frames the serial link can't carry
+
+    Returns:
+        Playback stats (see playback_stats), also kept in last_playback
+    """
+    global last_playback
+    stride = 1
+    if planner:
+        stride = warn_once(planner.plan_video(fps)).step
+
+    # Frame i is due i / fps after the start, however long decoding and sending take
+    clock = FrameClock(1.0 / fps)
+    now = 0  # tick the clock has reached
+    ready = 0  # first tick the link can take another frame at
+    frames = sent = dropped = 0
+    shown = None
+    try:
+        for index, frame in enumerate(video_frames(video_path, config, fps, threshold, method, batch=1)):
+            frames = index + 1
+            if frame == shown:
+                # An unchanged frame just stays up, nothing to send
+                continue
+            if index < ready:
+                # The link is still busy or playback is behind: the next frame shown covers this one
+                dropped += 1
+                continue
+            if index > now:
+                now = index + clock.tick((index - now) / fps)
+            fill(frame)
+            shown = frame
+            sent += 1
+            # Frames that came due while this one was late are dropped
+            ready = max(index + stride, now + 1)
+        if frames > now:
+            # Hold the last frame for its full time
+            now = frames + clock.tick((frames - now) / fps)
+    finally:
+        last_playback = playback_stats(clock, fps, min(frames, max(now, 1)), sent, dropped)
+    return last_playback
+
+
+def packed_path(video_name: str, config: DisplayConfig, threshold: int = DEFAULT_THRESHOLD,
+                method: str = "threshold", source: str = "frames") -> str:
+    """
+    Where the packed copy of a video for a display configuration and binarization lives.
+
+    Args:
+        source: What it is packed from, "frames" (its frames directory) or
+            "video" (the video file); each gets its own copy, as the two can differ
+    """
+    binarization = f"t{threshold}" if method == "threshold" else method
+    tag = f"{source}.{layout_tag(config)}.{binarization}"
+    return os.path.join(PACKED_DIR, f"{video_name}.{tag}{EXTENSION}")
+
+
+def packed_version(path: str) -> int:
+    """Format version of a packed video file, 0 if it isn't one."""
+    with open(path, "rb") as f:
+        start = f.read(len(MAGIC) + 1)
+    return start[-1] if len(start) > len(MAGIC) and start.startswith(MAGIC) else 0
+
+
+def ensure_packed(video_name: str, frames_dir: str, config: DisplayConfig, fps: float = 12.0,
+                  threshold: int = DEFAULT_THRESHOLD, method: str = "threshold") -> Optional[str]:
+    """
+    Packed video for a frames directory, compiling it first if it is missing or stale.
+
+    Without frames, the copy video.library packs from the video file is
+    played, or else one packed from frames that have since gone.
+
+    Returns:
+        Path of the packed video, or None if there is nothing to play
+    """
+    path = packed_path(video_name, config, threshold, method)
+    files = frame_files(frames_dir) if os.path.isdir(frames_dir) else []
+    if not files:
+        # Files from an older format still play, but are repacked when the frames are at hand
+        for packed in (packed_path(video_name, config, threshold, method, source="video"), path):
+            if os.path.exists(packed):
+                return packed
+        return None
+    if os.path.exists(path):
+        newest_frame = max(os.path.getmtime(file) for file in files)
+        if os.path.getmtime(path) >= newest_frame and packed_version(path) == VERSION:
+            return path
+
+    os.makedirs(PACKED_DIR, exist_ok=True)
+    print(f"Packing {len(files)} frames of {video_name} for {config.name}...")
+    pack_frames(frames_dir, path, config, fps, threshold, method)
+    return path
+
+
+class _Playable(abc.ABC):
+    """Playback shared by packed videos and decoded ones: stored frames and a timeline of holds."""
+
+    fps: float
+    width: int
+    height: int
+    module_height: int
+    frame_count: int
+    _tick_frames: Optional[np.ndarray] = None
+
+    @abc.abstractmethod
+    def frame(self, ref: int) -> bytes:
+        """Display buffer of a stored frame."""
+
+    @abc.abstractmethod
+    def timeline(self) -> Iterator[Tuple[int, int]]:
+        """(stored frame, hold ticks) in playback order, loops repeated."""
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __getitem__(self, index: int) -> bytes:
+        """Display buffer of one frame."""
+        if index < 0:
+            index += self.frame_count
+        if not 0 <= index < self.frame_count:
+            raise IndexError("Frame index out of range")
+        if self._tick_frames is None:
+            refs, holds = zip(*self.timeline())
+            self._tick_frames = np.repeat(np.array(refs, dtype=np.uint32), holds)
+        return self.frame(int(self._tick_frames[index]))
+
+    def __iter__(self) -> Iterator[bytes]:
+        for ref, hold in self.timeline():
+            frame = self.frame(ref)
+            for _ in range(hold):
+                yield frame
+
+    def matches(self, config: DisplayConfig) -> bool:
+        """Whether the frames were packed for a display of this size (any width, for a wire layout)."""
+        width, height = frame_shape(config, (self.width, self.height))
+        return (self.width, self.height, self.module_height) == (width, height, config.module_height)
+
+    def play(self, fill: Callable[[bytes], Any], loop: bool = False, fps: Optional[float] = None,
+             planner: Optional[AnimationPlanner] = None) -> Dict[str, Any]:
+        """
+        Show the frames locked to the wall clock at the video's frame rate.
+
+        Every frame is due at its own time from the start of playback, so a
+        clip takes exactly its length. A held frame is sent once and left up
+        until the next one is due. When sending falls behind, or the serial
+        link couldn't carry a frame in time, frames are dropped without
+        decoding and the next one shown catches the display up.
+
+        Args:
+            fill: Display fill function
+            loop: Start over at the end until interrupted
+            fps: Playback rate instead of the one the video was packed at
+            planner: Display's planner, to skip frames the serial link can't carry
+
+        Returns:
+            Playback stats (see playback_stats), also kept in last_playback
+        """
+        global last_playback
+        fps = fps or self.fps
+        stride = 1
+        if planner:
+            stride = warn_once(planner.plan_video(fps)).step
+
+        clock = FrameClock(1.0 / fps)
+        now = 0  # tick the clock has reached
+        ready = 0  # first tick the link can take another frame at
+        start = 0  # tick the current entry comes up at
+        sent = dropped = 0
+        try:
+            while True:
+                for ref, hold in self.timeline():
+                    end = start + hold
+                    due = max(start, ready)
+                    if due < end and due > now:
+                        # Behind schedule, the clock skips ticks to catch up
+                        now = due + clock.tick((due - now) / fps)
+                    if due < end and now < end:
+                        fill(self.frame(ref))
+                        sent += 1
+                        ready = now + stride
+                    else:
+                        dropped += hold
+                    start = end
+                if start > now:
+                    # Hold the last frame for its full time
+                    now = start + clock.tick((start - now) / fps)
+                if not loop:
+                    break
+        finally:
+            last_playback = playback_stats(clock, fps, min(start, now), sent, dropped)
+        return last_playback
+
+
+class PackedVideo(_Playable):
+    """A packed video, memory-mapped for playback."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            if self._file.read(len(MAGIC)) != MAGIC:
+                raise PackedVideoError(f"{path} is not a packed flipdot video")
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise PackedVideoError("Truncated packed video header")
+            (self.version, self.fps, self.width, self.height, self.module_height,
+             self.frame_count, name_length) = _HEADER.unpack(header)
+            if self.version not in (1, 2, VERSION):
+                raise PackedVideoError(f"Unsupported packed video version {self.version}")
+            self.config_name = self._file.read(name_length).decode("utf-8")
+            self.frame_size = frame_size(self.width, self.height, self.module_height)
+            start = len(MAGIC) + _HEADER.size + name_length
+            file_size = os.fstat(self._file.fileno()).st_size
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if file_size > start else None
+
+            if self.version == 1:
+                # Every frame stored whole and shown for one tick
+                if file_size < start + self.frame_count * self.frame_size:
+                    raise PackedVideoError("Truncated packed video")
+                self._frames = np.zeros(self.frame_count, dtype=FRAME_DTYPE)
+                self._frames["offset"] = start + np.arange(self.frame_count) * self.frame_size
+                self._frames["length"] = self.frame_size
+                self._frames["base"] = -1
+                self._entries = np.zeros(self.frame_count, dtype=ENTRY_DTYPE)
+                self._entries["frame"] = np.arange(self.frame_count)
+                self._entries["hold"] = 1
+                self._loops = np.zeros(0, dtype=LOOP_DTYPE)
+            else:
+                tables = self._file.read(_TABLES.size)
+                if len(tables) < _TABLES.size:
+                    raise PackedVideoError("Truncated packed video header")
+                offset, *counts = _TABLES.unpack(tables)
+                arrays = []
+                for count, dtype in zip(counts, (FRAME_DTYPE, ENTRY_DTYPE, LOOP_DTYPE)):
+                    if file_size < offset + count * dtype.itemsize:
+                        raise PackedVideoError("Truncated packed video")
+                    arrays.append(np.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+                                  if count else np.zeros(0, dtype=dtype))
+                    offset += count * dtype.itemsize
+                self._frames, self._entries, self._loops = arrays
+        except Exception:
+            self._file.close()
+            raise
+        self._decoded = (-1, b"")  # most recently decoded stored frame, patches usually build on it
+        # Older files kept several module rows as plain screen columns
+        self._pack: Optional[Callable[[bytes], bytes]] = None
+        if self.version < 3 and self.height > self.module_height:
+            config = preset_config(self.config_name)
+            if config:
+                self._pack = screen_packer(config)
+
+    @property
+    def stored_frames(self) -> int:
+        """Distinct frames in the file."""
+        return len(self._frames)
+
+    @property
+    def patched_frames(self) -> int:
+        """Stored frames kept as patches of another."""
+        return int(np.count_nonzero(self._frames["base"] >= 0))
+
+    @property
+    def entries(self) -> int:
+        """Timeline entries in the file, each cycle counted once."""
+        return len(self._entries)
+
+    @property
+    def loops(self) -> int:
+        return len(self._loops)
+
+    def frame(self, ref: int) -> bytes:
+        """Display buffer of a stored frame."""
+        chain = []
+        while ref != self._decoded[0] and self._frames["base"][ref] >= 0:
+            chain.append(ref)
+            ref = int(self._frames["base"][ref])
+        buffer = self._decoded[1] if ref == self._decoded[0] else self._data(ref)
+        for patched in reversed(chain):
+            buffer = apply_patch(buffer, self._data(patched))
+            ref = patched
+        self._decoded = (ref, buffer)
+        return self._pack(buffer) if self._pack else buffer
+
+    def _data(self, ref: int) -> bytes:
+        offset, length = int(self._frames["offset"][ref]), int(self._frames["length"][ref])
+        return self._map[offset:offset + length]
+
+    def timeline(self) -> Iterator[Tuple[int, int]]:
+        """(stored frame, hold ticks) in playback order, loops repeated."""
+        entries = [(int(frame), int(hold)) for frame, hold in self._entries.tolist()]
+        return expand(entries, [tuple(loop) for loop in self._loops.tolist()])
+
+    def decode(self) -> "DecodedVideo":
+        """Every frame decoded into memory, to play without the file."""
+        return DecodedVideo(self)
+
+    def close(self) -> None:
+        self._frames = self._entries = self._loops = self._tick_frames = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "PackedVideo":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class DecodedVideo(_Playable):
+    """A packed video's frames decoded into memory, played with no file access or patching."""
+
+    def __init__(self, video: PackedVideo):
+        self.path = video.path
+        self.config_name = video.config_name
+        self.fps = video.fps
+        self.width = video.width
+        self.height = video.height
+        self.module_height = video.module_height
+        self.frame_count = video.frame_count
+        # In stored order every patch applies to the frame decoded just before it
+        self.frames = [video.frame(ref) for ref in range(video.stored_frames)]
+        self._entries = [(int(frame), int(hold)) for frame, hold in video._entries.tolist()]
+        self._loops = [tuple(loop) for loop in video._loops.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the decoded frames and timeline."""
+        return sum(sys.getsizeof(item) for part in (self.frames, self._entries, self._loops)
+                   for item in (part, *part))
+
+    def frame(self, ref: int) -> bytes:
+        return self.frames[ref]
+
+    def timeline(self) -> Iterator[Tuple[int, int]]:
+        return expand(self._entries, self._loops)
+
+
+def display_config(name: str) -> DisplayConfig:
+    """Display configuration by name: core for the working core, or a reconfigurable preset."""
+    if name == "core":
+        from core.core import WORKING_CORE_CONFIG
+        return WORKING_CORE_CONFIG
+    from core.reconfigurable_flipdot import DISPLAY_CONFIGS
+    return DISPLAY_CONFIGS[name]
+
+
+def preset_config(name: str) -> Optional[DisplayConfig]:
+    """Reconfigurable preset with a configuration name, as packed videos record it; None if there is none."""
+    from core.reconfigurable_flipdot import DISPLAY_CONFIGS
+    for config in DISPLAY_CONFIGS.values():
+        if config.name == name:
+            return config
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile and inspect packed flipdot videos")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack = commands.add_parser("pack", help="compile a frames directory or video file")
+    pack.add_argument("source", help="frames directory or video file")
+    pack.add_argument("-o", "--output", required=True)
+    pack.add_argument("--config", default="current", help="core or a reconfigurable preset name")
+    pack.add_argument("--fps", type=float, default=12.0)
+    pack.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="brightness above which a dot is lit")
+    pack.add_argument("--method", default="threshold", choices=list(BINARIZERS), help="binarization or dithering")
+
+    info = commands.add_parser("info", help="show a packed video's header")
+    info.add_argument("video")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        with PackedVideo(args.video) as video:
+            for key in ("config_name", "version", "fps", "width", "height", "module_height", "frame_count",
+                        "frame_size", "stored_frames", "patched_frames", "entries", "loops"):
+                print(f"{key:14} {getattr(video, key)}")
+        return
+
+    config = display_config(args.config)
+    pack_source = pack_frames if os.path.isdir(args.source) else pack_video
+    count = pack_source(args.source, args.output, config, args.fps, args.threshold, args.method)
+    print(f"Packed {count} frames for {config.name} into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Temporal Compression of Flipdot Videos
+
+Flipdot clips are mostly still: a face holding for a second, a barber pole
+cycling through the same couple of dozen frames. Instead of storing and
+sending every frame, a video is reduced to
+
+    frames    each distinct display buffer once, either whole or as a patch of
+              the few bytes it changes in the frame stored before it
+    entries   the timeline: which stored frame to show and for how many ticks
+    loops     runs of entries that repeat back to back, stored once with a
+              repeat count
+
+Usage:
+    timeline = TimelineBuilder(frame_size)
+    for frame in frames:
+        timeline.add(frame)
+    entries, loops = find_loops(timeline.entries)
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Stored frame table: where each frame's bytes are in the file, and the stored
+# frame it patches (-1 for a whole display buffer)
+FRAME_DTYPE = np.dtype([("offset", "<u4"), ("length", "<u4"), ("base", "<i4")])
+# Timeline: stored frame shown and how many ticks it stays up
+ENTRY_DTYPE = np.dtype([("frame", "<u4"), ("hold", "<u4")])
+# Back-to-back repeats of the entries first .. first + count - 1
+LOOP_DTYPE = np.dtype([("first", "<u4"), ("count", "<u4"), ("repeats", "<u4")])
+# Patch: buffer offset and the byte to put there
+PATCH_DTYPE = np.dtype([("offset", "<u2"), ("value", "u1")])
+
+DELTA_RATIO = 0.5  # a patch is stored if it is at most this fraction of a whole frame
+KEYFRAME_INTERVAL = 16  # longest chain of patches before a whole frame is stored
+MAX_LOOP_PERIOD = 64  # longest cycle of entries looked for
+
+Entry = Tuple[int, int]  # (stored frame, hold ticks)
+Loop = Tuple[int, int, int]  # (first entry, entry count, repeats)
+
+
+def diff_patch(base: bytes, frame: bytes) -> bytes:
+    """Patch turning base into frame: (offset, value) pairs for every changed byte."""
+    old = np.frombuffer(base, dtype=np.uint8)
+    new = np.frombuffer(frame, dtype=np.uint8)
+    changed = np.flatnonzero(old != new)
+    patch = np.empty(len(changed), dtype=PATCH_DTYPE)
+    patch["offset"] = changed
+    patch["value"] = new[changed]
+    return patch.tobytes()
+
+
+def apply_patch(base: bytes, patch: bytes) -> bytes:
+    """Frame a patch was made from."""
+    frame = np.frombuffer(base, dtype=np.uint8).copy()
+    changes = np.frombuffer(patch, dtype=PATCH_DTYPE)
+    frame[changes["offset"]] = changes["value"]
+    return frame.tobytes()
+
+
+class TimelineBuilder:
+    """Turns a stream of display buffers into stored frames and timeline entries."""
+
+    def __init__(self, frame_size: int):
+        self.frame_size = frame_size
+        self.entries: List[Entry] = []
+        self.ticks = 0
+        self._refs: Dict[bytes, int] = {}
+        self._stored = 0
+        self._last: Optional[bytes] = None  # most recently stored frame
+        self._chain = 0  # patches since the last whole frame
+
+    def add(self, frame: bytes) -> Optional[Tuple[bytes, int]]:
+        """
+        Add the next frame of the video.
+
+        Returns:
+            (data, base) to store for a frame not seen before, base being the
+            stored frame the data patches or -1 for a whole frame; None if the
+            frame is already stored
+        """
+        self.ticks += 1
+        if self.entries and self._refs.get(frame) == self.entries[-1][0]:
+            # Same as the frame on screen: hold it one tick longer
+            ref, hold = self.entries[-1]
+            self.entries[-1] = (ref, hold + 1)
+            return None
+
+        stored = None
+        ref = self._refs.get(frame)
+        if ref is None:
+            ref = self._stored
+            stored = (frame, -1)
+            if self._last is not None and self._chain < KEYFRAME_INTERVAL:
+                patch = diff_patch(self._last, frame)
+                if len(patch) <= self.frame_size * DELTA_RATIO:
+                    stored = (patch, ref - 1)
+            self._chain = self._chain + 1 if stored[1] >= 0 else 0
+            self._refs[frame] = ref
+            self._last = frame
+            self._stored += 1
+        self.entries.append((ref, 1))
+        return stored
+
+
+def find_loops(entries: Sequence[Entry], max_period: int = MAX_LOOP_PERIOD) -> Tuple[List[Entry], List[Loop]]:
+    """
+    Store cycles of entries once.
+
+    Greedy from the start: at each entry the cycle length that saves the most
+    entries wins.
+
+    Returns:
+        (entries with every cycle kept once, loops indexing into them)
+    """
+    entries = list(entries)
+    kept: List[Entry] = []
+    loops: List[Loop] = []
+    index = 0
+    while index < len(entries):
+        best = (0, 0, 0)  # (entries saved, period, repeats)
+        for period in range(1, min(max_period, (len(entries) - index) // 2) + 1):
+            cycle = entries[index:index + period]
+            repeats = 1
+            while entries[index + repeats * period:index + (repeats + 1) * period] == cycle:
+                repeats += 1
+            if (repeats - 1) * period > best[0]:
+                best = ((repeats - 1) * period, period, repeats)
+        saved, period, repeats = best
+        if saved:
+            loops.append((len(kept), period, repeats))
+            kept.extend(entries[index:index + period])
+            index += period * repeats
+        else:
+            kept.append(entries[index])
+            index += 1
+    return kept, loops
+
+
+def expand(entries: Sequence[Entry], loops: Sequence[Loop]) -> Iterator[Entry]:
+    """Entries in playback order, loops repeated."""
+    index = 0
+    for first, count, repeats in sorted(loops):
+        yield from entries[index:first]
+        for _ in range(repeats):
+            yield from entries[first:first + count]
+        index = first + count
+    yield from entries[index:]
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Checks for binarization, run with pytest
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Add the repository root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video.binarize import BINARIZERS, binarizer, display_buffers
+
+
+def test_floyd_steinberg_matches_pil():
+    frames = (np.random.default_rng(3).random((8, 14, 30)) * 255).astype(np.uint8)
+    expected = np.stack([np.asarray(Image.fromarray(frame).convert("1")) for frame in frames])
+    assert (binarizer("floyd-steinberg")(frames) == expected).all()
+    assert (binarizer("floyd-steinberg")(frames[0]) == expected[0]).all()
+
+
+@pytest.mark.parametrize("method", sorted(BINARIZERS))
+def test_stack_matches_single_frames(method):
+    frames = (np.random.default_rng(5).random((4, 7, 20)) * 255).astype(np.uint8)
+    binarize = binarizer(method)
+    assert (binarize(frames) == np.stack([binarize(frame) for frame in frames])).all()
+
+
+def test_display_buffers_put_the_top_dot_in_bit_6():
+    lit = np.zeros((14, 3), dtype=bool)
+    lit[0, 0] = lit[6, 1] = lit[7, 2] = True
+    assert display_buffers(lit, 7)[0].tobytes() == bytes([0x40, 0x01, 0, 0, 0, 0x40])
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Checks for packed videos, run with pytest
+
+Frames are packed from generated images and shown on a virtual panel, so a
+frame laid out wrong for a preset's wiring shows up as moved columns. Held,
+looped and patched frames are checked against the buffers they were packed from.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+os.environ.setdefault("FLIPDOT_HEADLESS", "1")
+
+# Add the repository root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.canvas import Canvas
+from core.reconfigurable_flipdot import DISPLAY_CONFIGS, ReconfigurableFlipdotDisplay
+from core.virtual_panel import VirtualPanel
+from video import updated_video
+from video.packed_video import _HEADER, MAGIC, PackedVideo, pack_frames, write_packed
+
+
+def make_pattern(width: int, height: int, seed: int = 7) -> np.ndarray:
+    """Lit dots with no symmetry: every column and row is different."""
+    pixels = np.random.default_rng(seed).random((height, width)) < 0.5
+    pixels[:, 0] = True  # a solid left edge, to see which way round a frame is
+    return pixels
+
+
+def write_frames(directory, patterns) -> str:
+    """Frame images for lit dot patterns, white for a lit dot."""
+    for index, pixels in enumerate(patterns):
+        Image.fromarray(np.where(pixels, 255, 0).astype(np.uint8)).save(os.path.join(directory, f"{index:05d}.png"))
+    return str(directory)
+
+
+def make_buffers(seed: int = 11) -> list:
+    """Display buffers (30 columns, one module row) with holds, a repeated cycle and small changes."""
+    rng = np.random.default_rng(seed)
+    def random_buffer():
+        return bytes(rng.integers(0, 128, 30, dtype=np.uint8))
+
+    held, *cycle = (random_buffer() for _ in range(4))
+    buffers = [held] * 5 + cycle * 6
+    # A run of one-column changes, longer than a chain of patches may get
+    drifting = bytearray(random_buffer())
+    for column in range(20):
+        drifting[column] ^= 0x11
+        buffers.append(bytes(drifting))
+    return buffers + [random_buffer(), buffers[0]]
+
+
+def show(config, message: bytes) -> Canvas:
+    """What a panel with a preset's wiring shows for a message."""
+    panel = VirtualPanel(config)
+    panel.write(config.create_encoder().encode(message))
+    return panel.snapshot()
+
+
+def shared_columns(config) -> set:
+    """Screen columns that read the same message byte as a later one, so can't show their own."""
+    table = config.screen_table
+    return {index for index, address in enumerate(table) if address in table[index + 1:]}
+
+
+@pytest.mark.parametrize("name", sorted(DISPLAY_CONFIGS))
+def test_packed_frames_show_on_every_module_row(tmp_path, name):
+    config = DISPLAY_CONFIGS[name]
+    patterns = [make_pattern(config.total_width, config.total_height, seed) for seed in range(3)]
+    frames_dir = tmp_path / "frames"
+    frames_dir.mkdir()
+    path = str(tmp_path / "clip.fdv")
+    pack_frames(write_frames(frames_dir, patterns), path, config)
+
+    with PackedVideo(path) as video:
+        assert len(video) == len(patterns)
+        for pixels, frame in zip(patterns, video):
+            shown = show(config, frame)
+            # The same picture as a canvas, laid out by the same wiring
+            assert shown == show(config, Canvas.from_array(pixels).to_buffer(config))
+            wrong = (shown.pixels != pixels).reshape(
+                config.screen_rows, config.module_height, config.screen_width).any(axis=1).ravel()
+            assert set(np.flatnonzero(wrong).tolist()) <= shared_columns(config)
+
+
+@pytest.mark.parametrize("name", sorted(DISPLAY_CONFIGS))
+def test_display_image_shows_every_module_row(tmp_path, name):
+    config = DISPLAY_CONFIGS[name]
+    pixels = make_pattern(config.total_width, config.total_height)
+    write_frames(tmp_path, [pixels])
+    display = ReconfigurableFlipdotDisplay(name, port="/nonexistent")
+    panel = display.use_virtual_panel()
+    updated_video.set_display(display)
+    updated_video.display_image(str(tmp_path / "00000.png"), duration=0)
+
+    assert panel.snapshot() == show(config, Canvas.from_array(pixels).to_buffer(config))
+
+
+def test_holds_loops_and_patches_play_back_every_frame(tmp_path):
+    buffers = make_buffers()
+    path = str(tmp_path / "clip.fdv")
+    assert write_packed(path, buffers, 30, 7, 12.0) == len(buffers)
+
+    with PackedVideo(path) as video:
+        assert video.loops == 1
+        assert video.patched_frames > 0
+        assert video.stored_frames < video.entries < len(buffers)
+        assert list(video) == buffers
+        # Out of order, so patches are applied to a frame other than the last one decoded
+        order = np.random.default_rng(1).permutation(len(buffers)).tolist()
+        assert [video[index] for index in order] == [buffers[index] for index in order]
+        assert list(video.decode()) == buffers
+
+
+def test_version_1_files_still_play(tmp_path):
+    buffers = make_buffers()
+    path = tmp_path / "old.fdv"
+    name = b"Wide 8x1"
+    path.write_bytes(MAGIC + _HEADER.pack(1, 12.0, 30, 7, 7, len(buffers), len(name)) + name + b"".join(buffers))
+
+    with PackedVideo(str(path)) as video:
+        assert (video.version, video.fps, video.config_name) == (1, 12.0, "Wide 8x1")
+        assert list(video) == buffers
+        assert video[-1] == buffers[-1]
@@ -8,15 +8,18 @@ This module handles video frame conversion and playback for any display configur
 import glob
 import os
 import time
-from subprocess import Popen
+import numpy as np
 from PIL import Image
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from core.reconfigurable_flipdot import ReconfigurableFlipdotDisplay
+from video import library, packed_video
+from video.frame_cache import cache_key, frame_cache
+from video.packed_video import (PACKED_DIR, PackedVideo, image_to_frame, pack_video, packed_path,
+                                playback_summary, stream_video)
 
 __author__ = 'boselowitz (updated version)'
 
 # Configuration
-FFMPEG = "ffmpeg"
 VIDEOS_DIR = os.path.join(os.path.dirname(__file__), "videos")
 FRAMES_DIR = os.path.join(os.path.dirname(__file__), "frames")
 FRAME_FILE_TYPES = ["*.png", "*.jpg", "*.gif", "*.bmp"]
@@ -39,33 +42,31 @@ def ensure_display():
 
 def convert_video_to_frames(video_name: str, fps: float = DEFAULT_FPS, 
                            target_width: Optional[int] = None, 
-                           target_height: Optional[int] = None) -> bool:
+                           target_height: Optional[int] = None,
+                           brightness_threshold: int = 128, method: str = "threshold") -> bool:
     """
-    Convert a video file to individual frames sized for the display.
+    Convert a video file into packed frames sized for the display.
+    
+    Frames are streamed out of ffmpeg as raw grayscale, binarized and packed
+    as they are decoded, with no intermediate image files.
     
     Args:
         video_name: Name of the video file in the videos directory
         fps: Frames per second to extract
-        target_width: Target width (uses display width if None)
-        target_height: Target height (uses display height if None)
+        target_width: Target width (must match the display width if given)
+        target_height: Target height (must match the display height if given)
+        brightness_threshold: Threshold for converting grayscale to binary
+        method: Binarization or dithering method (threshold, otsu, bayer, floyd-steinberg, atkinson)
         
     Returns:
         True if successful, False otherwise
     """
     ensure_display()
     
-    if target_width is None:
-        target_width = display.config.total_width
-    if target_height is None:
-        target_height = display.config.total_height
-    
-    frames_path = os.path.join(FRAMES_DIR, video_name)
-    
-    # Create directories if they don't exist
-    if not os.path.exists(FRAMES_DIR):
-        os.makedirs(FRAMES_DIR)
-    if not os.path.exists(frames_path):
-        os.makedirs(frames_path)
+    if (target_width or display.config.total_width, target_height or display.config.total_height) != (
+            display.config.total_width, display.config.total_height):
+        print(f"Frames are packed at the display size ({display.config.total_width}×{display.config.total_height})")
+        return False
     
     full_video_path = os.path.abspath(os.path.join(VIDEOS_DIR, video_name))
     
@@ -73,41 +74,53 @@ def convert_video_to_frames(video_name: str, fps: float = DEFAULT_FPS,
         print(f"Video file not found: {full_video_path}")
         return False
     
-    starting_dir = os.getcwd()
+    os.makedirs(PACKED_DIR, exist_ok=True)
     
     try:
-        os.chdir(frames_path)
-        
-        # Build ffmpeg command with scaling
-        cmd = [
-            FFMPEG,
-            "-i", full_video_path,
-            "-r", str(fps),
-            "-vf", f"scale={target_width}:{target_height}:flags=neighbor",
-            "-vcodec", "png",
-            "-y",  # Overwrite existing files
-            "%05d.png"
-        ]
-        
-        print(f"Converting {video_name} to {target_width}×{target_height} frames at {fps} FPS...")
-        p = Popen(cmd)
-        p.wait()
-        
-        if p.returncode == 0:
-            print(f"Successfully converted {video_name}")
-            return True
-        else:
-            print(f"Error converting {video_name} (return code: {p.returncode})")
-            return False
-            
+        print(f"Converting {video_name} to {display.config.total_width}×{display.config.total_height} frames "
+              f"at {fps} FPS...")
+        count = pack_video(full_video_path,
+                           packed_path(video_name, display.config, brightness_threshold, method, source="video"),
+                           display.config, fps, brightness_threshold, method)
+        frame_cache.invalidate(video_name)
+        print(f"Successfully converted {video_name} ({count} frames)")
+        return True
     except Exception as e:
-        print(f"Error during conversion: {e}")
+        print(f"Error converting {video_name}: {e}")
         return False
-    finally:
-        os.chdir(starting_dir)
+
+def stream_video_file(video_name: str, fps: float = DEFAULT_FPS, brightness_threshold: int = 128,
+                      method: str = "threshold") -> Optional[Dict[str, Any]]:
+    """
+    Play a video file live, converting frames as ffmpeg decodes them.
+    
+    Args:
+        video_name: Name of the video file in the videos directory
+        fps: Playback frame rate
+        brightness_threshold: Threshold for converting grayscale to binary
+        method: Binarization or dithering method
+        
+    Returns:
+        Playback stats (frames, sent, held, dropped, drift, fps...), or None if there is no such video
+    """
+    ensure_display()
+    
+    full_video_path = os.path.join(VIDEOS_DIR, video_name)
+    if not os.path.exists(full_video_path):
+        print(f"Video file not found: {full_video_path}")
+        return None
+    
+    try:
+        stream_video(full_video_path, display.config, display.fill, fps, brightness_threshold, method,
+                     display.planner)
+    except KeyboardInterrupt:
+        print("\nVideo playback interrupted")
+    
+    print(playback_summary())
+    return packed_video.last_playback
 
 def display_video(video_name: str, fps: float = DEFAULT_FPS, loop: bool = False, 
-                 brightness_threshold: int = 128) -> None:
+                 brightness_threshold: int = 128, method: str = "threshold") -> Optional[Dict[str, Any]]:
     """
     Display a video on the flipdot display.
     
@@ -116,132 +129,107 @@ def display_video(video_name: str, fps: float = DEFAULT_FPS, loop: bool = False,
         fps: Playback frame rate
         loop: Whether to loop the video
         brightness_threshold: Threshold for converting grayscale to binary
+        method: Binarization or dithering method (threshold, otsu, bayer, floyd-steinberg, atkinson)
+        
+    Returns:
+        Playback stats (frames, sent, held, dropped, drift, fps...), or None if nothing was played
     """
     ensure_display()
     
     frames_path = os.path.join(FRAMES_DIR, video_name)
     
-    if not os.path.exists(frames_path):
-        print(f"Frames directory not found: {frames_path}")
-        print(f"Try running convert_video_to_frames('{video_name}') first")
-        return
-    
-    # Get all image files
-    image_files = []
-    for file_type in FRAME_FILE_TYPES:
-        image_files.extend(glob.glob(os.path.join(frames_path, file_type)))
-    
-    if not image_files:
-        print(f"No frame files found in {frames_path}")
-        return
-    
-    image_files = sorted(image_files)
-    frame_delay = 1.0 / fps
-    
-    print(f"Playing {len(image_files)} frames at {fps} FPS")
+    # Frames are compiled once into a packed file, and kept decoded in memory after the first showing
+    video = frame_cache.load(video_name, frames_path, display.config, fps, brightness_threshold, method)
+    if video is None:
+        if os.path.isfile(os.path.join(VIDEOS_DIR, video_name)):
+            # Not packed yet (video.library may still be on it): play it live rather than wait
+            print(f"{video_name} is not packed yet, streaming it")
+            return stream_video_file(video_name, fps, brightness_threshold, method)
+        if os.path.isdir(frames_path):
+            print(f"No frame files found in {frames_path}")
+        else:
+            print(f"Frames directory not found: {frames_path}")
+            print(f"Try running convert_video_to_frames('{video_name}') first")
+        return None
     
     try:
-        while True:
-            for image_file in image_files:
-                frame_data = convert_image_to_frame_data(image_file, brightness_threshold)
-                if frame_data:
-                    display.display_frame(frame_data)
-                time.sleep(frame_delay)
-            
-            if not loop:
-                break
+        print(f"Playing {len(video)} frames at {fps} FPS")
+        video.play(display.fill, loop, fps, display.planner)
                 
     except KeyboardInterrupt:
         print("\nVideo playback interrupted")
     
     print("Video playback finished")
+    print(playback_summary())
+    return packed_video.last_playback
 
-def convert_image_to_frame_data(image_path: str, brightness_threshold: int = 128) -> Optional[bytes]:
+def warm_videos(video_names: List[str], fps: float = DEFAULT_FPS, brightness_threshold: int = 128,
+                method: str = "threshold"):
+    """
+    Decode videos into the frame cache in the background, e.g. the ones coming up in a playlist.
+    
+    Args:
+        video_names: Names of the videos, in the order they will be played
+        fps: Frame rate to pack at, for videos that aren't packed yet
+        brightness_threshold: Threshold for converting grayscale to binary
+        method: Binarization or dithering method
+        
+    Returns:
+        The loading thread
+    """
+    ensure_display()
+    return frame_cache.warm(video_names, FRAMES_DIR, display.config, fps, brightness_threshold, method)
+
+def convert_image_to_frame_data(image_path: str, brightness_threshold: int = 128,
+                                method: str = "threshold") -> Optional[bytes]:
     """
     Convert an image file to frame data for the flipdot display.
     
     Args:
         image_path: Path to the image file
         brightness_threshold: Threshold for converting to binary (0-255)
+        method: Binarization or dithering method (threshold, otsu, bayer, floyd-steinberg, atkinson)
         
     Returns:
-        Bytes representing the frame, or None if error
+        Screen column bytes for display_frame(), or None if error
     """
     ensure_display()
     
     try:
-        # Open and process the image
-        image = Image.open(image_path)
-        
-        # Convert to grayscale
-        image = image.convert('L')
-        
-        # Resize to match display dimensions
-        image = image.resize((display.config.total_width, display.config.total_height), Image.NEAREST)
-        
-        # Get pixel data
-        pixels = list(image.getdata())
-        
-        # Convert to frame data
-        frame_data = b''
-        
-        if display.config.modules_high == 1:
-            # Single row of modules - standard conversion
-            frame_data = convert_pixels_single_row(pixels, display.config.total_width, 
-                                                 display.config.total_height, brightness_threshold)
-        else:
-            # Multiple rows of modules - split the image
-            frame_data = convert_pixels_multi_row(pixels, display.config, brightness_threshold)
-        
-        return frame_data
+        with Image.open(image_path) as image:
+            return image_to_frame(image, display.config.total_width, display.config.total_height,
+                                  display.config.module_height, brightness_threshold, method)
         
     except Exception as e:
         print(f"Error processing image {image_path}: {e}")
         return None
 
+def _lit_rows(pixels: List[int], width: int, rows: int, threshold: int) -> np.ndarray:
+    """(rows, width) lit dots from row-major pixels, missing pixels unlit."""
+    values = np.zeros(rows * width, dtype=np.int32)
+    pixels = np.asarray(pixels, dtype=np.int32).ravel()[:values.size]
+    values[:pixels.size] = pixels
+    return values.reshape(rows, width) > threshold
+
 def convert_pixels_single_row(pixels: List[int], width: int, height: int, 
                             threshold: int) -> bytes:
     """Convert pixels for a single row of modules."""
-    frame_data = b''
-    
-    for col in range(width):
-        col_byte = 0
-        for row in range(min(height, 7)):  # Max 7 bits per byte
-            pixel_idx = (row * width) + col
-            if pixel_idx < len(pixels):
-                if pixels[pixel_idx] > threshold:
-                    col_byte |= (1 << (6 - row))  # Set bit for bright pixels
-        
-        frame_data += bytes([col_byte])
-    
-    return frame_data
+    rows = min(height, 7)  # Max 7 bits per byte
+    lit = _lit_rows(pixels, width, rows, threshold)
+    weights = 1 << (6 - np.arange(rows))  # Set bit for bright pixels
+    return (lit * weights[:, np.newaxis]).sum(axis=0).astype(np.uint8).tobytes()
 
 def convert_pixels_multi_row(pixels: List[int], config, threshold: int) -> bytes:
-    """Convert pixels for multiple rows of modules."""
-    frame_data = b''
-    
-    # Process each column
-    for col in range(config.total_width):
-        # For displays with multiple module rows, we need to handle each module row separately
-        module_row_height = config.module_height
-        
-        for module_row in range(config.modules_high):
-            col_byte = 0
-            
-            # Process each row within this module
-            for bit_row in range(module_row_height):
-                actual_row = (module_row * module_row_height) + bit_row
-                pixel_idx = (actual_row * config.total_width) + col
-                
-                if pixel_idx < len(pixels) and pixels[pixel_idx] > threshold:
-                    col_byte |= (1 << (module_row_height - 1 - bit_row))
-            
-            frame_data += bytes([col_byte])
-    
-    return frame_data
+    """Convert pixels for multiple rows of modules, one byte per module row for each column."""
+    module_row_height = config.module_height
+    lit = _lit_rows(pixels, config.total_width, config.modules_high * module_row_height, threshold)
+    lit = lit.reshape(config.modules_high, module_row_height, config.total_width)
+    weights = 1 << (module_row_height - 1 - np.arange(module_row_height))
+    columns = (lit * weights[np.newaxis, :, np.newaxis]).sum(axis=1)
+    return columns.T.astype(np.uint8).tobytes()
 
 def display_image(image_path: str, duration: float = 2.0, 
-                 brightness_threshold: int = 128) -> None:
+                 brightness_threshold: int = 128, method: str = "threshold") -> None:
     """
     Display a single image on the flipdot display.
     
@@ -249,10 +237,11 @@ def display_image(image_path: str, duration: float = 2.0,
         image_path: Path to the image file
         duration: How long to display the image (seconds)
         brightness_threshold: Threshold for converting to binary
+        method: Binarization or dithering method
     """
     ensure_display()
     
-    frame_data = convert_image_to_frame_data(image_path, brightness_threshold)
+    frame_data = convert_image_to_frame_data(image_path, brightness_threshold, method)
     if frame_data:
         display.display_frame(frame_data)
         time.sleep(duration)
@@ -300,28 +289,40 @@ def create_test_pattern() -> None:
     
     display.clear()
 
-def get_video_info(video_name: str) -> dict:
+def get_video_info(video_name: str, brightness_threshold: int = 128, method: str = "threshold") -> dict:
     """
     Get information about a video file.
     
     Args:
         video_name: Name of the video file
+        brightness_threshold: Threshold the packed frames were made with
+        method: Binarization method the packed frames were made with
         
     Returns:
         Dictionary with video information
     """
+    ensure_display()
+    
     full_video_path = os.path.join(VIDEOS_DIR, video_name)
     frames_path = os.path.join(FRAMES_DIR, video_name)
+    packed = packed_path(video_name, display.config, brightness_threshold, method)
+    if not os.path.exists(packed):
+        packed = packed_path(video_name, display.config, brightness_threshold, method, source="video")
     
     info = {
         'video_exists': os.path.exists(full_video_path),
         'frames_exist': os.path.exists(frames_path),
+        'packed_exists': os.path.exists(packed),
         'video_path': full_video_path,
         'frames_path': frames_path,
+        'packed_path': packed,
         'frame_count': 0
     }
     
-    if info['frames_exist']:
+    if info['packed_exists']:
+        with PackedVideo(packed) as video:
+            info['frame_count'] = len(video)
+    elif info['frames_exist']:
         image_files = []
         for file_type in FRAME_FILE_TYPES:
             image_files.extend(glob.glob(os.path.join(frames_path, file_type)))
@@ -339,18 +340,28 @@ def quick_play(video_name: str, auto_convert: bool = True, **kwargs) -> None:
         auto_convert: Whether to automatically convert video to frames if needed
         **kwargs: Additional arguments for display_video
     """
-    info = get_video_info(video_name)
+    threshold = kwargs.get('brightness_threshold', 128)
+    method = kwargs.get('method', "threshold")
+    ensure_display()
+    if frame_cache.get(cache_key(video_name, display.config, kwargs.get('fps', DEFAULT_FPS), threshold, method)):
+        # Already decoded in memory, nothing to check on disk
+        display_video(video_name, **kwargs)
+        return
+    
+    info = get_video_info(video_name, threshold, method)
     
     if not info['video_exists']:
         print(f"Video file not found: {video_name}")
         return
     
-    if not info['frames_exist'] or info['frame_count'] == 0:
+    if info['frame_count'] == 0:
         if auto_convert:
-            print(f"Converting {video_name} to frames...")
-            if not convert_video_to_frames(video_name):
-                print("Failed to convert video")
-                return
+            # Pack the library in the background and stream this one meanwhile
+            if library.background is None:
+                library.start_background_conversion([display.config], fps=kwargs.get('fps', DEFAULT_FPS),
+                                                    threshold=threshold, method=method, videos_dir=VIDEOS_DIR)
+            stream_video_file(video_name, kwargs.get('fps', DEFAULT_FPS), threshold, method)
+            return
         else:
             print(f"No frames found for {video_name}. Use auto_convert=True or run convert_video_to_frames() first.")
             return
@@ -359,6 +370,6 @@ def quick_play(video_name: str, auto_convert: bool = True, **kwargs) -> None:
 
 # Export main functions
 __all__ = [
-    'set_display', 'convert_video_to_frames', 'display_video', 'display_image',
+    'set_display', 'convert_video_to_frames', 'display_video', 'stream_video_file', 'warm_videos', 'display_image',
     'create_test_pattern', 'get_video_info', 'quick_play'
 ]
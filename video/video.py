@@ -2,20 +2,19 @@ from __future__ import print_function
 from builtins import str
 from builtins import chr
 from builtins import range
-import glob
 import os
-import time
-from subprocess import Popen
-from PIL import Image
 from core import core
+from video.frame_cache import frame_cache
+from video.packed_video import PACKED_DIR, pack_video, packed_path, playback_summary, stream_video
 
 __author__ = 'boselowitz'
 
-FFMPEG = "ffmpeg"
 VIDEOS_DIR = os.path.join(os.path.dirname(__file__), "videos")
 FRAMES_DIR = os.path.join(os.path.dirname(__file__), "frames")
 FRAME_FILE_TYPES = ["*.png", "*.jpg", "*.gif"]
 FPS = 12.0
+# Frames are dithered the way PIL's convert("1") always did them
+METHOD = "floyd-steinberg"
 
 
 def display_function(x):
@@ -26,48 +25,33 @@ def display_function(x):
 
 
 def display_video(video_name):
-    image_types = FRAME_FILE_TYPES
-    image_files = []
-    for image_type in image_types:
-        image_files.extend(glob.glob(os.path.join(os.path.abspath(os.path.join(FRAMES_DIR, video_name)), image_type)))
-
-    if len(image_files) == 0:
-        print("Could not find frames.")
-        return
+    # Frames are compiled once into a packed file, and kept decoded in memory after the first showing
+    video = frame_cache.load(video_name, os.path.join(FRAMES_DIR, video_name), core.WORKING_CORE_CONFIG, FPS,
+                             method=METHOD)
+    if video is None:
+        # Not packed yet (video.library may still be on it): play it live rather than wait
+        full_video_path = os.path.join(VIDEOS_DIR, video_name)
+        if not os.path.isfile(full_video_path):
+            print("Could not find frames.")
+            return
+        stats = stream_video(full_video_path, core.WORKING_CORE_CONFIG, core.fill, FPS, method=METHOD,
+                             planner=core.working_core.planner)
+    else:
+        stats = video.play(core.fill, planner=core.working_core.planner)
+    print(playback_summary(stats))
+    return stats
 
-    image_files = sorted(image_files)
-    for image_file in image_files:
-        image = Image.open(image_file)
-        image = image.convert("1")
-        # image = image.point(display_function)
-        (width, height) = image.size
-        image_list = list(image.getdata())
 
-        fill_value = b""
-        for col in range(width):
-            col_value = 0
-            for row in range(height):
-                pixel = image_list[(row * width) + col]
-                if pixel:
-                    col_value |= core.BITMASK[6 - row]
-            fill_value += bytes([col_value])
-        core.fill(fill_value)
-        time.sleep(1.0 / FPS)
+def warm(video_names):
+    # Load a playlist's videos into the frame cache in the background
+    return frame_cache.warm(video_names, FRAMES_DIR, core.WORKING_CORE_CONFIG, FPS, method=METHOD)
 
 
 def convert_video_to_frames(video_name):
-    frames_path = os.path.join(FRAMES_DIR, video_name)
-    if not os.path.exists(FRAMES_DIR):
-        os.makedirs(FRAMES_DIR)
-        os.makedirs(frames_path)
-    elif not os.path.exists(frames_path):
-        os.makedirs(frames_path)
-
+    # Streamed straight out of ffmpeg into a packed video, no intermediate images
+    if not os.path.exists(PACKED_DIR):
+        os.makedirs(PACKED_DIR)
     full_video_path = os.path.abspath(os.path.join(VIDEOS_DIR, video_name))
-    starting_dir = os.getcwd()
-    os.chdir(frames_path)
-
-    p = Popen([FFMPEG, "-r", str(FPS), "-i", full_video_path, "-vcodec", "png", "%5d.png"])
-    p.wait()
-
-    os.chdir(starting_dir)
+    pack_video(full_video_path, packed_path(video_name, core.WORKING_CORE_CONFIG, method=METHOD, source="video"),
+               core.WORKING_CORE_CONFIG, FPS, method=METHOD)
+    frame_cache.invalidate(video_name)